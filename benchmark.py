@@ -0,0 +1,373 @@
+"""
+Benchmark execution file for HOTEL AI
+
+-Time the hot paths of the model: game construction, moves, money, upgrade costs, whole turns,
+ config loading and reprs
+-Write the results as JSON, with the metadata of the machine and the commit measured
+-Compare a run to a stored baseline, flagging the benchmarks slower than a threshold
+
+    python benchmark.py run --out bench.json
+    python benchmark.py compare baseline.json bench.json --threshold 0.1
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+import game.model.rules as rules
+import game.model.state as state
+
+from easydict import EasyDict
+from prettytable import PrettyTable
+from typing import Callable
+
+from game.controller.game_manager import GameManager
+from game.model.game import Game
+from game.view.cli.show import show_board
+from utils.config import PROJECT_ROOT, process_config
+
+FORMAT_VERSION = 1
+MAX_TURNS = 500
+
+# comparison status of a benchmark
+REGRESSION = 'regression'
+IMPROVEMENT = 'improvement'
+SAME = 'ok'
+NEW = 'new'
+MISSING = 'missing'
+
+
+def bench_config_load(config: EasyDict) -> Callable:
+    """
+    process_config, from the binary cache
+    """
+    return lambda: process_config(EasyDict())
+
+
+def bench_config_parse(config: EasyDict) -> Callable:
+    """
+    process_config, parsing and compiling the yaml files
+    """
+    return lambda: process_config(EasyDict(), use_cache=False)
+
+
+def bench_game_init(config: EasyDict) -> Callable:
+    """
+    Game construction
+    """
+    return lambda: Game(config=config)
+
+
+def bench_move_player(config: EasyDict) -> Callable:
+    """
+    Board.move_player by one cell
+    """
+    game = Game(config=config)
+    board = game.get_board()
+    p = next(iter(game.get_player_list().values()))
+    return lambda: board.move_player(p, delta=1)
+
+
+def bench_upgrade_costs(config: EasyDict) -> Callable:
+    """
+    Hotel.get_upgrade_costs
+    """
+    game = Game(config=config)
+    h = next(iter(game.get_hotel_list().values()))
+    return h.get_upgrade_costs
+
+
+def bench_change_money(config: EasyDict) -> Callable:
+    """
+    Player.change_money
+    """
+    game = Game(config=config)
+    p = next(iter(game.get_player_list().values()))
+    return lambda: p.change_money(1)
+
+
+def bench_turn_rules(config: EasyDict) -> Callable:
+    """
+    Whole turn of the rules engine on the raw buffer, greedy policy, new game when over
+    """
+    manager = GameManager(config, headless=True, use_agents=False)
+    game_rules = manager.get_rules()
+    start = manager.get_game().get_state().get_data().tolist()
+    rng = random.Random(0)
+    data = start[:]
+
+    def turn():
+        nonlocal data
+        over = game_rules.play_turn(data, rng, rules.greedy_policy) and game_rules.is_over(data)
+        if over or data[state.TURN] >= MAX_TURNS:
+            data = start[:]
+
+    return turn
+
+
+def bench_turn_model(config: EasyDict) -> Callable:
+    """
+    Whole turn of GameManager through the model classes, new game when over
+    """
+    seeds = iter(range(sys.maxsize))
+    manager = GameManager(config, headless=True, seed=next(seeds), use_agents=False)
+
+    def turn():
+        nonlocal manager
+        manager.play_turn()
+        if manager.is_over() or manager.get_game().get_state().get_turn() >= MAX_TURNS:
+            manager = GameManager(config, headless=True, seed=next(seeds), use_agents=False)
+
+    return turn
+
+
+def bench_game_repr(config: EasyDict) -> Callable:
+    """
+    Game.__repr__
+    """
+    game = Game(config=config)
+    return lambda: repr(game)
+
+
+def bench_hotel_repr(config: EasyDict) -> Callable:
+    """
+    Hotel.__repr__
+    """
+    h = next(iter(Game(config=config).get_hotel_list().values()))
+    return lambda: repr(h)
+
+
+def bench_show_board(config: EasyDict) -> Callable:
+    """
+    Board.move_player then show_board, one cell of the view patched
+    """
+    game = Game(config=config)
+    board = game.get_board()
+    p = next(iter(game.get_player_list().values()))
+
+    def show():
+        board.move_player(p, delta=1)
+        return show_board(board)
+
+    return show
+
+
+# benchmark name -> setup(config) returning the function timed, called without argument
+BENCHMARKS: dict[str: Callable] = {
+    'config_load': bench_config_load,
+    'config_parse': bench_config_parse,
+    'game_init': bench_game_init,
+    'move_player': bench_move_player,
+    'get_upgrade_costs': bench_upgrade_costs,
+    'change_money': bench_change_money,
+    'turn_rules': bench_turn_rules,
+    'turn_model': bench_turn_model,
+    'game_repr': bench_game_repr,
+    'hotel_repr': bench_hotel_repr,
+    'show_board': bench_show_board,
+}
+
+
+def time_function(function: Callable,
+                  repeat: int = 5,
+                  min_time: float = 0.2
+                  ) -> dict:
+    """
+    Time a function, calibrating the number of calls per round so that a round lasts at least min_time
+    :param function: function timed, called without argument
+    :param repeat: number of rounds
+    :param min_time: shortest round, in seconds
+    :return: statistics of the time per call, in microseconds, over the rounds
+    """
+    def run(n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            function()
+        return time.perf_counter() - start
+
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time:
+            break
+        # aim a bit past min_time, at least doubling
+        number = max(2 * number, int(number * 1.2 * min_time / max(elapsed, 1e-9)))
+    rounds = [elapsed] + [run(number) for _ in range(repeat - 1)]
+    per_call = [t / number * 1e6 for t in rounds]
+    return {
+        'min_us': min(per_call),
+        'median_us': statistics.median(per_call),
+        'mean_us': statistics.fmean(per_call),
+        'stdev_us': statistics.stdev(per_call) if len(per_call) > 1 else 0.,
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def git_commit() -> str or None:
+    """
+    :return: hash of the commit checked out, with a '+' if the tree has changes, None outside a git repository
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if dirty else '')
+
+
+def machine_metadata() -> dict:
+    """
+    :return: machine, interpreter and commit measured, results of different machines are not comparable
+    """
+    return {
+        'format': FORMAT_VERSION,
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'commit': git_commit(),
+    }
+
+
+def run_benchmarks(names: list[str] = None,
+                   repeat: int = 5,
+                   min_time: float = 0.2
+                   ) -> dict:
+    """
+    :param names: benchmarks to run, all if not specified
+    :param repeat: number of rounds of each benchmark
+    :param min_time: shortest round, in seconds
+    :return: results, with the metadata of the machine
+    :raise KeyError if a benchmark does not exist
+    """
+    names = list(BENCHMARKS.keys()) if names is None else names
+    for name in names:
+        if name not in BENCHMARKS:
+            raise KeyError(f'Unknown benchmark {name}, expected one of {list(BENCHMARKS.keys())}')
+    config = process_config(EasyDict())
+    results = dict()
+    for name in names:
+        results[name] = time_function(BENCHMARKS[name](config), repeat=repeat, min_time=min_time)
+    return {'metadata': machine_metadata(), 'benchmarks': results}
+
+
+def compare(baseline: dict,
+            current: dict,
+            threshold: float = 0.1
+            ) -> list[tuple[str, float or None, float or None, float or None, str]]:
+    """
+    Compare the min time per call, the least noisy statistic, of two runs
+    :param baseline: results of the reference run, see run_benchmarks
+    :param current: results of the run checked
+    :param threshold: relative change flagged, e.g. 0.1 for 10% slower or faster
+    :return: (name, baseline us, current us, current / baseline, status) of every benchmark of the two runs
+    """
+    base, cur = baseline['benchmarks'], current['benchmarks']
+    rows = []
+    for name in list(base.keys()) + [n for n in cur.keys() if n not in base]:
+        if name not in cur:
+            rows.append((name, base[name]['min_us'], None, None, MISSING))
+            continue
+        if name not in base:
+            rows.append((name, None, cur[name]['min_us'], None, NEW))
+            continue
+        b, c = base[name]['min_us'], cur[name]['min_us']
+        ratio = c / b if b > 0 else float('inf')
+        status = REGRESSION if ratio > 1 + threshold else IMPROVEMENT if ratio < 1 / (1 + threshold) else SAME
+        rows.append((name, b, c, ratio, status))
+    return rows
+
+
+def comparison_table(rows: list[tuple[str, float or None, float or None, float or None, str]]
+                     ) -> PrettyTable:
+    """
+    :param rows: comparison, see compare
+    :return: table of the comparison
+    """
+    table = PrettyTable()
+    table.field_names = ['Benchmark', 'Baseline (us)', 'Current (us)', 'Ratio', 'Status']
+    for name, b, c, ratio, status in rows:
+        table.add_row([name, '-' if b is None else f'{b:.3f}', '-' if c is None else f'{c:.3f}',
+                       '-' if ratio is None else f'{ratio:.2f}', status.upper() if status == REGRESSION else status])
+    return table
+
+
+def results_table(results: dict) -> PrettyTable:
+    """
+    :param results: results of a run, see run_benchmarks
+    :return: table of the time per call of every benchmark
+    """
+    table = PrettyTable()
+    table.field_names = ['Benchmark', 'Min (us)', 'Median (us)', 'Stdev (us)', 'Calls per round']
+    for name, r in results['benchmarks'].items():
+        table.add_row([name, f'{r["min_us"]:.3f}', f'{r["median_us"]:.3f}', f'{r["stdev_us"]:.3f}', r['number']])
+    return table
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Benchmark function
+    Parses argument
+    Run the benchmarks or compare two runs
+    :param argv: arguments, the command line if not specified
+    :return: exit status, 1 if a regression is flagged
+    """
+
+    # set up argument parser to read input arguments
+    arg_parser = argparse.ArgumentParser(description="Benchmarks of the model hot paths")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks and write the results as JSON')
+    run_parser.add_argument('--out', type=str, default=None, help='JSON file of the results, printed if not set')
+    run_parser.add_argument('--only', nargs='+', default=None, choices=list(BENCHMARKS.keys()))
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--min-time', type=float, default=0.2, help='shortest round, in seconds')
+    compare_parser = commands.add_parser('compare', help='flag the regressions of a run against a baseline')
+    compare_parser.add_argument('baseline', type=str)
+    compare_parser.add_argument('current', type=str)
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown flagged')
+
+    # get the argument from the console
+    args = arg_parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run_benchmarks(args.only, repeat=args.repeat, min_time=args.min_time)
+        print(results_table(results))
+        if args.out is not None:
+            with open(args.out, 'w') as f:
+                json.dump(results, f, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline['metadata'].get('host') != current['metadata'].get('host') or \
+            baseline['metadata'].get('python') != current['metadata'].get('python'):
+        print('Warning: runs of different machines or interpreters, timings are not comparable')
+    rows = compare(baseline, current, threshold=args.threshold)
+    print(comparison_table(rows))
+    regressions = [name for name, _, _, _, status in rows if status == REGRESSION]
+    if regressions:
+        print(f'Regressions beyond {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+AI agent selection
+The ai section of configs/game.yaml selects and tunes the agent of every AI player (is_ai: true);
+a player entry may override the agent with its own agent key
+"""
+
+import game.model.rules as rules
+
+from easydict import EasyDict
+
+from game.ai.analytics import RentTables, income_evaluation
+from game.ai.expectimax import Expectimax, ExpectimaxAgent, net_worth_evaluation
+from game.ai.features import ObservationEncoder
+from game.ai.inference import InferenceBatcher, MLPEvaluator, NetworkAgent
+from game.ai.mcts import MCTS, MCTSAgent, UCT
+from game.ai.rollout import RolloutEngine, RolloutAgent
+from game.ai.root_parallel import RootParallelSearch, RootParallelAgent
+from game.ai.transposition import TranspositionTable
+from game.model.game import Game
+from game.view.player_interface import AiInterface
+
+MCTS_AGENT = 'mcts'
+EXPECTIMAX_AGENT = 'expectimax'
+ROLLOUT_AGENT = 'rollout'
+NETWORK_AGENT = 'network'
+
+# leaf evaluations of expectimax
+NET_WORTH_EVALUATION = 'net_worth'
+INCOME_EVALUATION = 'income'
+
+# used for the options missing from the ai section
+DEFAULT_AI = {
+    'agent': MCTS_AGENT,
+    'time_ms': 500,
+    'mode': UCT,
+    'exploration': 1.4,
+    'workers': 1,
+    'root_workers': 1,
+    'rollout_turns': 30,
+    'depth': 1,
+    'evaluation': NET_WORTH_EVALUATION,
+    'income_horizon': 10,
+    'table_size': 65536,
+    'table_replacement': 'lru',
+    'weights': None,
+    'hidden': [64],
+    'batch_size': 256,
+    'batch_delay_ms': 2.,
+}
+
+
+def get_ai_config(config: EasyDict,
+                  player_name: str = None
+                  ) -> EasyDict:
+    """
+    :param config: global config dictionary
+    :param player_name: name of the player, to apply its own agent key
+    :return: ai options, defaults filled in
+    """
+    ai_config = EasyDict(DEFAULT_AI)
+    ai_config.update(config.game_dict.get('ai') or dict())
+    for p in config.game_dict.player_list:
+        if p.name == player_name and p.get('agent'):
+            ai_config.agent = p.agent
+    return ai_config
+
+
+def build_batcher(ai_config: EasyDict,
+                  game_rules: rules.Rules,
+                  seed: int = None
+                  ) -> InferenceBatcher:
+    """
+    :param ai_config: ai options, see get_ai_config
+    :param game_rules: compiled rules of the game
+    :param seed: seed of the weights, when no weights file is given
+    :return: batcher of the value network, one value per player
+    """
+    n_features = ObservationEncoder(game_rules.layout).get_size()
+    if ai_config.weights:
+        evaluator = MLPEvaluator.load(ai_config.weights)
+    else:
+        evaluator = MLPEvaluator.random([n_features, *ai_config.hidden, game_rules.n_players], seed=seed)
+    return InferenceBatcher(evaluator, n_features, max_batch=ai_config.batch_size,
+                            max_delay_ms=ai_config.batch_delay_ms)
+
+
+def build_evaluation(ai_config: EasyDict,
+                     tables: RentTables = None):
+    """
+    :param ai_config: ai options, see get_ai_config
+    :param tables: rent tables of the config, needed by the income evaluation
+    :return: evaluation(rules, data) -> value of every player, for the leaves of expectimax
+    :raise ValueError if the evaluation is unknown, or income without rent tables
+    """
+    if ai_config.evaluation == NET_WORTH_EVALUATION:
+        return net_worth_evaluation
+    if ai_config.evaluation == INCOME_EVALUATION:
+        if tables is None:
+            raise ValueError(f'The {INCOME_EVALUATION} evaluation needs the rent tables of the config')
+        return income_evaluation(tables, horizon=ai_config.income_horizon)
+    raise ValueError(f'Unknown evaluation {ai_config.evaluation}, '
+                     f'expected {NET_WORTH_EVALUATION} or {INCOME_EVALUATION}')
+
+
+def build_agent(ai_config: EasyDict,
+                game_rules: rules.Rules,
+                seed: int = None,
+                batcher: InferenceBatcher = None,
+                tables: RentTables = None):
+    """
+    :param ai_config: ai options, see get_ai_config
+    :param game_rules: compiled rules of the game
+    :param seed: seed of the agent random streams
+    :param batcher: batcher shared by the network agents, a new one if not specified
+    :param tables: rent tables of the config, needed by the income evaluation
+    :return: agent, with choose_action(game_state) -> action
+    :raise ValueError if the agent or the evaluation is unknown
+    """
+    if ai_config.agent == NETWORK_AGENT:
+        return NetworkAgent(game_rules, ObservationEncoder(game_rules.layout),
+                            batcher or build_batcher(ai_config, game_rules, seed=seed))
+    engine = RolloutEngine(game_rules, max_turns=ai_config.rollout_turns, seed=seed)
+    table = TranspositionTable(ai_config.table_size, replacement=ai_config.table_replacement) \
+        if ai_config.table_size else None
+    if ai_config.root_workers > 1 and ai_config.agent in (MCTS_AGENT, ROLLOUT_AGENT):
+        search = RootParallelSearch(engine, game_rules, n_workers=ai_config.root_workers, kind=ai_config.agent,
+                                    exploration=ai_config.exploration, mode=ai_config.mode, seed=seed or 0)
+        return RootParallelAgent(search, time_ms=ai_config.time_ms)
+    if ai_config.agent == MCTS_AGENT:
+        search = MCTS(engine, game_rules, exploration=ai_config.exploration, mode=ai_config.mode,
+                      n_workers=ai_config.workers, seed=seed, table=table)
+        return MCTSAgent(search, time_ms=ai_config.time_ms)
+    if ai_config.agent == EXPECTIMAX_AGENT:
+        return ExpectimaxAgent(Expectimax(game_rules, depth=ai_config.depth,
+                                          evaluation=build_evaluation(ai_config, tables), table=table))
+    if ai_config.agent == ROLLOUT_AGENT:
+        return RolloutAgent(engine, time_ms=ai_config.time_ms)
+    raise ValueError(f'Unknown agent {ai_config.agent}, '
+                     f'expected {MCTS_AGENT}, {EXPECTIMAX_AGENT}, {ROLLOUT_AGENT} or {NETWORK_AGENT}')
+
+
+def attach_agents(game: Game,
+                  config: EasyDict,
+                  game_rules: rules.Rules,
+                  seed: int = None
+                  ) -> None:
+    """
+    Give an agent to the interface of every AI player of a game
+    The network agents with the same weights share one inference batcher, the expectimax agents with the income
+    evaluation the rent tables of the config
+    :param game: Game with the players
+    :param config: global config dictionary
+    :param game_rules: compiled rules of the game, on the layout of the game state
+    :param seed: seed of the agents, each player gets its own stream
+    """
+    batchers = dict()
+    tables = None
+    for p in game.get_player_list().values():
+        ui = p.get_ui()
+        if isinstance(ui, AiInterface):
+            p_seed = None if seed is None else seed + p.get_id()
+            ai_config = get_ai_config(config, p.get_name())
+            batcher = None
+            if ai_config.agent == NETWORK_AGENT:
+                batcher = batchers.get(ai_config.weights)
+                if batcher is None:
+                    batcher = batchers[ai_config.weights] = build_batcher(ai_config, game_rules, seed=seed)
+            if ai_config.agent == EXPECTIMAX_AGENT and ai_config.evaluation == INCOME_EVALUATION and tables is None:
+                tables = RentTables.load(config)
+            ui.set_agent(build_agent(ai_config, game_rules, seed=p_seed, batcher=batcher, tables=tables))
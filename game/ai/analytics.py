@@ -0,0 +1,159 @@
+"""
+Contains RentTables class
+Precomputed landing probabilities and expected rent income, derived from the board, the hotels and the dice model
+Computed once per config and cached on disk, so that evaluation functions only do O(1) lookups
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import game.model.hotel as hotel
+import game.model.rules as rules
+import game.model.topology as topology
+import utils.config as cfg
+
+from easydict import EasyDict
+from typing import Callable, MutableSequence
+
+N_ITERATIONS = 200      # power iterations for the stationary distribution
+RENT_TABLES_VERSION = 1     # bump when RentTables changes shape
+
+
+def config_hash(config: EasyDict) -> str:
+    """
+    Hash of the parts of the config the tables depend on
+    :param config: global config dictionary
+    :return: hex digest
+    """
+    content = json.dumps({'cell_dict': config.cell_dict, 'hotel_dict': config.hotel_dict}, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+class RentTables:
+    """
+    RentTables class
+    Cells are indexed by cell_id + 1, hotels by their order in config.hotel_dict, star levels from 0
+    """
+
+    def __init__(self,
+                 config: EasyDict):
+        """
+        Compute the tables
+        :param config: global config dictionary
+        """
+        cell_ids = sorted(int(cell_id) for cell_id in config.cell_dict.keys())
+        n_cells = len(cell_ids)
+        ring_size = topology.get_topology(config).ring_size
+        self.hotel_names: tuple[str] = tuple(config.hotel_dict.keys())
+
+        # stationary landing probability of each cell, for a die moving (pos + die) % ring_size
+        dist = [0.] * n_cells
+        dist[0] = 1.    # everybody starts on the start cell
+        for _ in range(N_ITERATIONS):
+            nxt = [0.] * n_cells
+            for cell_idx, p in enumerate(dist):
+                if p:
+                    for die in range(1, rules.DIE_FACES + 1):
+                        nxt[(cell_idx - 1 + die) % ring_size + 1] += p / rules.DIE_FACES
+            dist = nxt
+        self.landing: tuple[float] = tuple(dist)
+
+        # mean payment over the nights die, by hotel and star level (0 stars: no rent)
+        payments = [hotel.Hotel(name=name, config=config).get_payments() for name in self.hotel_names]
+        self.mean_rent: tuple[tuple[float]] = tuple(
+            (0., ) + tuple(sum(row) / len(row) for row in matrix)
+            for matrix in payments
+        )
+
+        # expected rent per opponent turn of an entrance on a cell, by hotel, star level and cell
+        self.entrance_rent: tuple[tuple[tuple[float]]] = tuple(
+            tuple(tuple(rent * p for p in self.landing) for rent in mean_rent)
+            for mean_rent in self.mean_rent
+        )
+
+        # expected rent per opponent turn with an entrance on every cell near the hotel, by hotel and star level
+        near = [[cell_id + 1 for cell_id in cell_ids if name in config.cell_dict[str(cell_id)].hotels_near]
+                for name in self.hotel_names]
+        self.max_rent: tuple[tuple[float]] = tuple(
+            tuple(sum(rent_by_cell[cell_idx] for cell_idx in near[h_id]) for rent_by_cell in self.entrance_rent[h_id])
+            for h_id in range(len(self.hotel_names))
+        )
+
+    def get_entrance_rent(self,
+                          h_id: int,
+                          star_level: int,
+                          cell_id: int
+                          ) -> float:
+        """
+        :param h_id: id of the hotel
+        :param star_level: star level of the hotel
+        :param cell_id: id of the cell with the entrance
+        :return: expected rent per opponent turn from the entrance
+        """
+        return self.entrance_rent[h_id][star_level][cell_id + 1]
+
+    @staticmethod
+    def load(config: EasyDict,
+             cache_dir: str = None
+             ) -> 'RentTables':
+        """
+        Load the tables of the config from the cache, computing and caching them if missing
+        A cache file of another version, or that does not unpickle, is rebuilt
+        The cache is an optimization only: write errors are ignored, e.g. on a read-only checkout
+        :param config: global config dictionary
+        :param cache_dir: directory of the cache, CACHE_DIR of the project if not specified
+        :return: tables of the config
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(cfg.PROJECT_ROOT, cfg.CACHE_DIR)
+        path = os.path.join(cache_dir, f'rent_tables_{config_hash(config)}.pkl')
+        try:
+            with open(path, 'rb') as cache_file:
+                cache = pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            cache = None
+        if isinstance(cache, dict) and cache.get('version') == RENT_TABLES_VERSION and \
+                isinstance(cache.get('tables'), RentTables):
+            return cache['tables']
+
+        tables = RentTables(config=config)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as cache_file:
+                pickle.dump({'version': RENT_TABLES_VERSION, 'tables': tables}, cache_file)
+            os.replace(tmp_path, path)     # atomic, concurrent workers never read a partial file
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return tables
+
+
+def income_evaluation(tables: RentTables,
+                      horizon: float
+                      ) -> Callable:
+    """
+    Leaf evaluation for search: net worth plus the rent expected from the entrances owned over a horizon
+    :param tables: rent tables of the config
+    :param horizon: number of opponent turns the income is projected over
+    :return: evaluation(rules, data) -> value of every player
+    """
+
+    def evaluation(game_rules: rules.Rules,
+                   data: MutableSequence[int]
+                   ) -> list[float]:
+        layout = game_rules.layout
+        values = [float(game_rules.net_worth(data, p_id)) for p_id in range(game_rules.n_players)]
+        entrance_off, owner_off, star_off = layout.entrance_off, layout.owner_off, layout.star_off
+        entrance_rent = tables.entrance_rent
+        for cell_idx in range(layout.get_n_cells()):
+            h_id = data[entrance_off + cell_idx]
+            if h_id >= 0:
+                owner = data[owner_off + h_id]
+                if owner >= 0:
+                    values[owner] += horizon * entrance_rent[h_id][data[star_off + h_id]][cell_idx]
+        return values
+
+    return evaluation
@@ -0,0 +1,193 @@
+"""
+Contains Expectimax class and ExpectimaxAgent
+Exact search over the dice: chance nodes enumerate every die face with the precomputed transition table
+of the rules instead of sampling, decision nodes are max-n (each player maximizes its own value)
+
+Tree of a turn:
+    chance (move die) -> [chance (nights die) if rent is due] -> decision (cell action) -> next player
+The search makes and unmakes the transitions on a single buffer (see Rules.make_action) instead of copying it
+at every node. With a transposition table, the Zobrist hash of the buffer follows the same make / unmake
+(see Rules.key_delta) and the value of every chance node is stored and probed by hash and depth
+"""
+
+import game.model.state as state
+import game.model.rules as rules
+
+from typing import Callable, MutableSequence
+
+from game.ai.transposition import TranspositionTable
+
+
+def net_worth_evaluation(game_rules: rules.Rules,
+                         data: MutableSequence[int]
+                         ) -> list[float]:
+    """
+    Default leaf evaluation
+    :param game_rules: rules of the game
+    :param data: state buffer
+    :return: net worth of every player
+    """
+    return [float(game_rules.net_worth(data, p_id)) for p_id in range(game_rules.n_players)]
+
+
+class Expectimax:
+    """
+    Expectimax class
+    Depth is counted in turns: depth 1 evaluates the states right after the next roll of the next player
+    """
+
+    def __init__(self,
+                 game_rules: rules.Rules,
+                 depth: int = 2,
+                 evaluation: Callable = net_worth_evaluation,
+                 table: TranspositionTable = None):
+        """
+        :param game_rules: compiled rules of the game, with the transition table
+        :param depth: number of turns searched after the root decision
+        :param evaluation: evaluation(rules, data) -> value of every player, used at the leaves
+        :param table: values of the chance nodes searched, kept from one search to the next, None to disable
+        """
+        self.__rules: rules.Rules = game_rules
+        self.__depth: int = depth
+        self.__evaluation: Callable = evaluation
+        self.__table: TranspositionTable or None = table
+        # one action buffer per depth, so that decision nodes allocate nothing
+        self.__actions: list = [game_rules.new_action_buffer() for _ in range(depth + 2)]
+        # undo trail of the search buffer, see Rules.make_action
+        self.__trail: list[int] = []
+        self.nodes: int = 0
+
+    def search(self,
+               data: MutableSequence[int]
+               ) -> tuple[int, dict[int: list[float]]]:
+        """
+        Search from a decision node: current player landed and paid rent
+        :param data: state buffer, left untouched
+        :return: (best action, value of every player by action)
+        """
+        game_rules = self.__rules
+        p_id = data[state.CURRENT_PLAYER]
+        values = dict()
+        actions = self.__actions[self.__depth + 1]
+        # one buffer for the whole search, made and unmade in place
+        data = list(data)
+        trail = self.__trail
+        hashed = self.__table is not None
+        key = game_rules.state_key(data) if hashed else 0
+        for i in range(game_rules.generate_actions(data, actions)):
+            action = actions[i]
+            mark = len(trail)
+            game_rules.make_action(data, action, trail)
+            child_key = key ^ game_rules.key_delta(data, trail, mark) if hashed else 0
+            values[action] = self.__chance(data, self.__depth, child_key)
+            game_rules.unmake(data, trail, mark)
+        best = max(values.keys(), key=lambda a: values[a][p_id])
+        return best, values
+
+    def __decision(self,
+                   data: list[int],
+                   depth: int,
+                   key: int
+                   ) -> list[float]:
+        """
+        :param data: state buffer, current player to choose the cell action
+        :param depth: turns left after this one
+        :param key: Zobrist hash of the buffer, 0 without transposition table
+        :return: value of every player, after the best action of the current player
+        """
+        game_rules = self.__rules
+        p_id = data[state.CURRENT_PLAYER]
+        actions = self.__actions[depth]
+        trail = self.__trail
+        hashed = self.__table is not None
+        best = None
+        for i in range(game_rules.generate_actions(data, actions)):
+            mark = len(trail)
+            game_rules.make_action(data, actions[i], trail)
+            value = self.__chance(data, depth, key ^ game_rules.key_delta(data, trail, mark) if hashed else 0)
+            game_rules.unmake(data, trail, mark)
+            if best is None or value[p_id] > best[p_id]:
+                best = value
+        return best
+
+    def __chance(self,
+                 data: list[int],
+                 depth: int,
+                 key: int
+                 ) -> list[float]:
+        """
+        :param data: state buffer, current player about to roll
+        :param depth: turns left, including this one
+        :param key: Zobrist hash of the buffer, 0 without transposition table
+        :return: expected value of every player over the dice
+        """
+        game_rules = self.__rules
+        self.nodes += 1
+        if depth == 0 or game_rules.is_over(data):
+            return self.__evaluation(game_rules, data)
+        table = self.__table
+        if table is not None:
+            entry = table.probe(key, depth)
+            if entry is not None:
+                return entry.value
+
+        n_players = game_rules.n_players
+        layout = game_rules.layout
+        trail = self.__trail
+        expected = [0.] * n_players
+        face_p = 1. / rules.DIE_FACES
+        # cells reached by every die face, from the transition table
+        moves = game_rules.transition[data[layout.position_off + data[state.CURRENT_PLAYER]] + 1]
+        for die, (dest, _, _) in enumerate(moves, 1):
+            mark = len(trail)
+            game_rules.make_move(data, die, trail, dest)
+            move_key = key ^ game_rules.key_delta(data, trail, mark) if table is not None else 0
+            h_id = game_rules.rent_due(data) \
+                if data[layout.entrance_off + dest + 1] != state.NO_ENTRANCE else state.NO_OWNER
+            if h_id == state.NO_OWNER:
+                value = self.__decision(data, depth - 1, move_key)
+                for i in range(n_players):
+                    expected[i] += face_p * value[i]
+            else:
+                p = face_p * face_p
+                for nights in range(1, rules.DIE_FACES + 1):
+                    rent_mark = len(trail)
+                    broke = game_rules.make_rent(data, h_id, nights, trail)
+                    rent_key = move_key ^ game_rules.key_delta(data, trail, rent_mark) if table is not None else 0
+                    value = self.__chance(data, depth - 1, rent_key) if broke \
+                        else self.__decision(data, depth - 1, rent_key)
+                    game_rules.unmake(data, trail, rent_mark)
+                    for i in range(n_players):
+                        expected[i] += p * value[i]
+            game_rules.unmake(data, trail, mark)
+        if table is not None:
+            table.store(key, depth, expected)
+        return expected
+
+
+class ExpectimaxAgent:
+    """
+    AI agent choosing the action with the best expectimax value
+    """
+
+    def __init__(self,
+                 search: Expectimax):
+        """
+        :param search: expectimax search, bound to the rules of the game
+        """
+        self.__search: Expectimax = search
+
+    def choose_action(self,
+                      game_state: state.GameState
+                      ) -> int:
+        """
+        :param game_state: state with the current player to act
+        :return: best action
+        """
+        action, _ = self.__search.search(game_state.get_data().tolist())
+        return action
+
+    def close(self) -> None:
+        """
+        Nothing to release, the search runs in the calling thread
+        """
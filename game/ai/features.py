@@ -0,0 +1,142 @@
+"""
+Contains ObservationEncoder class
+Fixed-shape float32 observation of a game, the input of learning-based AI players
+
+Observation, flat, in this order:
+    position        n_players * n_cells     one-hot of the cell of each player, all zero if off board
+    current         n_players               one-hot of the player to act
+    owner           n_hotels * n_players    one-hot of the owner of each hotel, all zero if free
+    star            n_hotels                star level of each hotel / MAX_STARS
+    entrance        n_hotels * n_cells      entrance mask of each hotel, one per cell with an entrance
+    money           n_players               money of each player / money_scale
+Cells are indexed by cell_id + 1, as in the state buffer
+Every feature is read from the state buffer with array operations: encoding a batch of states costs a few
+NumPy calls, not a Python loop per state
+"""
+
+import numpy as np
+
+import game.model.state as state
+
+from typing import Sequence
+
+from game.model.game import Game
+
+MAX_STARS = 5
+
+
+class ObservationEncoder:
+    """
+    ObservationEncoder class
+    One encoder per state layout
+    """
+
+    def __init__(self,
+                 layout: state.StateLayout,
+                 money_scale: float = state.START_MONEY):
+        """
+        :param layout: layout of the state buffers encoded
+        :param money_scale: money divided by this value
+        """
+        self.__layout: state.StateLayout = layout
+        self.__money_scale: float = float(money_scale)
+        n_players, n_hotels, n_cells = layout.get_n_players(), layout.get_n_hotels(), layout.get_n_cells()
+
+        # slice of each feature in the observation
+        sizes = (('position', n_players * n_cells),
+                 ('current', n_players),
+                 ('owner', n_hotels * n_players),
+                 ('star', n_hotels),
+                 ('entrance', n_hotels * n_cells),
+                 ('money', n_players))
+        self.__slices: dict[str: slice] = dict()
+        start = 0
+        for name, size in sizes:
+            self.__slices[name] = slice(start, start + size)
+            start += size
+        self.__size: int = start
+
+        # flat index of cell 0 of each player in the position feature, and of each player in the owner feature
+        self.__position_base: np.ndarray = np.arange(n_players) * n_cells
+        self.__cell_bits: np.ndarray = np.arange(n_cells, dtype=np.uint32)
+        self.__player_ids: np.ndarray = np.arange(n_players)
+
+    def get_size(self) -> int:
+        """
+        :return: number of features of an observation
+        """
+        return self.__size
+
+    def get_slices(self) -> dict[str: slice]:
+        """
+        :return: slice of each feature in the observation, by feature name
+        """
+        return self.__slices
+
+    def new_batch(self,
+                  n_states: int
+                  ) -> np.ndarray:
+        """
+        :param n_states: number of states of the batch
+        :return: observation array to encode a batch into
+        """
+        return np.zeros((n_states, self.__size), dtype=np.float32)
+
+    def encode(self,
+               game: Game or state.GameState,
+               out: np.ndarray = None
+               ) -> np.ndarray:
+        """
+        :param game: game, or its state, to encode
+        :param out: observation array of shape (size, ), allocated if not specified
+        :return: observation of the game
+        """
+        game_state = game.get_state() if isinstance(game, Game) else game
+        if out is None:
+            out = np.empty(self.__size, dtype=np.float32)
+        data = np.frombuffer(game_state.get_data(), dtype=np.int32)[None, :]
+        self.encode_batch(data, out[None, :])
+        return out
+
+    def encode_batch(self,
+                     buffers: np.ndarray or Sequence,
+                     out: np.ndarray
+                     ) -> np.ndarray:
+        """
+        Encode many states at once into a preallocated array
+        :param buffers: state buffers, as an (n_states, layout size) int array (fastest) or a sequence of buffers
+        :param out: float32 observation array of shape (at least n_states, size), see new_batch
+        :return: the rows of out written
+        :raise AssertionError if the shapes do not match the layout
+        """
+        layout = self.__layout
+        data = np.asarray(buffers, dtype=np.int32)
+        n = len(data)
+        assert data.ndim == 2 and data.shape[1] == layout.size, \
+            f'Expected state buffers of size {layout.size}, got shape {data.shape}'
+        assert out.shape[0] >= n and out.shape[1] == self.__size, \
+            f'Expected an observation array of shape ({n}, {self.__size}), got {out.shape}'
+        n_players, n_hotels, n_cells = layout.get_n_players(), layout.get_n_hotels(), layout.get_n_cells()
+        s = self.__slices
+        out = out[:n]
+        out.fill(0.)
+        rows = np.arange(n)[:, None]
+
+        position = data[:, layout.position_off: layout.position_off + n_players]
+        on_board = position != state.OFF_BOARD
+        feature = out[:, s['position']]
+        r, p = np.nonzero(on_board)
+        feature[r, self.__position_base[p] + position[r, p] + 1] = 1.
+
+        out[rows, s['current'].start + data[:, state.CURRENT_PLAYER: state.CURRENT_PLAYER + 1]] = 1.
+
+        owner = data[:, layout.owner_off: layout.owner_off + n_hotels]
+        out[:, s['owner']] = (owner[:, :, None] == self.__player_ids).reshape(n, -1)
+
+        out[:, s['star']] = data[:, layout.star_off: layout.star_off + n_hotels] / MAX_STARS
+
+        masks = data[:, layout.entrance_mask_off: layout.entrance_mask_off + n_hotels].view(np.uint32)
+        out[:, s['entrance']] = ((masks[:, :, None] >> self.__cell_bits) & 1).reshape(n, -1)
+
+        out[:, s['money']] = data[:, layout.money_off: layout.money_off + n_players] / self.__money_scale
+        return out
@@ -0,0 +1,284 @@
+"""
+Contains the NumPy evaluators, InferenceBatcher class and NetworkAgent
+Value networks are evaluated in batches: callers submit encoded observations (see features) and get a future,
+a background thread groups the pending observations into one matrix until the batch is full or its deadline
+is reached, runs the evaluator once and resolves the futures of every caller
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+import game.model.state as state
+import game.model.rules as rules
+
+from concurrent.futures import Future
+
+from game.ai.features import ObservationEncoder
+
+
+class LinearEvaluator:
+    """
+    Linear value model: values = observations @ weights + bias
+    """
+
+    def __init__(self,
+                 weights: np.ndarray,
+                 bias: np.ndarray = None):
+        """
+        :param weights: (n_features, n_outputs) weights
+        :param bias: (n_outputs, ) bias, zero if not specified
+        """
+        self.weights: np.ndarray = np.asarray(weights, dtype=np.float32)
+        self.bias: np.ndarray = np.zeros(self.weights.shape[1], dtype=np.float32) if bias is None \
+            else np.asarray(bias, dtype=np.float32)
+
+    def __call__(self,
+                 observations: np.ndarray
+                 ) -> np.ndarray:
+        """
+        :param observations: (n, n_features) observations
+        :return: (n, n_outputs) values
+        """
+        return observations @ self.weights + self.bias
+
+
+class MLPEvaluator:
+    """
+    Multi-layer perceptron value model, ReLU on the hidden layers, linear output
+    """
+
+    def __init__(self,
+                 layers: list[tuple[np.ndarray, np.ndarray]]):
+        """
+        :param layers: (weights (n_in, n_out), bias (n_out, )) of each layer, input first
+        """
+        self.layers: list[tuple[np.ndarray, np.ndarray]] = [
+            (np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in layers
+        ]
+
+    def __call__(self,
+                 observations: np.ndarray
+                 ) -> np.ndarray:
+        """
+        :param observations: (n, n_features) observations
+        :return: (n, n_outputs) values
+        """
+        x = observations
+        last = len(self.layers) - 1
+        for i, (w, b) in enumerate(self.layers):
+            x = x @ w + b
+            if i < last:
+                np.maximum(x, 0., out=x)
+        return x
+
+    @staticmethod
+    def random(sizes: list[int],
+               seed: int = None
+               ) -> 'MLPEvaluator':
+        """
+        :param sizes: number of features, hidden layer sizes, number of outputs
+        :param seed: seed of the weights
+        :return: network with He initialized weights and zero bias
+        """
+        rng = np.random.default_rng(seed)
+        return MLPEvaluator([(rng.normal(0., np.sqrt(2. / n_in), (n_in, n_out)), np.zeros(n_out))
+                             for n_in, n_out in zip(sizes[:-1], sizes[1:])])
+
+    @staticmethod
+    def load(path: str) -> 'MLPEvaluator':
+        """
+        :param path: .npz file with the arrays w0, b0, w1, b1, ...
+        :return: network
+        """
+        with np.load(path) as arrays:
+            return MLPEvaluator([(arrays[f'w{i}'], arrays[f'b{i}']) for i in range(len(arrays.files) // 2)])
+
+    def save(self,
+             path: str
+             ) -> None:
+        """
+        :param path: .npz file, see load
+        """
+        np.savez(path, **{f'{k}{i}': a for i, layer in enumerate(self.layers) for k, a in zip('wb', layer)})
+
+
+class InferenceBatcher:
+    """
+    InferenceBatcher class
+    Thread-safe: any number of threads may submit at once
+    """
+
+    def __init__(self,
+                 evaluator,
+                 n_features: int,
+                 max_batch: int = 256,
+                 max_delay_ms: float = 2.):
+        """
+        :param evaluator: evaluator(observations (n, n_features)) -> values (n, n_outputs)
+        :param n_features: size of an observation
+        :param max_batch: most observations evaluated at once
+        :param max_delay_ms: longest time the first observation of a batch waits for others, in milliseconds
+        """
+        self.__evaluator = evaluator
+        self.__n_features: int = n_features
+        self.__max_batch: int = max_batch
+        self.__max_delay: float = max_delay_ms / 1000
+        # observations of the batch being gathered, copied from the requests
+        self.__batch: np.ndarray = np.zeros((max_batch, n_features), dtype=np.float32)
+        self.__requests: queue.SimpleQueue = queue.SimpleQueue()
+        self.__closed: bool = False
+        # submit and close: no request is queued after the stop request
+        self.__lock: threading.Lock = threading.Lock()
+        self.n_batches: int = 0
+        self.n_observations: int = 0
+        self.__thread: threading.Thread = threading.Thread(target=self.__serve, name='inference-batcher', daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self,
+               observations: np.ndarray
+               ) -> Future:
+        """
+        :param observations: one observation (n_features, ) or a block of them (n, n_features), n <= max_batch
+        :return: future of the values, (n_outputs, ) or (n, n_outputs) as the observations
+        :raise RuntimeError if the batcher is closed
+        :raise AssertionError if the observations do not fit in a batch
+        """
+        block = np.asarray(observations, dtype=np.float32)
+        single = block.ndim == 1
+        if single:
+            block = block[None, :]
+        assert block.shape[1] == self.__n_features and len(block) <= self.__max_batch, \
+            f'Expected at most {self.__max_batch} observations of size {self.__n_features}, got {block.shape}'
+        future = Future()
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError(f'Inference batcher closed')
+            self.__requests.put((block, single, future))
+        return future
+
+    def close(self) -> None:
+        """
+        Evaluate the observations already submitted, then stop the background thread
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__requests.put(None)
+        self.__thread.join()
+
+    def __serve(self) -> None:
+        """
+        Background thread: gather, evaluate, resolve, until the stop request
+        """
+        requests = self.__requests
+        pending = None
+        running = True
+        while running:
+            request = pending if pending is not None else requests.get()
+            pending = None
+            if request is None:
+                break
+            gathered = [request]
+            n = len(request[0])
+            deadline = time.perf_counter() + self.__max_delay
+            while n < self.__max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    request = requests.get(timeout=timeout) if timeout > 0 else requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    running = False
+                    break
+                if n + len(request[0]) > self.__max_batch:
+                    pending = request
+                    break
+                gathered.append(request)
+                n += len(request[0])
+            self.__evaluate(gathered, n)
+
+    def __evaluate(self,
+                   gathered: list[tuple[np.ndarray, bool, Future]],
+                   n: int
+                   ) -> None:
+        """
+        :param gathered: requests of the batch
+        :param n: number of observations of the batch
+        """
+        batch = self.__batch
+        start = 0
+        for block, _, _ in gathered:
+            batch[start: start + len(block)] = block
+            start += len(block)
+        try:
+            values = np.asarray(self.__evaluator(batch[:n]))
+        except Exception as e:
+            for _, _, future in gathered:
+                future.set_exception(e)
+            return
+        self.n_batches += 1
+        self.n_observations += n
+        start = 0
+        for block, single, future in gathered:
+            result = values[start: start + len(block)].copy()
+            start += len(block)
+            future.set_result(result[0] if single else result)
+
+
+class NetworkAgent:
+    """
+    AI agent choosing the action leading to the best value for itself, one batched evaluation per move
+    Values are the evaluator outputs, one per player
+    """
+
+    def __init__(self,
+                 game_rules: rules.Rules,
+                 encoder: ObservationEncoder,
+                 batcher: InferenceBatcher):
+        """
+        :param game_rules: compiled rules of the game
+        :param encoder: encoder of the states, on the layout of the rules
+        :param batcher: batcher of the value network, may be shared with other agents
+        """
+        self.__rules: rules.Rules = game_rules
+        self.__encoder: ObservationEncoder = encoder
+        self.__batcher: InferenceBatcher = batcher
+        self.__children: np.ndarray = np.zeros((game_rules.max_actions, game_rules.layout.size), dtype=np.int32)
+        self.__observations: np.ndarray = encoder.new_batch(game_rules.max_actions)
+
+    def choose_action(self,
+                      game_state: state.GameState
+                      ) -> int:
+        """
+        :param game_state: state with the current player to act
+        :return: action with the best value for the current player
+        """
+        game_rules = self.__rules
+        data = game_state.get_data().tolist()
+        actions = game_rules.legal_actions(data)
+        if len(actions) == 1:
+            return actions[0]
+        for i, a in enumerate(actions):
+            child = data[:]
+            game_rules.apply_action(child, a)
+            game_rules.end_turn(child)
+            self.__children[i] = child
+        observations = self.__encoder.encode_batch(self.__children[:len(actions)], self.__observations)
+        values = self.__batcher.submit(observations).result()
+        return actions[int(np.argmax(values[:, data[state.CURRENT_PLAYER]]))]
+
+    def close(self) -> None:
+        """
+        Stop the batcher once the game is over, the other agents sharing it are closed with the same game
+        """
+        self.__batcher.close()
@@ -0,0 +1,448 @@
+"""
+Contains MCTS class and MCTSAgent
+Monte Carlo Tree Search with chance nodes for the dice, on plain list copies of the state buffer
+
+Tree of a turn, as in expectimax:
+    decision (cell action of the current player) -> chance (next player rolls) -> decision | chance
+Decision nodes select with UCT or PUCT on the value of the player to act (max-n), chance nodes sample the dice
+with their true probabilities. Leaves are evaluated by rollouts, the value of a state is the win share of every
+player at the end of the rollout
+
+The search is anytime: it runs until the time budget or the iteration budget is spent, and the agent keeps
+the subtree of the state actually reached between two of its moves
+
+With a transposition table, every node carries the Zobrist hash of its state (see Rules.key_delta) and the
+rollouts of a leaf are averaged with those of the same state reached before, along another path or in an earlier
+tree: an entry holds the mean values of the state and its number of rollouts as depth
+"""
+
+import math
+import os
+import time
+
+import game.model.state as state
+import game.model.rules as rules
+
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Callable
+
+from game.ai.rollout import RolloutEngine
+from game.ai.transposition import TranspositionTable
+
+UCT = 'uct'
+PUCT = 'puct'
+
+# rollout engine of the worker process, received once from the parent by init_worker
+_worker_engine: RolloutEngine or None = None
+
+
+def init_worker(engine: RolloutEngine) -> None:
+    """
+    Worker initializer for leaf-parallel search: the engine is pickled once per worker
+    :param engine: rollout engine of the search
+    """
+    global _worker_engine
+    _worker_engine = engine
+    _worker_engine.seed(os.getpid())
+
+
+def leaf_values(data: list[int],
+                acting: bool
+                ) -> list[float]:
+    """
+    Worker entry point, one rollout from a leaf
+    :param data: state buffer of the leaf
+    :param acting: True if the leaf is a decision node
+    :return: win share of every player
+    """
+    return _worker_engine.values(_worker_engine.rollout(data, acting=acting))
+
+
+def uniform_prior(game_rules: rules.Rules,
+                  data: list[int],
+                  actions: list[int]
+                  ) -> list[float]:
+    """
+    Default PUCT prior
+    :param game_rules: rules of the game
+    :param data: state buffer
+    :param actions: legal actions
+    :return: probability of each action
+    """
+    return [1. / len(actions)] * len(actions)
+
+
+class ChanceNode:
+    """
+    Current player about to roll
+    """
+
+    __slots__ = ('data', 'key', 'n', 'w', 'children')
+
+    def __init__(self,
+                 data: list[int],
+                 n_players: int,
+                 key: int = 0):
+        self.data: list[int] = data
+        self.key: int = key
+        self.n: int = 0
+        self.w: list[float] = [0.] * n_players
+        # outcome of the dice (move die, nights die or 0) -> node reached
+        self.children: dict[tuple[int, int]: 'DecisionNode' or 'ChanceNode'] = dict()
+
+
+class DecisionNode:
+    """
+    Current player landed, paid the rent and is to choose the cell action
+    """
+
+    __slots__ = ('data', 'key', 'n', 'w', 'p_id', 'actions', 'prior', 'children')
+
+    def __init__(self,
+                 data: list[int],
+                 n_players: int,
+                 actions: list[int],
+                 prior: list[float],
+                 key: int = 0):
+        self.data: list[int] = data
+        self.key: int = key
+        self.n: int = 0
+        self.w: list[float] = [0.] * n_players
+        self.p_id: int = data[state.CURRENT_PLAYER]
+        self.actions: list[int] = actions
+        self.prior: list[float] = prior
+        # chance node reached by each action, None if not expanded yet
+        self.children: list[ChanceNode or None] = [None] * len(actions)
+
+
+class MCTS:
+    """
+    MCTS class
+    """
+
+    def __init__(self,
+                 engine: RolloutEngine,
+                 game_rules: rules.Rules,
+                 exploration: float = 1.4,
+                 mode: str = UCT,
+                 prior: Callable = uniform_prior,
+                 n_workers: int = 1,
+                 seed: int = None,
+                 table: TranspositionTable = None):
+        """
+        :param engine: rollout engine evaluating the leaves, bound to the same rules
+        :param game_rules: compiled rules of the game
+        :param exploration: exploration constant of UCT / PUCT
+        :param mode: UCT, or PUCT to weight exploration by the prior of each action
+        :param prior: prior(rules, data, actions) -> probability of each action, used by PUCT
+        :param n_workers: number of rollouts run in parallel processes at each leaf, 1 to stay in process
+        :param seed: seed of the dice sampled in the tree
+        :param table: mean rollout values of the leaves, kept from one search to the next, None to disable
+        :raise ValueError if the mode is unknown
+        """
+        if mode not in (UCT, PUCT):
+            raise ValueError(f'Unknown selection mode {mode}, expected {UCT} or {PUCT}')
+        self.__engine: RolloutEngine = engine
+        self.__rules: rules.Rules = game_rules
+        self.__exploration: float = exploration
+        self.__mode: str = mode
+        self.__prior: Callable = prior
+        self.__rng: Random = Random(seed)
+        self.__n_workers: int = n_workers
+        self.__table: TranspositionTable or None = table
+        # leaf-parallel rollouts: threads would be serialized by the GIL, processes are not
+        self.__pool: ProcessPoolExecutor or None = ProcessPoolExecutor(
+            max_workers=n_workers, initializer=init_worker, initargs=(engine,)) if n_workers > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker processes of the leaf-parallel mode
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def new_root(self,
+                 data: list[int]
+                 ) -> DecisionNode:
+        """
+        :param data: state buffer, current player to choose the cell action
+        :return: root of a new tree
+        """
+        data = list(data)
+        return self.__decision_node(data, self.__rules.state_key(data) if self.__table is not None else 0)
+
+    def run(self,
+            root: DecisionNode,
+            n_iterations: int = None,
+            time_ms: float = None
+            ) -> int:
+        """
+        Grow the tree until one of the budgets is spent, at least one must be given
+        :param root: root of the tree
+        :param n_iterations: maximum number of iterations
+        :param time_ms: maximum wall-clock time, in milliseconds
+        :return: number of iterations done
+        :raise AssertionError if no budget is specified
+        """
+        assert n_iterations or time_ms, f'No search budget specified'
+        deadline = time.perf_counter() + time_ms / 1000 if time_ms else None
+        done = 0
+        while n_iterations is None or done < n_iterations:
+            self.__iterate(root)
+            done += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        return done
+
+    @staticmethod
+    def best_action(root: DecisionNode) -> int:
+        """
+        :param root: root of a searched tree
+        :return: most visited action
+        """
+        visits = [child.n if child is not None else -1 for child in root.children]
+        return root.actions[visits.index(max(visits))]
+
+    def __decision_node(self,
+                        data: list[int],
+                        key: int
+                        ) -> DecisionNode:
+        game_rules = self.__rules
+        actions = game_rules.legal_actions(data)
+        prior = self.__prior(game_rules, data, actions) if self.__mode == PUCT else None
+        return DecisionNode(data, game_rules.n_players, actions, prior, key)
+
+    def __child_key(self,
+                    node: DecisionNode or ChanceNode,
+                    data: list[int],
+                    trail: list[int]
+                    ) -> int:
+        """
+        :param node: parent node
+        :param data: state buffer of the child, after the transitions recorded in the trail
+        :param trail: undo trail of the transitions from the state of the parent
+        :return: Zobrist hash of the child, 0 without transposition table
+        """
+        if self.__table is None:
+            return 0
+        return node.key ^ self.__rules.key_delta(data, trail, 0)
+
+    def __select(self,
+                 node: DecisionNode
+                 ) -> int:
+        """
+        :param node: decision node
+        :return: index of the action to follow, unexpanded actions first with UCT
+        """
+        children = node.children
+        p_id = node.p_id
+        c = self.__exploration
+        best, best_score = 0, -math.inf
+        if self.__mode == UCT:
+            log_n = math.log(node.n + 1)
+            for i, child in enumerate(children):
+                if child is None or child.n == 0:
+                    return i
+                score = child.w[p_id] / child.n + c * math.sqrt(log_n / child.n)
+                if score > best_score:
+                    best, best_score = i, score
+        else:
+            sqrt_n = math.sqrt(node.n + 1)
+            for i, child in enumerate(children):
+                n = child.n if child is not None else 0
+                q = child.w[p_id] / n if n else 0.
+                score = q + c * node.prior[i] * sqrt_n / (1 + n)
+                if score > best_score:
+                    best, best_score = i, score
+        return best
+
+    def __step(self,
+               node: ChanceNode
+               ) -> tuple[DecisionNode or ChanceNode, bool]:
+        """
+        Sample the dice of a chance node
+        :param node: chance node
+        :return: (child reached, True if the child was just created)
+        """
+        game_rules = self.__rules
+        rng = self.__rng
+        data = node.data
+        layout = game_rules.layout
+        move = int(rng.random() * rules.DIE_FACES) + 1
+        dest = (data[layout.position_off + data[state.CURRENT_PLAYER]] + move) % game_rules.ring_size
+        nights = 0
+        if data[layout.entrance_off + dest + 1] != state.NO_ENTRANCE:
+            nights = int(rng.random() * rules.DIE_FACES) + 1
+
+        child = node.children.get((move, nights))
+        if child is not None:
+            return child, False
+        landed = data[:]
+        trail = []
+        game_rules.make_move(landed, move, trail, dest)
+        h_id = game_rules.rent_due(landed) if nights else state.NO_OWNER
+        if h_id == state.NO_OWNER:
+            if nights:      # entrance without rent: the nights die does not matter
+                child = node.children.get((move, 0))
+                if child is not None:
+                    node.children[(move, nights)] = child
+                    return child, False
+                nights = 0
+            child = self.__decision_node(landed, self.__child_key(node, landed, trail))
+        elif game_rules.make_rent(landed, h_id, nights, trail):
+            child = ChanceNode(landed, game_rules.n_players, self.__child_key(node, landed, trail))
+        else:
+            child = self.__decision_node(landed, self.__child_key(node, landed, trail))
+        node.children[(move, nights)] = child
+        return child, True
+
+    def __iterate(self,
+                  root: DecisionNode
+                  ) -> None:
+        """
+        One selection, expansion, evaluation and backpropagation
+        :param root: root of the tree
+        """
+        game_rules = self.__rules
+        path = [root]
+        node = root
+        while True:
+            if isinstance(node, DecisionNode):
+                i = self.__select(node)
+                child = node.children[i]
+                if child is None:
+                    data = node.data[:]
+                    trail = []
+                    game_rules.make_action(data, node.actions[i], trail)
+                    child = node.children[i] = ChanceNode(data, game_rules.n_players,
+                                                          self.__child_key(node, data, trail))
+                    path.append(child)
+                    break
+                node = child
+            else:
+                if game_rules.is_over(node.data):
+                    break
+                node, created = self.__step(node)
+                if created:
+                    path.append(node)
+                    break
+            path.append(node)
+
+        values = self.__evaluate(path[-1])
+        for n in path:
+            n.n += 1
+            w = n.w
+            for p_id, v in enumerate(values):
+                w[p_id] += v
+
+    def __evaluate(self,
+                   leaf: DecisionNode or ChanceNode
+                   ) -> list[float]:
+        """
+        :param leaf: node to evaluate
+        :return: mean win share of every player, over one rollout per worker and the rollouts of the same state
+                 stored in the transposition table
+        """
+        acting = isinstance(leaf, DecisionNode)
+        engine = self.__engine
+        if self.__pool is None:
+            results = [engine.values(engine.rollout(leaf.data[:], acting=acting))]
+        else:
+            results = list(self.__pool.map(leaf_values, [leaf.data] * self.__n_workers,
+                                           [acting] * self.__n_workers))
+        n = len(results)
+        values = [sum(r[p_id] for r in results) for p_id in range(len(results[0]))]
+        table = self.__table
+        if table is None:
+            return [v / n for v in values]
+        entry = table.probe(leaf.key)
+        if entry is not None:
+            values = [v + m * entry.depth for v, m in zip(values, entry.value)]
+            n += entry.depth
+        values = [v / n for v in values]
+        table.store(leaf.key, n, values)
+        return values
+
+
+class MCTSAgent:
+    """
+    AI agent choosing the most visited action of an anytime MCTS
+    The subtree of the state reached is reused on the next move
+    """
+
+    def __init__(self,
+                 search: MCTS,
+                 time_ms: float = 500,
+                 n_iterations: int = None,
+                 reuse_depth: int = 16):
+        """
+        :param search: MCTS, bound to the rules of the game
+        :param time_ms: time per move, in milliseconds
+        :param n_iterations: iterations per move, None to rely on the time only
+        :param reuse_depth: maximum depth searched in the previous tree for the state reached
+        """
+        self.__search: MCTS = search
+        self.__time_ms: float = time_ms
+        self.__n_iterations: int = n_iterations
+        self.__reuse_depth: int = reuse_depth
+        self.__subtree: ChanceNode or None = None
+        self.reused: int = 0      # visits inherited by the last root
+
+    def __find(self,
+               data: list[int]
+               ) -> DecisionNode or None:
+        """
+        Find the state reached since the last move in the kept subtree
+        :param data: state buffer
+        :return: node of the state, None if not in the tree
+        """
+        level = [self.__subtree] if self.__subtree is not None else []
+        for _ in range(self.__reuse_depth):
+            next_level = []
+            for node in level:
+                if isinstance(node, DecisionNode):
+                    if node.data == data:
+                        return node
+                    next_level.extend(c for c in node.children if c is not None)
+                else:
+                    next_level.extend(node.children.values())
+            if not next_level:
+                break
+            level = next_level
+        return None
+
+    def choose_action(self,
+                      game_state: state.GameState
+                      ) -> int:
+        """
+        :param game_state: state with the current player to act
+        :return: most visited action
+        """
+        data = game_state.get_data().tolist()
+        root = self.__find(data)
+        self.reused = root.n if root is not None else 0
+        if root is None:
+            root = self.__search.new_root(data)
+        if len(root.actions) == 1:
+            self.__subtree = None
+            return root.actions[0]
+
+        self.__search.run(root, n_iterations=self.__n_iterations, time_ms=self.__time_ms)
+        action = self.__search.best_action(root)
+        self.__subtree = root.children[root.actions.index(action)]
+        return action
+
+    def close(self) -> None:
+        """
+        Stop the worker processes of the search, once the game is over
+        """
+        self.__search.close()
+        self.__subtree = None
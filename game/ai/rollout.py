@@ -0,0 +1,206 @@
+"""
+Contains RolloutEngine class and RolloutAgent
+Monte Carlo evaluation of the actions of the current player: each candidate action is applied
+and the game is played forward with a default policy, on a plain list copy of the state buffer
+"""
+
+import time
+import game.model.state as state
+import game.model.rules as rules
+
+from random import Random
+from typing import Callable
+
+
+class ActionStats:
+    """
+    Statistics of the rollouts started with one action
+    """
+
+    __slots__ = ('n', 'wins', 'net_worth')
+
+    def __init__(self):
+        self.n: int = 0
+        self.wins: float = 0.
+        self.net_worth: int = 0
+
+    def __repr__(self):
+        return f'ActionStats(n={self.n}, win_rate={self.get_win_rate():.3f}, ' \
+               f'net_worth={self.get_expected_net_worth():.1f})'
+
+    def get_win_rate(self) -> float:
+        """
+        :return: fraction of rollouts won, ties split among winners
+        """
+        return self.wins / self.n if self.n else 0.
+
+    def get_expected_net_worth(self) -> float:
+        """
+        :return: mean net worth at the end of the rollouts
+        """
+        return self.net_worth / self.n if self.n else 0.
+
+
+class RolloutEngine:
+    """
+    RolloutEngine class
+    Plays games forward from any state, to the end or to the turn horizon
+    """
+
+    def __init__(self,
+                 game_rules: rules.Rules,
+                 policy: Callable = rules.random_policy,
+                 max_turns: int = 30,
+                 seed: int = None):
+        """
+        :param game_rules: compiled rules of the game
+        :param policy: default policy, policy(rules, data, actions, rng) -> action
+        :param max_turns: number of turns played by a rollout before scoring by net worth
+        :param seed: seed of the dice and policy generator
+        """
+        self.__rules: rules.Rules = game_rules
+        self.__policy: Callable = policy
+        self.__max_turns: int = max_turns
+        self.__rng: Random = Random(seed)
+
+    def rollout(self,
+                data: list[int],
+                acting: bool = False
+                ) -> list[int]:
+        """
+        Play the game forward, in place
+        :param data: state buffer as a list, with the current player about to roll
+        :param acting: True if the current player already rolled and is to choose the cell action
+        :return: the same buffer, at the end of the rollout
+        """
+        game_rules = self.__rules
+        rng = self.__rng
+        policy = self.__policy
+        play_turn = game_rules.play_turn
+        if acting:
+            actions = game_rules.legal_actions(data)
+            if len(actions) > 1:
+                game_rules.apply_action(data, policy(game_rules, data, actions, rng))
+            game_rules.end_turn(data)
+        end_turn = data[state.TURN] + self.__max_turns
+        over = game_rules.is_over(data)
+        while not over and data[state.TURN] < end_turn:
+            # the game can only end when a player goes broke
+            if play_turn(data, rng, policy):
+                over = game_rules.is_over(data)
+        return data
+
+    def seed(self,
+             seed: int
+             ) -> None:
+        """
+        :param seed: new seed of the dice and policy generator, e.g. for copies of the engine in worker processes
+        """
+        self.__rng.seed(seed)
+
+    def values(self,
+               data: list[int]
+               ) -> list[float]:
+        """
+        :param data: state buffer at the end of a rollout
+        :return: win share of every player, ties split among winners
+        """
+        game_rules = self.__rules
+        worths = [game_rules.net_worth(data, i) for i in range(game_rules.n_players)]
+        best = max(worths)
+        share = 1. / worths.count(best)
+        return [share if w == best else 0. for w in worths]
+
+    def score(self,
+              data: list[int],
+              p_id: int
+              ) -> tuple[float, int]:
+        """
+        :param data: state buffer at the end of a rollout
+        :param p_id: id of the player to score
+        :return: (win share, net worth) of the player
+        """
+        game_rules = self.__rules
+        worths = [game_rules.net_worth(data, i) for i in range(game_rules.n_players)]
+        best = max(worths)
+        if worths[p_id] != best:
+            return 0., worths[p_id]
+        return 1. / worths.count(best), worths[p_id]
+
+    def evaluate(self,
+                 game_state: state.GameState,
+                 actions: list[int] = None,
+                 n_rollouts: int = None,
+                 time_ms: float = None
+                 ) -> dict[int: ActionStats]:
+        """
+        Evaluate the actions of the current player, once landed on a cell and rent paid
+        The budget is split round robin among the actions; at least one of n_rollouts and time_ms must be given
+        :param game_state: state to evaluate
+        :param actions: candidate actions, all legal actions if not specified
+        :param n_rollouts: maximum number of rollouts, over all actions
+        :param time_ms: maximum wall-clock time, in milliseconds
+        :return: statistics by action
+        :raise AssertionError if no budget is specified
+        """
+        assert n_rollouts or time_ms, f'No rollout budget specified'
+        game_rules = self.__rules
+        root = game_state.get_data().tolist()
+        p_id = root[state.CURRENT_PLAYER]
+        if actions is None:
+            actions = game_rules.legal_actions(root)
+        stats = {a: ActionStats() for a in actions}
+
+        deadline = time.perf_counter() + time_ms / 1000 if time_ms else None
+        done = 0
+        while n_rollouts is None or done < n_rollouts:
+            a = actions[done % len(actions)]
+            data = root[:]
+            game_rules.apply_action(data, a)
+            game_rules.end_turn(data)
+            win, worth = self.score(self.rollout(data), p_id)
+
+            a_stats = stats[a]
+            a_stats.n += 1
+            a_stats.wins += win
+            a_stats.net_worth += worth
+            done += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        return stats
+
+
+class RolloutAgent:
+    """
+    AI agent choosing the action with the best rollout win rate
+    """
+
+    def __init__(self,
+                 engine: RolloutEngine,
+                 n_rollouts: int = None,
+                 time_ms: float = 100):
+        """
+        :param engine: rollout engine, bound to the rules of the game
+        :param n_rollouts: rollouts per move
+        :param time_ms: time per move, in milliseconds
+        """
+        self.__engine: RolloutEngine = engine
+        self.__n_rollouts: int = n_rollouts
+        self.__time_ms: float = time_ms
+
+    def choose_action(self,
+                      game_state: state.GameState
+                      ) -> int:
+        """
+        :param game_state: state with the current player to act
+        :return: best action, by win rate then expected net worth
+        """
+        stats = self.__engine.evaluate(game_state, n_rollouts=self.__n_rollouts, time_ms=self.__time_ms)
+        return max(stats.keys(),
+                   key=lambda a: (stats[a].get_win_rate(), stats[a].get_expected_net_worth()))
+
+    def close(self) -> None:
+        """
+        Nothing to release, the rollouts run in the calling thread
+        """
@@ -0,0 +1,225 @@
+"""
+Contains RootParallelSearch class and RootParallelAgent
+Root parallelism: every worker process searches the same root independently, with its own random stream,
+and writes the statistics of the root actions to its row of a shared memory array; the parent sums the rows
+No tree is pickled: only the root state goes to the workers, and only the shared array comes back
+
+Shared array, float64, shape (n_workers, n_root_actions, 1 + n_players):
+    [visits, value of player 0, value of player 1, ...] for each worker and root action
+"""
+
+import numpy as np
+
+import game.model.state as state
+import game.model.rules as rules
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from game.ai.mcts import MCTS, UCT
+from game.ai.rollout import RolloutEngine
+
+ROOT_MCTS = 'mcts'
+ROOT_ROLLOUT = 'rollout'
+
+# search of the worker process, built once from the parent arguments by init_worker
+_worker_engine: RolloutEngine or None = None
+_worker_rules: rules.Rules or None = None
+_worker_options: dict or None = None
+
+
+def init_worker(engine: RolloutEngine,
+                game_rules: rules.Rules,
+                options: dict
+                ) -> None:
+    """
+    Worker initializer: engine and rules are pickled once per worker, not once per move
+    :param engine: rollout engine evaluating the leaves
+    :param game_rules: compiled rules of the game
+    :param options: kind of search and MCTS options
+    """
+    global _worker_engine, _worker_rules, _worker_options
+    _worker_engine, _worker_rules, _worker_options = engine, game_rules, options
+
+
+def search_root(shm_name: str,
+                shape: tuple[int, int, int],
+                row: int,
+                data: list[int],
+                n_iterations: int or None,
+                time_ms: float or None,
+                seed: int
+                ) -> int:
+    """
+    Worker entry point: search the root and write the statistics of its actions to a row of the shared array
+    :param shm_name: name of the shared memory block
+    :param shape: shape of the shared array
+    :param row: row of the worker
+    :param data: root state buffer, current player to choose the cell action
+    :param n_iterations: iterations (MCTS) or rollouts budget of the worker
+    :param time_ms: time budget of the worker, in milliseconds
+    :param seed: seed of the worker random streams
+    :return: number of iterations done
+    """
+    # workers share the resource tracker of the parent, which unlinks the block once merged
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        stats = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[row]
+        engine, game_rules, options = _worker_engine, _worker_rules, _worker_options
+        engine.seed(seed)
+        if options['kind'] == ROOT_MCTS:
+            search = MCTS(engine, game_rules, exploration=options['exploration'], mode=options['mode'], seed=seed)
+            root = search.new_root(data)
+            done = search.run(root, n_iterations=n_iterations, time_ms=time_ms)
+            for i, child in enumerate(root.children):
+                if child is not None:
+                    stats[i, 0] = child.n
+                    stats[i, 1:] = child.w
+        else:
+            game_state = state.GameState(game_rules.layout, array('i', data))
+            actions = game_rules.legal_actions(data)
+            results = engine.evaluate(game_state, actions=actions, n_rollouts=n_iterations, time_ms=time_ms)
+            p_id = data[state.CURRENT_PLAYER]
+            done = 0
+            for i, a in enumerate(actions):
+                stats[i, 0] = results[a].n
+                stats[i, 1 + p_id] = results[a].wins
+                done += results[a].n
+        del stats
+        return done
+    finally:
+        shm.close()
+
+
+class RootParallelSearch:
+    """
+    RootParallelSearch class
+    The worker processes are started once and kept for every move
+    """
+
+    def __init__(self,
+                 engine: RolloutEngine,
+                 game_rules: rules.Rules,
+                 n_workers: int,
+                 kind: str = ROOT_MCTS,
+                 exploration: float = 1.4,
+                 mode: str = UCT,
+                 seed: int = 0):
+        """
+        :param engine: rollout engine evaluating the leaves, copied to every worker
+        :param game_rules: compiled rules of the game
+        :param n_workers: number of worker processes, one search each
+        :param kind: ROOT_MCTS for a tree per worker, ROOT_ROLLOUT for flat rollouts
+        :param exploration: exploration constant of MCTS
+        :param mode: selection mode of MCTS, UCT or PUCT
+        :param seed: seed of the workers random streams, changed at every move
+        :raise ValueError if the kind is unknown
+        """
+        if kind not in (ROOT_MCTS, ROOT_ROLLOUT):
+            raise ValueError(f'Unknown root search {kind}, expected {ROOT_MCTS} or {ROOT_ROLLOUT}')
+        self.__rules: rules.Rules = game_rules
+        self.__n_workers: int = n_workers
+        self.__seed: int = seed
+        self.__pool: ProcessPoolExecutor or None = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_worker,
+            initargs=(engine, game_rules, {'kind': kind, 'exploration': exploration, 'mode': mode}))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker processes
+        """
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def search(self,
+               data: list[int],
+               n_iterations: int = None,
+               time_ms: float = None
+               ) -> tuple[list[int], np.ndarray]:
+        """
+        Search the root in every worker and merge the statistics
+        :param data: root state buffer, current player to choose the cell action
+        :param n_iterations: iterations budget of each worker
+        :param time_ms: time budget of each worker, in milliseconds
+        :return: (root actions, merged statistics (n_root_actions, 1 + n_players): visits then value sums)
+        :raise AssertionError if no budget is specified
+        """
+        assert n_iterations or time_ms, f'No search budget specified'
+        data = list(data)
+        actions = self.__rules.legal_actions(data)
+        if len(actions) == 1:
+            return actions, np.zeros((1, 1 + self.__rules.n_players))
+        shape = (self.__n_workers, len(actions), 1 + self.__rules.n_players)
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        try:
+            stats = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            stats.fill(0.)
+            futures = [self.__pool.submit(search_root, shm.name, shape, row, data, n_iterations, time_ms,
+                                          self.__seed * self.__n_workers + row)
+                       for row in range(self.__n_workers)]
+            wait(futures)
+            for f in futures:
+                f.result()      # raise the errors of the workers
+            merged = stats.sum(axis=0)
+            del stats
+        finally:
+            shm.close()
+            shm.unlink()
+        self.__seed += 1
+        return actions, merged
+
+    @staticmethod
+    def best_action(actions: list[int],
+                    merged: np.ndarray
+                    ) -> int:
+        """
+        :param actions: root actions
+        :param merged: merged statistics, see search
+        :return: most visited action over all workers
+        """
+        return actions[int(np.argmax(merged[:, 0]))]
+
+
+class RootParallelAgent:
+    """
+    AI agent choosing the most visited action over all the workers of a root-parallel search
+    """
+
+    def __init__(self,
+                 search: RootParallelSearch,
+                 time_ms: float = 500,
+                 n_iterations: int = None):
+        """
+        :param search: root-parallel search, bound to the rules of the game
+        :param time_ms: time per move, in milliseconds
+        :param n_iterations: iterations per move and per worker, None to rely on the time only
+        """
+        self.__search: RootParallelSearch = search
+        self.__time_ms: float = time_ms
+        self.__n_iterations: int = n_iterations
+
+    def choose_action(self,
+                      game_state: state.GameState
+                      ) -> int:
+        """
+        :param game_state: state with the current player to act
+        :return: most visited action
+        """
+        data = game_state.get_data().tolist()
+        actions, merged = self.__search.search(data, n_iterations=self.__n_iterations, time_ms=self.__time_ms)
+        return self.__search.best_action(actions, merged)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes of the search, once the game is over
+        """
+        self.__search.close()
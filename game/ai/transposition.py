@@ -0,0 +1,131 @@
+"""
+Contains TranspositionTable class
+Bounded cache of search results keyed by the Zobrist hash of the state (see GameState.get_key and Rules.key_delta)
+Probed and filled by Expectimax and MCTS
+"""
+
+from collections import OrderedDict
+
+LRU = 'lru'
+DEPTH = 'depth'
+
+
+class TTEntry:
+    """
+    Search result stored for a state
+    """
+
+    __slots__ = ('key', 'depth', 'value', 'action')
+
+    def __init__(self,
+                 key: int,
+                 depth: int,
+                 value: float,
+                 action: int or None):
+        """
+        :param key: Zobrist hash of the state
+        :param depth: depth of the search that produced the value
+        :param value: value of the state
+        :param action: best action found, None if not relevant
+        """
+        self.key: int = key
+        self.depth: int = depth
+        self.value: float = value
+        self.action: int or None = action
+
+    def __repr__(self):
+        return f'TTEntry(depth={self.depth}, value={self.value}, action={self.action})'
+
+
+class TranspositionTable:
+    """
+    TranspositionTable class
+    Two replacement schemes:
+        LRU: the least recently used entry is evicted when full
+        DEPTH: fixed array of slots indexed by key, an entry is replaced only by a search at least as deep
+    """
+
+    def __init__(self,
+                 capacity: int,
+                 replacement: str = LRU):
+        """
+        :param capacity: maximum number of entries
+        :param replacement: LRU or DEPTH
+        :raise ValueError if the replacement scheme is unknown
+        """
+        if replacement not in (LRU, DEPTH):
+            raise ValueError(f'Unknown replacement scheme {replacement}, expected {LRU} or {DEPTH}')
+        self.__capacity: int = capacity
+        self.__replacement: str = replacement
+        self.__lru: OrderedDict[int: TTEntry] = OrderedDict()
+        self.__slots: list[TTEntry or None] = [None] * capacity if replacement == DEPTH else []
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self):
+        if self.__replacement == LRU:
+            return len(self.__lru)
+        return sum(1 for e in self.__slots if e is not None)
+
+    def probe(self,
+              key: int,
+              depth: int = 0
+              ) -> TTEntry or None:
+        """
+        Look up a state
+        :param key: Zobrist hash of the state
+        :param depth: minimum depth of the stored search to be usable
+        :return: stored entry, None if missing or too shallow
+        """
+        if self.__replacement == LRU:
+            entry = self.__lru.get(key)
+            if entry is not None:
+                self.__lru.move_to_end(key)
+        else:
+            entry = self.__slots[key % self.__capacity]
+            if entry is not None and entry.key != key:
+                entry = None
+
+        if entry is None or entry.depth < depth:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self,
+              key: int,
+              depth: int,
+              value: float,
+              action: int = None
+              ) -> None:
+        """
+        Store the result of a search
+        :param key: Zobrist hash of the state
+        :param depth: depth of the search
+        :param value: value of the state
+        :param action: best action found
+        """
+        if self.__replacement == LRU:
+            lru = self.__lru
+            entry = lru.get(key)
+            if entry is not None:
+                if depth >= entry.depth:
+                    entry.depth, entry.value, entry.action = depth, value, action
+                lru.move_to_end(key)
+                return
+            lru[key] = TTEntry(key, depth, value, action)
+            if len(lru) > self.__capacity:
+                lru.popitem(last=False)
+        else:
+            idx = key % self.__capacity
+            entry = self.__slots[idx]
+            if entry is None or depth >= entry.depth:
+                self.__slots[idx] = TTEntry(key, depth, value, action)
+
+    def clear(self) -> None:
+        """
+        Remove every entry
+        """
+        self.__lru.clear()
+        self.__slots = [None] * self.__capacity if self.__replacement == DEPTH else []
+        self.hits = self.misses = 0
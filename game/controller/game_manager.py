@@ -0,0 +1,389 @@
+"""
+Contains GameManager class
+GameManager drives the turns of a game through the model classes:
+    1. roll the die, Board.move_player
+    2. resolve the cell reached: rent from Hotel.get_payments when standing on the entrance of another owner
+    3. Player.is_broke: broke players are removed from the board and the game, their hotels freed
+    4. the player chooses one action allowed by the cell type (AI agents, human prompt or default policy)
+    5. next player still on the board
+Dice are drawn in the same order as Rules.play_turn: for the same random stream, a game played by the manager
+and by the rules engine ends in the same state
+
+Headless mode does no I/O and never builds a __repr__: human seats are played by the default policy, and so are
+the AI seats unless the agents are asked for (use_agents=True), as the searches cost far more than the turn loop
+Watch mode prints the board after every turn, rendered incrementally (see show)
+simulate plays whole games on the raw state buffer with the rules engine, for thousands of games per second
+The agents may own worker processes and threads, the replay an open file: play releases them on return, callers driving the turns
+themselves call close once the game is over (or use the manager as a context manager)
+"""
+
+import random
+
+import game.model.player as player
+import game.model.rules as rules
+import game.model.state as state
+
+from easydict import EasyDict
+from typing import Callable
+
+from game.ai.agents import attach_agents
+from game.model.game import Game
+from game.simulation.replay import ReplayWriter
+from game.view.cli.show import show_board
+from game.view.player_interface import AiInterface, HumanInterface
+from utils.compiled_config import get_compiled
+
+
+class GameManager:
+    """
+    GameManager class
+    """
+
+    def __init__(self,
+                 config: EasyDict,
+                 headless: bool = False,
+                 seed: int = None,
+                 policy: Callable = rules.greedy_policy,
+                 use_agents: bool = None,
+                 recorder: Callable = None,
+                 watch: bool = False,
+                 replay: str = None):
+        """
+        :param config: global config dictionary
+        :param headless: True to play without any I/O, human seats played by the policy
+        :param seed: seed of the dice and of the agents
+        :param policy: policy(rules, data, actions, rng) -> action of the seats without an agent
+        :param use_agents: False to play every seat with the policy, AI agents included,
+                           None for agents in interactive mode only: headless games are played fast by the policy
+        :param recorder: recorder(data, p_id, move, nights, action) called at the end of every turn,
+                         see Rules.play_turn and replay
+        :param watch: True to print the board after every turn, ignored in headless mode
+        :param replay: path of a binary replay the game is recorded to, overwritten, see replay
+        :raise AssertionError if both a recorder and a replay are given
+        """
+        assert recorder is None or replay is None, f'Record the game with a recorder or a replay, not both'
+        self.__config: EasyDict = config
+        self.__headless: bool = headless
+        self.__rng: random.Random = random.Random(seed)
+        self.__policy: Callable = policy
+        if use_agents is None:
+            use_agents = not headless
+        self.__use_agents: bool = use_agents
+        self.__recorder: Callable = recorder
+        self.__watch: bool = watch and not headless
+        self.__compiled = get_compiled(config)
+
+        self.__game: Game = Game(config=config)
+        self.__state: state.GameState = self.__game.get_state()
+        self.__rules: rules.Rules = rules.Rules(config=config, layout=self.__state.get_layout())
+        # players by id, removed players included, to resolve the current player of the state
+        self.__players: list[player.Player] = sorted(self.__game.get_player_list().values(),
+                                                     key=lambda p: p.get_id())
+        if use_agents:
+            attach_agents(self.__game, config, self.__rules, seed=seed)
+        # replay written as the turns are played, closed with the agents
+        self.__replay: ReplayWriter or None = None
+        if replay is not None:
+            self.__replay = ReplayWriter(replay, self.__rules)
+            self.__replay.begin_game(self.__state.get_data())
+            self.__recorder = self.__replay.record_turn
+        # (player, move, nights, broke) of the turn begun and not finished yet
+        self.__turn: tuple[player.Player, int, int, bool] or None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the worker processes and threads of the agents, removed players included, and close the replay
+        """
+        for p in self.__players:
+            agent = self.get_agent(p)
+            if agent is not None:
+                agent.close()
+        if self.__replay is not None:
+            self.__replay.close()
+
+    def get_game(self) -> Game:
+        """
+        :return: game driven by the manager
+        """
+        return self.__game
+
+    def get_rules(self) -> rules.Rules:
+        """
+        :return: rules engine on the state of the game
+        """
+        return self.__rules
+
+    def is_over(self) -> bool:
+        """
+        :return: True if at most one player is left in the game
+        """
+        return len(self.__game.get_player_list()) <= 1
+
+    def get_current_player(self) -> player.Player:
+        """
+        :return: player whose turn it is
+        """
+        return self.__players[self.__state.get_current_player()]
+
+    def begin_turn(self) -> list[int]:
+        """
+        First half of a turn, up to the cell action: roll, move, rent and bankruptcy
+        Callers choosing the actions themselves (e.g. the server) call begin_turn, then finish_turn
+        :return: legal actions of the current player, empty if the player went broke
+        :raise AssertionError if the previous turn is not finished
+        """
+        assert self.__turn is None, f'Turn already begun, call finish_turn first'
+        game, game_state, game_rules = self.__game, self.__state, self.__rules
+        board = game.get_board()
+        rng = self.__rng
+        p = self.get_current_player()
+
+        # 1. roll and move
+        move = game_rules.roll(rng)
+        board.move_player(p, delta=move)
+
+        # 2. rent, rolling the nights
+        nights = 0
+        h = board.rent_due(p)
+        if h is not None:
+            nights = game_rules.roll(rng)
+            amount = h.get_payments()[h.get_star_level() - 1][nights - 1]
+            p.change_money(-amount)
+            game.get_player(name=h.get_owner()).change_money(amount)
+
+        # 3. bankruptcy
+        broke = p.is_broke()
+        self.__turn = (p, move, nights, broke)
+        if broke:
+            self.__eliminate(p)
+            return []
+        return game_rules.legal_actions(game_state.get_data())
+
+    def finish_turn(self,
+                    action: int = rules.PASS
+                    ) -> bool:
+        """
+        Second half of a turn: cell action, then next player
+        :param action: legal action of the current player, as returned by begin_turn
+        :return: True if the player went broke during the turn
+        :raise AssertionError if no turn is begun
+        """
+        assert self.__turn is not None, f'No turn begun, call begin_turn first'
+        p, move, nights, broke = self.__turn
+        self.__turn = None
+        # 4. cell action
+        if not broke:
+            self.__apply_action(p, action)
+        else:
+            action = rules.PASS
+        if self.__recorder is not None:
+            self.__recorder(self.__state.get_data(), p.get_id(), move, nights, action)
+        if not self.__headless:
+            self.__report(p, move, nights, action, broke)
+        if self.__watch:
+            print(show_board(self.__game.get_board()))
+
+        # 5. next player on the board
+        self.__end_turn(p)
+        return broke
+
+    def play_turn(self) -> bool:
+        """
+        Play a whole turn of the current player
+        :return: True if the player went broke during the turn
+        """
+        actions = self.begin_turn()
+        action = self.__choose_action(self.get_current_player(), actions) if len(actions) > 1 else rules.PASS
+        return self.finish_turn(action)
+
+    def play(self,
+             max_turns: int = None
+             ) -> list[str]:
+        """
+        Play until one player is left or the turn horizon is reached, then close the agents
+        :param max_turns: turn horizon, None to play to the end
+        :return: names of the winners: last player standing, or best net worth at the horizon
+        """
+        if not self.__headless:
+            print(self.__game)
+        game_state = self.__state
+        try:
+            while not self.is_over() and (max_turns is None or game_state.get_turn() < max_turns):
+                self.play_turn()
+        finally:
+            self.close()
+        winners = self.get_winners()
+        if not self.__headless:
+            print(f'Winner: {", ".join(winners)}')
+        return winners
+
+    def get_winners(self) -> list[str]:
+        """
+        :return: names of the players with the best net worth among those still in the game
+        """
+        data = self.__state.get_data()
+        worth = {p.get_name(): self.__rules.net_worth(data, p.get_id()) for p in self.__game.get_player_list().values()}
+        best = max(worth.values())
+        return [name for name, w in worth.items() if w == best]
+
+    def simulate(self,
+                 n_games: int,
+                 max_turns: int = 500,
+                 seed: int = None
+                 ) -> list[list[int]]:
+        """
+        Play whole games with the default policy on raw copies of the initial state, nothing is built per game
+        The game of the manager is left untouched
+        :param n_games: number of games
+        :param max_turns: turn horizon of each game
+        :param seed: seed of the dice, the stream of the manager if not specified
+        :return: net worth of every player id at the end of each game
+        """
+        game_rules = self.__rules
+        rng = self.__rng if seed is None else random.Random(seed)
+        policy = self.__policy
+        play_turn, is_over, net_worth = game_rules.play_turn, game_rules.is_over, game_rules.net_worth
+        start = self.__state.get_layout().new_buffer().tolist()
+        n_players = game_rules.n_players
+        results = []
+        for _ in range(n_games):
+            data = start[:]
+            while data[state.TURN] < max_turns:
+                if play_turn(data, rng, policy) and is_over(data):
+                    break
+            results.append([net_worth(data, p_id) for p_id in range(n_players)])
+        return results
+
+    def get_agent(self,
+                  p: player.Player):
+        """
+        :param p: player
+        :return: agent playing the player, None for humans and when the agents are not used
+        """
+        ui = p.get_ui()
+        if self.__use_agents and isinstance(ui, AiInterface):
+            return ui.get_agent()
+        return None
+
+    def policy_action(self,
+                      actions: list[int]
+                      ) -> int:
+        """
+        :param actions: legal actions of the current player
+        :return: action chosen by the default policy
+        """
+        return self.__policy(self.__rules, self.__state.get_data(), actions, self.__rng)
+
+    def __choose_action(self,
+                        p: player.Player,
+                        actions: list[int]
+                        ) -> int:
+        """
+        :param p: current player
+        :param actions: legal actions, more than one
+        :return: action chosen by the agent of the player, the human at the prompt or the default policy
+        """
+        agent = self.get_agent(p)
+        if agent is not None:
+            return agent.choose_action(self.__state)
+        ui = p.get_ui()
+        if not self.__headless and isinstance(ui, HumanInterface):
+            return ui.choose_action(actions, [self.describe(a) for a in actions])
+        return self.policy_action(actions)
+
+    def __apply_action(self,
+                       p: player.Player,
+                       action: int
+                       ) -> None:
+        """
+        Apply a legal action through the model classes, as Rules.apply_action
+        :param p: current player
+        :param action: encoded action
+        """
+        game = self.__game
+        kind, h_id = self.__rules.decode(action)
+        if kind == rules.PASS:
+            return
+        h = game.get_hotel(name=self.__state.get_layout().get_hotel_names()[h_id])
+        c = game.get_board().find_player_pos(p)
+        cell_type = c.get_type()
+        if kind == rules.BUY_LAND:
+            p.change_money(-h.get_land_cost())
+            h.set_owner(p.get_name())
+            p.add_property(h)
+        elif kind == rules.BUILD:
+            name, cost = next(iter(h.get_upgrade_costs().items()))
+            if cell_type != rules.FREE_STAGE:
+                p.change_money(-cost)
+            h.upgrade(self.__compiled.upgrade_ids[name])
+        elif kind == rules.BUY_ENTRANCE:
+            if cell_type != rules.FREE_ENTRANCE:
+                p.change_money(-h.get_entrance_cost())
+            c.add_entrance(h)
+
+    def __eliminate(self,
+                    p: player.Player
+                    ) -> None:
+        """
+        Remove a broke player from the board and the game, and free the properties
+        :param p: broke player
+        """
+        game = self.__game
+        for h in game.get_player_hotels(name=p.get_name()):
+            h.free_property()
+            p.remove_property(h=h)
+        game.get_board().remove_player(p)
+        game.remove_player(p=p)
+
+    def __end_turn(self,
+                   p: player.Player
+                   ) -> None:
+        """
+        Pass the turn to the next player still on the board
+        :param p: player who played the turn
+        """
+        game_state = self.__state
+        n_players = len(self.__players)
+        p_id = p.get_id()
+        for _ in range(n_players):
+            p_id = (p_id + 1) % n_players
+            if game_state.get_position(p_id) != state.OFF_BOARD:
+                break
+        game_state.set_current_player(p_id)
+        game_state.set_turn(game_state.get_turn() + 1)
+
+    def describe(self,
+                 action: int
+                 ) -> str:
+        """
+        :param action: encoded action
+        :return: readable description of the action
+        """
+        kind, h_id = self.__rules.decode(action)
+        if kind == rules.PASS:
+            return 'Pass'
+        name = self.__state.get_layout().get_hotel_names()[h_id]
+        return {rules.BUY_LAND: 'Buy the land of', rules.BUILD: 'Build on', rules.BUY_ENTRANCE: 'Buy an entrance of'}[
+            kind] + f' {name}'
+
+    def __report(self,
+                 p: player.Player,
+                 move: int,
+                 nights: int,
+                 action: int,
+                 broke: bool
+                 ) -> None:
+        """
+        Print the summary of a turn
+        """
+        line = f'Turn {self.__state.get_turn()}: {p.get_name()} rolls {move}'
+        if nights:
+            line += f', pays {nights} nights'
+        line += ', is broke and leaves the game' if broke else f', {self.describe(action)}'
+        print(f'{line} (money: {p.get_money()})')
@@ -0,0 +1,576 @@
+"""
+Contains GameServer and Table classes
+One asyncio process hosts many tables (games), over a local TCP or Unix socket
+Each table is driven by a headless GameManager in its own task: human seats wait for the action of the client
+that joined them, AI turns run in an executor so that a slow search never blocks the other tables
+
+Protocol: one JSON object per line, both ways
+    requests, answered with {"ok": true, ...} or {"ok": false, "error": ...}, "id" echoed if given:
+        {"op": "create", "humans": [names], "seed": int, "max_turns": int}  -> "table", "players"
+            new table, seats not listed in humans are played by AI agents, the table starts at once
+        {"op": "join", "table": id, "player": name}     take a human seat, receive the table events
+        {"op": "watch", "table": id}                    receive the table events without playing
+        {"op": "act", "table": id, "choice": idx}       answer a prompt with the index of the action
+        {"op": "state", "table": id}                    -> "state", full state of the table
+        {"op": "sync", "table": id, "version": int}     -> "delta", receive the delta events, see sync
+        {"op": "ack", "table": id, "version": int}      last version applied by the client
+        {"op": "list"}                                  -> "tables", id and status of every table
+    finished tables, over, failed or stopped, stop counting against max_tables, the last max_finished of them are
+    kept for state and list
+    events, pushed to the clients of a table:
+        {"event": "prompt", "table", "player", "actions": [descriptions]}  to the human to act only
+        {"event": "turn", "table", "turn", "player", "position", "action", "broke", "money"}
+        {"event": "delta", "table", "delta"}  after every turn, to the synced clients only
+        {"event": "over", "table", "winners"}
+        {"event": "error", "table", "error"}  the game stopped on an error, no over event follows
+    deltas are base64 of the encoding of sync, from the last version acknowledged by the client
+Tables may be recorded as binary replays, table_<id>.bin in the replay directory, complete once the game is over
+"""
+
+import asyncio
+import base64
+import json
+import itertools
+import os
+
+import game.model.rules as rules
+
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable
+from easydict import EasyDict
+
+from game.controller.game_manager import GameManager
+from game.model.sync import StateSync
+
+ENCODING = 'utf-8'
+
+
+class Connection:
+    """
+    Client connection, writes one JSON object per line
+    """
+
+    def __init__(self,
+                 writer: asyncio.StreamWriter):
+        """
+        :param writer: stream of the client
+        """
+        self.__writer: asyncio.StreamWriter = writer
+
+    async def send(self,
+                   message: dict
+                   ) -> None:
+        """
+        :param message: JSON serializable message
+        """
+        if self.__writer.is_closing():
+            return
+        self.__writer.write(json.dumps(message, separators=(',', ':')).encode(ENCODING) + b'\n')
+        try:
+            await self.__writer.drain()
+        except ConnectionError:
+            pass
+
+
+class Table:
+    """
+    Table class
+    A game, the clients playing its human seats and the clients watching it
+    """
+
+    def __init__(self,
+                 table_id: int,
+                 manager: GameManager,
+                 humans: list[str],
+                 executor: Executor,
+                 max_turns: int = None,
+                 on_over: Callable = None):
+        """
+        :param table_id: id of the table on the server
+        :param manager: headless manager of the game
+        :param humans: names of the seats played by clients
+        :param executor: executor of the AI turns
+        :param max_turns: turn horizon, None to play to the end
+        :param on_over: on_over(table) called once the game is over and the clients are told, also when it stops
+                        on an error or is cancelled
+        """
+        self.__id: int = table_id
+        self.__on_over: Callable = on_over
+        self.__manager: GameManager = manager
+        self.__executor: Executor = executor
+        self.__max_turns: int = max_turns
+        # human seat -> connection of the client playing it, None until joined
+        self.__seats: dict[str: Connection or None] = {name: None for name in humans}
+        self.__joined: dict[str: asyncio.Event] = {name: asyncio.Event() for name in humans}
+        self.__watchers: list[Connection] = []
+        self.__sync: StateSync = StateSync(manager.get_game().get_state().get_layout())
+        # synced client -> last version it acknowledged
+        self.__synced: dict[Connection: int] = dict()
+        # (player name, legal actions, future of the choice) of the prompt waiting for a client
+        # the future is resolved with None if the client leaves
+        self.__prompt: tuple[str, list[int], asyncio.Future] or None = None
+        self.__winners: list[str] or None = None
+        self.__error: str or None = None
+        self.__task: asyncio.Task or None = None
+
+    def get_id(self) -> int:
+        """
+        :return: id of the table on the server
+        """
+        return self.__id
+
+    def get_manager(self) -> GameManager:
+        """
+        :return: manager of the game of the table
+        """
+        return self.__manager
+
+    def get_status(self) -> str:
+        """
+        :return: 'over', 'error' or 'playing'
+        """
+        if self.__error is not None:
+            return 'error'
+        return 'over' if self.__winners is not None else 'playing'
+
+    def get_winners(self) -> list[str] or None:
+        """
+        :return: names of the winners, None if the game is not over
+        """
+        return self.__winners
+
+    def start(self) -> None:
+        """
+        Start playing in a new task of the running loop
+        """
+        self.__task = asyncio.get_running_loop().create_task(self.run())
+
+    def stop(self) -> asyncio.Task or None:
+        """
+        Cancel the task of the table, on_over is called once the task handles the cancellation
+        :return: task of the table, to await the end of, None if not started
+        """
+        if self.__task is not None:
+            self.__task.cancel()
+        return self.__task
+
+    def join(self,
+             name: str,
+             connection: Connection
+             ) -> None:
+        """
+        :param name: human seat taken
+        :param connection: client playing the seat
+        :raise KeyError if the seat is not a human seat
+        :raise ValueError if the seat is already taken
+        """
+        if name not in self.__seats:
+            raise KeyError(f'{name} is not a human seat of table {self.__id}')
+        if self.__seats[name] is not None:
+            raise ValueError(f'Seat {name} of table {self.__id} is already taken')
+        self.__seats[name] = connection
+        self.__watchers.append(connection)
+        self.__joined[name].set()
+
+    def watch(self,
+              connection: Connection
+              ) -> None:
+        """
+        :param connection: client receiving the events of the table
+        """
+        if connection not in self.__watchers:
+            self.__watchers.append(connection)
+
+    def leave(self,
+              connection: Connection
+              ) -> None:
+        """
+        Forget a closed client: its seats are free again
+        :param connection: client
+        """
+        if connection in self.__watchers:
+            self.__watchers.remove(connection)
+        self.__synced.pop(connection, None)
+        for name, c in self.__seats.items():
+            if c is connection:
+                self.__seats[name] = None
+                self.__joined[name].clear()
+                if self.__prompt is not None and self.__prompt[0] == name and not self.__prompt[2].done():
+                    self.__prompt[2].set_result(None)
+
+    def act(self,
+            connection: Connection,
+            choice: int
+            ) -> None:
+        """
+        :param connection: client answering the prompt
+        :param choice: index of the action among the ones prompted
+        :raise ValueError if the client is not prompted or the choice is out of range
+        """
+        if self.__prompt is None or self.__seats.get(self.__prompt[0]) is not connection:
+            raise ValueError(f'No action expected from this client on table {self.__id}')
+        name, actions, future = self.__prompt
+        if not 0 <= choice < len(actions):
+            raise ValueError(f'Expected a choice between 0 and {len(actions) - 1}')
+        if not future.done():
+            future.set_result(actions[choice])
+
+    def sync(self,
+             connection: Connection,
+             version: int = 0
+             ) -> str:
+        """
+        Send the delta events to the client from now on, with the other events of the table
+        :param connection: client keeping a replica of the state
+        :param version: version of the replica of the client, 0 if none
+        :return: delta bringing the replica up to date, base64
+        """
+        self.watch(connection)
+        self.ack(connection, version)
+        self.__sync.commit(self.__manager.get_game().get_state().get_data())
+        return base64.b64encode(self.__sync.delta(version)).decode('ascii')
+
+    def ack(self,
+            connection: Connection,
+            version: int
+            ) -> None:
+        """
+        :param connection: client keeping a replica of the state
+        :param version: last version applied by the client
+        """
+        self.__synced[connection] = version
+
+    def dump(self) -> dict:
+        """
+        :return: full state of the game, JSON serializable
+        """
+        game = self.__manager.get_game()
+        game_state = game.get_state()
+        layout = game_state.get_layout()
+        names = layout.get_player_names()[:layout.get_n_players()]
+        return {
+            'turn': game_state.get_turn(),
+            'current': names[game_state.get_current_player()],
+            'players': {name: {'money': game_state.get_money(p_id), 'position': game_state.get_position(p_id)}
+                        for p_id, name in enumerate(names)},
+            'hotels': {h.get_name(): {'owner': h.get_owner(), 'star': h.get_star_level()}
+                       for h in game.get_hotel_list().values()},
+        }
+
+    async def broadcast(self,
+                        message: dict
+                        ) -> None:
+        """
+        :param message: event sent to every client of the table
+        """
+        for connection in list(self.__watchers):
+            await connection.send(message)
+
+    async def __choose(self,
+                       actions: list[int]
+                       ) -> int:
+        """
+        :param actions: legal actions of the current player, more than one
+        :return: action of the agent, run in the executor, or of the client of the human seat
+        """
+        manager = self.__manager
+        p = manager.get_current_player()
+        name = p.get_name()
+        if name not in self.__seats:
+            agent = manager.get_agent(p)
+            if agent is None:
+                return manager.policy_action(actions)
+            game_state = manager.get_game().get_state()
+            return await asyncio.get_running_loop().run_in_executor(self.__executor, agent.choose_action, game_state)
+
+        while True:
+            await self.__joined[name].wait()
+            future = asyncio.get_running_loop().create_future()
+            self.__prompt = (name, actions, future)
+            await self.__seats[name].send({'event': 'prompt', 'table': self.__id, 'player': name,
+                                           'actions': [manager.describe(a) for a in actions]})
+            action = await future
+            self.__prompt = None
+            # None: the client left while prompted, wait for the seat to be taken again
+            if action is not None:
+                return action
+
+    async def run(self) -> None:
+        """
+        Play the game to the end, then call on_over whatever the end: game over, error or cancellation
+        An error, e.g. raised by an agent, is sent to the clients of the table instead of the over event
+        """
+        try:
+            await self.__play()
+        except asyncio.CancelledError:
+            self.__error = f'Table {self.__id} stopped'
+            raise
+        except Exception as e:
+            self.__error = str(e).strip('\'"') or type(e).__name__
+            await self.broadcast({'event': 'error', 'table': self.__id, 'error': self.__error})
+        finally:
+            if self.__on_over is not None:
+                self.__on_over(self)
+
+    async def __play(self) -> None:
+        """
+        Play the game to the end, sending the events of every turn
+        """
+        manager = self.__manager
+        game_state = manager.get_game().get_state()
+        while not manager.is_over() and (self.__max_turns is None or game_state.get_turn() < self.__max_turns):
+            p = manager.get_current_player()
+            turn = game_state.get_turn()
+            actions = manager.begin_turn()
+            action = await self.__choose(actions) if len(actions) > 1 else rules.PASS
+            position = game_state.get_position(p.get_id())
+            broke = manager.finish_turn(action)
+            await self.broadcast({'event': 'turn', 'table': self.__id, 'turn': turn, 'player': p.get_name(),
+                                  'position': position, 'action': manager.describe(action), 'broke': broke,
+                                  'money': game_state.get_money(p.get_id())})
+            if self.__synced:
+                self.__sync.commit(game_state.get_data())
+                for connection, version in list(self.__synced.items()):
+                    await connection.send({'event': 'delta', 'table': self.__id,
+                                           'delta': base64.b64encode(self.__sync.delta(version)).decode('ascii')})
+            # let the other tables and the clients run between two turns
+            await asyncio.sleep(0)
+        self.__winners = manager.get_winners()
+        await self.broadcast({'event': 'over', 'table': self.__id, 'winners': self.__winners})
+
+
+class GameServer:
+    """
+    GameServer class
+    """
+
+    def __init__(self,
+                 config: EasyDict,
+                 executor: Executor = None,
+                 max_tables: int = 1024,
+                 max_finished: int = 1024,
+                 replay_dir: str = None):
+        """
+        :param config: global config dictionary or argparse namespace, template of the config of every table
+        :param executor: executor of the AI turns, a thread pool if not specified
+        :param max_tables: most tables playing at once
+        :param max_finished: most finished tables kept for the state and list requests, oldest evicted first
+        :param replay_dir: directory of the replay files, one per table, None to not record
+        """
+        self.__config: EasyDict = config if isinstance(config, EasyDict) else EasyDict(vars(config))
+        self.__executor: Executor = executor if executor is not None else ThreadPoolExecutor()
+        self.__max_tables: int = max_tables
+        self.__max_finished: int = max_finished
+        self.__replay_dir: str or None = replay_dir
+        if replay_dir is not None:
+            os.makedirs(replay_dir, exist_ok=True)
+        # tables playing, and finished tables by end order
+        self.__tables: dict[int: Table] = dict()
+        self.__finished: OrderedDict[int: Table] = OrderedDict()
+        self.__ids = itertools.count()
+        self.__server: asyncio.AbstractServer or None = None
+
+    def get_table(self,
+                  table_id: int
+                  ) -> Table:
+        """
+        :param table_id: id of the table
+        :return: table
+        :raise KeyError if there is no such table
+        """
+        table = self.__tables.get(table_id)
+        if table is None:
+            table = self.__finished.get(table_id)
+        if table is None:
+            raise KeyError(f'No table {table_id}')
+        return table
+
+    def get_tables(self) -> list[Table]:
+        """
+        :return: tables playing, then finished tables kept, oldest first
+        """
+        return list(self.__tables.values()) + list(self.__finished.values())
+
+    async def start_tcp(self,
+                        host: str = '127.0.0.1',
+                        port: int = 0
+                        ) -> int:
+        """
+        :param host: local address
+        :param port: port, 0 for any free port
+        :return: port listened to
+        """
+        self.__server = await asyncio.start_server(self.__handle, host, port)
+        return self.__server.sockets[0].getsockname()[1]
+
+    async def start_unix(self,
+                         path: str
+                         ) -> None:
+        """
+        :param path: path of the Unix socket
+        """
+        self.__server = await asyncio.start_unix_server(self.__handle, path)
+
+    async def serve_forever(self) -> None:
+        """
+        Serve until cancelled
+        """
+        await self.__server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stop listening and stop every table
+        """
+        tasks = [table.stop() for table in list(self.__tables.values())]
+        await asyncio.gather(*[t for t in tasks if t is not None], return_exceptions=True)
+        # tables cancelled before their task started never reached on_over
+        for table in list(self.__tables.values()):
+            self.__finish(table)
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        self.__executor.shutdown(wait=False)
+
+    def create_table(self,
+                     humans: list[str] = (),
+                     seed: int = None,
+                     max_turns: int = None
+                     ) -> Table:
+        """
+        Create and start a table, on the running loop
+        :param humans: names of the seats played by clients, the others are played by AI agents
+        :param seed: seed of the dice and the agents of the table
+        :param max_turns: turn horizon, None to play to the end
+        :return: new table
+        :raise KeyError if a human seat is not a player of the config
+        :raise RuntimeError if max_tables tables are playing
+        """
+        if len(self.__tables) >= self.__max_tables:
+            raise RuntimeError(f'Server full, {self.__max_tables} tables playing')
+        names = [p.name for p in self.__config.game_dict.player_list]
+        for name in humans:
+            if name not in names:
+                raise KeyError(f'{name} is not a player, expected one of {names}')
+        # top-level copy: the other config dicts, already EasyDicts, are kept by reference, as the compiled
+        # config, and shared by every table; game_dict and its players are copied to set the seats
+        config = EasyDict(self.__config)
+        config.game_dict = EasyDict(config.game_dict)
+        config.game_dict.player_list = [EasyDict(p, is_ai=p.name not in humans)
+                                        for p in self.__config.game_dict.player_list]
+        table_id = next(self.__ids)
+        replay = None if self.__replay_dir is None else os.path.join(self.__replay_dir, f'table_{table_id:05d}.bin')
+        # AI seats are played by their agents, not by the fast policy of headless games
+        manager = GameManager(config, headless=True, seed=seed, use_agents=True, replay=replay)
+        table = Table(table_id, manager, list(humans), self.__executor, max_turns=max_turns, on_over=self.__finish)
+        self.__tables[table_id] = table
+        table.start()
+        return table
+
+    def __finish(self,
+                 table: Table
+                 ) -> None:
+        """
+        Close the agents of a table whose game is over, failed or was stopped, and move it out of the tables
+        playing, evicting the oldest finished tables
+        :param table: finished table
+        """
+        table.get_manager().close()
+        self.__tables.pop(table.get_id(), None)
+        self.__finished[table.get_id()] = table
+        while len(self.__finished) > self.__max_finished:
+            self.__finished.popitem(last=False)
+
+    async def __handle(self,
+                       reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter
+                       ) -> None:
+        """
+        Serve the requests of a client until it disconnects
+        """
+        connection = Connection(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise TypeError(f'Expected a JSON object per line')
+                    answer = self.__dispatch(request, connection)
+                except (ValueError, KeyError, TypeError, RuntimeError) as e:
+                    answer = {'ok': False, 'error': str(e).strip('\'"')}
+                if isinstance(request, dict) and 'id' in request:
+                    answer['id'] = request['id']
+                await connection.send(answer)
+        except ConnectionError:
+            pass
+        finally:
+            for table in self.get_tables():
+                table.leave(connection)
+            writer.close()
+
+    def __dispatch(self,
+                   request: dict,
+                   connection: Connection
+                   ) -> dict:
+        """
+        :param request: decoded request
+        :param connection: client of the request
+        :return: answer
+        :raise ValueError, KeyError, TypeError if the request is invalid
+        """
+        op = request.get('op')
+        if op == 'create':
+            table = self.create_table(humans=request.get('humans', []), seed=request.get('seed'),
+                                      max_turns=request.get('max_turns'))
+            layout = table.get_manager().get_game().get_state().get_layout()
+            return {'ok': True, 'table': table.get_id(),
+                    'players': layout.get_player_names()[:layout.get_n_players()]}
+        if op == 'list':
+            return {'ok': True, 'tables': [{'table': t.get_id(), 'status': t.get_status()}
+                                           for t in self.get_tables()]}
+
+        table = self.get_table(request['table'])
+        if op == 'join':
+            table.join(request['player'], connection)
+        elif op == 'watch':
+            table.watch(connection)
+        elif op == 'act':
+            table.act(connection, int(request['choice']))
+        elif op == 'state':
+            return {'ok': True, 'state': table.dump(), 'status': table.get_status()}
+        elif op == 'sync':
+            return {'ok': True, 'delta': table.sync(connection, int(request.get('version', 0)))}
+        elif op == 'ack':
+            table.ack(connection, int(request['version']))
+        else:
+            raise ValueError(f'Unknown op {op}')
+        return {'ok': True}
+
+
+async def serve(config: EasyDict,
+                host: str = '127.0.0.1',
+                port: int = 8765,
+                unix_path: str = None,
+                replay_dir: str = None
+                ) -> None:
+    """
+    Run a server until cancelled
+    :param config: global config dictionary
+    :param host: local address, for TCP
+    :param port: port, for TCP
+    :param unix_path: path of a Unix socket, used instead of TCP if specified
+    :param replay_dir: directory of the replay files, one per table, None to not record
+    """
+    server = GameServer(config, replay_dir=replay_dir)
+    if unix_path is not None:
+        await server.start_unix(unix_path)
+    else:
+        await server.start_tcp(host, port)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
@@ -0,0 +1,56 @@
+"""
+Bitboard helpers
+Sets of cells and hotels stored as the bits of an int, so that set queries are bitwise operations
+    - cell masks: bit cell_id + 1, 32 bits for the 32 cells
+    - hotel masks: bit hotel id
+Masks are stored in the int32 GameState buffer, two's complement: read them through to_uint32
+"""
+
+from typing import Iterator
+
+MASK_32 = 0xFFFFFFFF
+SIGN_32 = 1 << 31
+
+
+def cell_bit(cell_id: int) -> int:
+    """
+    :param cell_id: id of the cell
+    :return: bit of the cell in cell masks
+    """
+    return 1 << (cell_id + 1)
+
+
+def to_int32(mask: int) -> int:
+    """
+    :param mask: unsigned 32 bit mask
+    :return: the same bits as a signed int32, to be stored in the buffer
+    """
+    return mask - (1 << 32) if mask & SIGN_32 else mask
+
+
+def to_uint32(value: int) -> int:
+    """
+    :param value: mask read from the buffer
+    :return: unsigned 32 bit mask
+    """
+    return value & MASK_32
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    :param mask: unsigned mask
+    :return: indexes of the bits set, lowest first
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def iter_cells(mask: int) -> Iterator[int]:
+    """
+    :param mask: unsigned cell mask
+    :return: ids of the cells in the mask
+    """
+    for idx in iter_bits(mask):
+        yield idx - 1
@@ -2,8 +2,12 @@
 Contains Board class and all methods to control the board
 """
 
+import game.model.bitboard as bitboard
 import game.model.cell as cell
+import game.model.hotel as hotel
 import game.model.player as player
+import game.model.state as state
+import game.model.topology as topology
 
 from easydict import EasyDict
 from typing import Iterable
@@ -16,26 +20,74 @@ class Board:
 
     def __init__(self,
                  config: EasyDict,
-                 player_list: Iterable[player.Player]):
+                 player_list: Iterable[player.Player],
+                 game_state: state.GameState = None,
+                 hotels: dict[int: hotel.Hotel] = None):
         """
         :param config: global config dictionary
         :param player_list: list of players in the game
+        :param game_state: state of the game the board belongs to, a standalone one if not specified
+        :param hotels: Hotel instances of the game by id, used by cells to resolve entrances
         """
-        self.__cell_list: dict[int: cell.Cell] = {
-            i: cell.Cell(cell_id=i, config=config)
-            for i in range(-1, 31)}   # last cell id is 30
-        self.__position_trace: dict[player.Player: cell.Cell] = {
-            p: self.__cell_list[-1]
-            for p in player_list
-        }
+        if game_state is None:
+            game_state = state.GameState(state.StateLayout(player_names=[p.get_name() for p in player_list],
+                                                           hotel_names=[], standalone=True))
+        # player positions, entrances and occupancy live in the game state
+        self.__state: state.GameState = game_state
+        # cell types and hotels near are shared by every board of the same config
+        self.__topology: topology.BoardTopology = topology.get_topology(config)
+        self.__hotels: dict[int: hotel.Hotel] = hotels if hotels is not None else dict()
+        # color of each player in the config, by name, None if not set: standalone boards may have no game config
+        self.__colors: dict[str: str or None] = {p.name: p.get('color') for p in config.game_dict.player_list} \
+            if 'game_dict' in config else dict()
+        # Cell views, built on first access
+        self.__cell_list: dict[int: cell.Cell] = dict()
 
     def __repr__(self):
         _repr = 'Board: \n'
-        for pl, pos in self.__position_trace.items():
-            _repr += f'\t{pl.get_name()} | Cell: {pos.get_id()}\n'
+        layout = self.__state.get_layout()
+        for p_id, name in enumerate(layout.get_player_names()[:layout.get_n_players()]):
+            pos = self.__state.get_position(p_id)
+            if pos != state.OFF_BOARD:
+                _repr += f'\t{name} | Cell: {pos}\n'
 
         return _repr
 
+    def __player_id(self,
+                    p: player.Player
+                    ) -> int:
+        """
+        Find the id of the player position in the game state
+        :param p: Player to find
+        :return: id of the player
+        :raise IndexError if the player is not in the board
+        """
+        layout = self.__state.get_layout()
+        name = p.get_name()
+        if layout.has_player(name):
+            p_id = layout.player_id(name)
+            if self.__state.get_position(p_id) != state.OFF_BOARD:
+                return p_id
+        raise IndexError(f'Could not find Player {name} in the board')
+
+    def get_state(self) -> state.GameState:
+        """
+        :return: game state the board is a view of
+        """
+        return self.__state
+
+    def get_player_colors(self) -> dict[str: str or None]:
+        """
+        :return: color name of each player in the config (e.g. Red), by name, None if not set
+        """
+        return self.__colors
+
+    def get_topology(self) -> topology.BoardTopology:
+        """
+        :return: shared topology of the board
+        """
+        return self.__topology
+
     def find_cell(self,
                   cell_id: int
                   ) -> cell.Cell:
@@ -45,9 +97,15 @@ class Board:
         :return: Cell instance with given id
         :raise IndexError if the id is out of bounds
         """
-        if cell_id in self.__cell_list.keys():
-            return self.__cell_list[cell_id]
-        raise IndexError(f'Could not find Cell {cell_id} in the board')
+        c = self.__cell_list.get(cell_id)
+        if c is None:
+            if not self.__topology.has_cell(cell_id):
+                raise IndexError(f'Could not find Cell {cell_id} in the board')
+            c = self.__cell_list[cell_id] = cell.Cell(cell_id=cell_id,
+                                                      game_state=self.__state,
+                                                      hotels=self.__hotels,
+                                                      board_topology=self.__topology)
+        return c
 
     def find_player_pos(self,
                         p: player.Player
@@ -58,9 +116,54 @@ class Board:
         :return: Cell instance
         :raise IndexError if the player is not in the board
         """
-        if p in self.__position_trace.keys():
-            return self.__position_trace[p]
-        raise IndexError(f'Could not find Player {p.get_name()} in the board')
+        return self.find_cell(self.__state.get_position(self.__player_id(p)))
+
+    def find_cell_players(self,
+                          cell_id: int
+                          ) -> list[str]:
+        """
+        Find the players standing in a cell, from the cell -> players index of the game state
+        :param cell_id: id of the cell
+        :return: names of the players, by id
+        :raise IndexError if the id is out of bounds
+        """
+        if not self.__topology.has_cell(cell_id):
+            raise IndexError(f'Could not find Cell {cell_id} in the board')
+        names = self.__state.get_layout().get_player_names()
+        return [names[p_id] for p_id in bitboard.iter_bits(self.__state.get_cell_players(cell_id))]
+
+    def find_entrances(self,
+                       h: hotel.Hotel
+                       ) -> list[cell.Cell]:
+        """
+        Find the cells holding an entrance of a hotel, from the hotel -> entrance cells index of the game state
+        :param h: Hotel to find
+        :return: Cell instances, by id
+        """
+        h_id = h.get_id()
+        if h_id >= self.__state.get_layout().get_n_hotels():
+            return []
+        return [self.find_cell(cell_id) for cell_id in bitboard.iter_cells(self.__state.get_entrance_mask(h_id))]
+
+    def rent_due(self,
+                 p: player.Player
+                 ) -> hotel.Hotel or None:
+        """
+        Find the hotel the player has to pay for standing in its cell, in O(1)
+        Rent is due on the entrance of a hotel with stars, owned by another player
+        :param p: Player standing in the cell
+        :return: Hotel to pay, None if no rent is due
+        :raise IndexError if the player is not in the board
+        """
+        game_state = self.__state
+        p_id = self.__player_id(p)
+        h_id = game_state.get_entrance(game_state.get_position(p_id))
+        if h_id == state.NO_ENTRANCE:
+            return None
+        owner = game_state.get_owner(h_id)
+        if owner == state.NO_OWNER or owner == p_id or game_state.get_star_level(h_id) == 0:
+            return None
+        return self.__hotels[h_id]
 
     def remove_player(self,
                       p: player.Player
@@ -70,9 +173,7 @@ class Board:
         :param p: Player to be removed
         :raise IndexError if the player is not in the board
         """
-        if p not in self.__position_trace.keys():
-            raise IndexError(f'Could not find Player {p.get_name()} in the board')
-        del self.__position_trace[p]
+        self.__state.set_position(self.__player_id(p), state.OFF_BOARD)
 
     def move_player(self,
                     p: player.Player,
@@ -90,18 +191,12 @@ class Board:
                       i.e., dice roll value or number of cells to move
         :raise IndexError if the player is not in the board
         """
-        if p not in self.__position_trace.keys():
-            raise IndexError(f'Could not find Player {p.get_name()} in the board')
-        c = self.__position_trace[p]
+        p_id = self.__player_id(p)
 
         # move to dest
         if dest:
-            self.__position_trace[p] = dest
+            self.__state.set_position(p_id, dest.get_id())
             return
 
         # else, use delta
-        # first get new pos
-        new_cell_idx = (c.get_id() + delta) % 31    # modulo takes care of the sign of delta
-        new_cell = self.__cell_list[new_cell_idx]
-        # second, move to cell
-        self.__position_trace[p] = new_cell
+        self.__state.set_position(p_id, self.__topology.next_cell(self.__state.get_position(p_id), delta))
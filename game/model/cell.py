@@ -3,6 +3,8 @@ Contains Cell class and all methods to manipulate a cell instance
 """
 
 import game.model.hotel as hotel
+import game.model.state as state
+import game.model.topology as topology
 
 from easydict import EasyDict
 
@@ -11,25 +13,35 @@ class Cell:
     """
     Cell class
     Key: ID
+    Thin view: static data is read from the shared board topology, entrance and occupancy from the game state
     """
 
+    __slots__ = ('__id', '__idx', '__topology', '__state', '__hotels')
+
     def __init__(self,
                  cell_id: int,
-                 config: EasyDict):
+                 config: EasyDict = None,
+                 game_state: state.GameState = None,
+                 hotels: dict[int: hotel.Hotel] = None,
+                 board_topology: topology.BoardTopology = None):
         """
         Build Cell reading configuration
         :param cell_id: ID of the cell
-        :param config: global config dictionary
+        :param config: global config dictionary, only read if the topology is not specified
+        :param game_state: state of the game the cell belongs to, a standalone one if not specified
+        :param hotels: Hotel instances of the game by id, used to resolve entrances. Shared among cells
+        :param board_topology: shared topology of the board, the one of the config if not specified
         """
         self.__id: int = cell_id
-        self.__config: EasyDict = config
-
-        cell = config.cell_dict[str(cell_id)]
-        self.__type: int = cell.type
-        self.__hotels_near: list[str] = cell.hotels_near
+        self.__idx: int = cell_id + 1
+        self.__topology: topology.BoardTopology = board_topology if board_topology is not None \
+            else topology.get_topology(config)
 
-        self.__hotel_entrance: hotel.Hotel or None = None
-        self.__occupied: bool = False
+        # entrance and occupancy live in the game state
+        if game_state is None:
+            game_state = state.GameState(state.StateLayout(player_names=[], hotel_names=[], standalone=True))
+        self.__state: state.GameState = game_state
+        self.__hotels: dict[int: hotel.Hotel] = hotels if hotels is not None else dict()
 
     def __eq__(self, other):
         return self.__id == other.get_id()
@@ -40,10 +52,10 @@ class Cell:
     def __repr__(self):
         _repr = (
             f'Cell: {self.__id}\n'
-            f'\tType: {self.__config.cell_type_dict[str(self.__type)]}\n'
-            f'\tHotels Near: {self.__hotels_near}\n'
-            f'\tHotel Entrance: {self.__hotel_entrance}\n'
-            f'\tOccupied: {self.__occupied}'
+            f'\tType: {self.__topology.type_names[self.__idx]}\n'
+            f'\tHotels Near: {list(self.get_hotels_near())}\n'
+            f'\tHotel Entrance: {self.get_entrance()}\n'
+            f'\tOccupied: {self.is_occupied()}'
         )
         return _repr
 
@@ -57,19 +69,22 @@ class Cell:
         """
         :return: type of the cell, as int
         """
-        return self.__type
+        return self.__topology.cell_type[self.__idx]
 
-    def get_hotels_near(self) -> list[str]:
+    def get_hotels_near(self) -> tuple[str]:
         """
-        :return: list of Hotel names that are adjacent to the cell
+        :return: names of the Hotels that are adjacent to the cell, shared by every board
         """
-        return self.__hotels_near
+        return self.__topology.hotels_near[self.__idx]
 
     def get_entrance(self) -> hotel.Hotel or None:
         """
         :return: None if no entrance, else the Hotel object which has entrance on the cell
         """
-        return self.__hotel_entrance
+        h_id = self.__state.get_entrance(self.__id)
+        if h_id == state.NO_ENTRANCE:
+            return None
+        return self.__hotels[h_id]
 
     def add_entrance(self,
                      h: hotel.Hotel
@@ -78,22 +93,24 @@ class Cell:
         Add entrance to the cell
         :param h: Hotel object
         """
-        self.__hotel_entrance = h
+        h_id = self.__state.get_layout().hotel_id(h.get_name())
+        self.__hotels[h_id] = h
+        self.__state.set_entrance(self.__id, h_id)
 
     def is_occupied(self) -> bool:
         """
         :return: True if cell is occupied by a player car, False else
         """
-        return self.__occupied
+        return self.__state.is_occupied(self.__id)
 
     def occupy(self) -> None:
         """
         Set occupied = True when a player occupies the cell
         """
-        self.__occupied = True
+        self.__state.set_occupied(self.__id, True)
 
     def free(self) -> None:
         """
         Set occupied = False when a player leaves the cell
         """
-        self.__occupied = False
+        self.__state.set_occupied(self.__id, False)
@@ -0,0 +1,379 @@
+"""
+Contains the game events and EventLog class
+Every mutation applied through Game.apply is a small typed record, holding the values before and after the change,
+so that its inverse is known without looking at the state: undo and redo are O(1) per event
+
+Events address players, hotels and cells by id, as the GameState does, and are applied through
+the GameState setters: the Zobrist hash and the bitboards stay in sync
+Build them with their of(game_state, ...) constructor, which reads the values before the change
+
+Only the changes applied through Game.apply are logged: the mutators of the model classes (Player.change_money,
+Board.move_player, Hotel.set_owner, ...) and GameManager, which drives the turns through them, write the state
+directly. The log undoes the events of a search or an editor made on top of a game, not the turns played
+"""
+
+from dataclasses import dataclass
+
+import game.model.state as state
+
+
+@dataclass(frozen=True, slots=True)
+class MoneyChanged:
+    """
+    Money added to (positive amount) or removed from (negative amount) a player
+    """
+    p_id: int
+    amount: int
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           p_id: int,
+           amount: int
+           ) -> 'MoneyChanged':
+        """
+        :param game_state: state before the change
+        :param p_id: id of the player
+        :param amount: money added, negative to remove
+        :return: money change
+        """
+        return cls(p_id, amount)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.change_money(self.p_id, self.amount)
+
+    def inverse(self) -> 'MoneyChanged':
+        """
+        :return: event restoring the values before the change
+        """
+        return MoneyChanged(self.p_id, -self.amount)
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerMoved:
+    """
+    Player moved from a cell to another, OFF_BOARD when removed from the board
+    """
+    p_id: int
+    src: int
+    dest: int
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           p_id: int,
+           dest: int
+           ) -> 'PlayerMoved':
+        """
+        :param game_state: state before the change
+        :param p_id: id of the player
+        :param dest: cell reached, OFF_BOARD to remove the player
+        :return: move from the current position
+        """
+        return cls(p_id, game_state.get_position(p_id), dest)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.set_position(self.p_id, self.dest)
+
+    def inverse(self) -> 'PlayerMoved':
+        """
+        :return: event restoring the values before the change
+        """
+        return PlayerMoved(self.p_id, self.dest, self.src)
+
+
+@dataclass(frozen=True, slots=True)
+class OwnerChanged:
+    """
+    Hotel bought, expropriated or freed (NO_OWNER)
+    """
+    h_id: int
+    old: int
+    new: int
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           h_id: int,
+           p_id: int
+           ) -> 'OwnerChanged':
+        """
+        :param game_state: state before the change
+        :param h_id: id of the hotel
+        :param p_id: id of the new owner, NO_OWNER to free the hotel
+        :return: change from the current owner
+        """
+        return cls(h_id, game_state.get_owner(h_id), p_id)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.set_owner(self.h_id, self.new)
+
+    def inverse(self) -> 'OwnerChanged':
+        """
+        :return: event restoring the values before the change
+        """
+        return OwnerChanged(self.h_id, self.new, self.old)
+
+
+@dataclass(frozen=True, slots=True)
+class HotelUpgraded:
+    """
+    Upgrade built on a hotel, with the star level it reaches
+    """
+    h_id: int
+    old_upgrade: int
+    old_star_level: int
+    new_upgrade: int
+    new_star_level: int
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           h_id: int,
+           upgrade_type: int,
+           star_level: int
+           ) -> 'HotelUpgraded':
+        """
+        :param game_state: state before the change
+        :param h_id: id of the hotel
+        :param upgrade_type: id of the upgrade built
+        :param star_level: star level reached
+        :return: upgrade from the current upgrade and star level
+        """
+        return cls(h_id, game_state.get_last_upgrade(h_id), game_state.get_star_level(h_id), upgrade_type, star_level)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.set_upgrade(self.h_id, self.new_upgrade, self.new_star_level)
+
+    def inverse(self) -> 'HotelUpgraded':
+        """
+        :return: event restoring the values before the change
+        """
+        return HotelUpgraded(self.h_id, self.new_upgrade, self.new_star_level, self.old_upgrade, self.old_star_level)
+
+
+@dataclass(frozen=True, slots=True)
+class EntranceChanged:
+    """
+    Entrance of a hotel placed on a cell, or removed (NO_ENTRANCE)
+    """
+    cell_id: int
+    old: int
+    new: int
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           cell_id: int,
+           h_id: int
+           ) -> 'EntranceChanged':
+        """
+        :param game_state: state before the change
+        :param cell_id: id of the cell
+        :param h_id: id of the hotel, NO_ENTRANCE to remove the entrance
+        :return: change from the current entrance
+        """
+        return cls(cell_id, game_state.get_entrance(cell_id), h_id)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.set_entrance(self.cell_id, self.new)
+
+    def inverse(self) -> 'EntranceChanged':
+        """
+        :return: event restoring the values before the change
+        """
+        return EntranceChanged(self.cell_id, self.new, self.old)
+
+
+@dataclass(frozen=True, slots=True)
+class CellOccupied:
+    """
+    Cell occupied by a player car, or freed
+    """
+    cell_id: int
+    old: bool
+    new: bool
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           cell_id: int,
+           occupied: bool
+           ) -> 'CellOccupied':
+        """
+        :param game_state: state before the change
+        :param cell_id: id of the cell
+        :param occupied: True if a player car stands on the cell
+        :return: change from the current occupation
+        """
+        return cls(cell_id, game_state.is_occupied(cell_id), occupied)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.set_occupied(self.cell_id, self.new)
+
+    def inverse(self) -> 'CellOccupied':
+        """
+        :return: event restoring the values before the change
+        """
+        return CellOccupied(self.cell_id, self.new, self.old)
+
+
+@dataclass(frozen=True, slots=True)
+class TurnPassed:
+    """
+    Turn counter and current player changed
+    """
+    old_turn: int
+    old_player: int
+    new_turn: int
+    new_player: int
+
+    @classmethod
+    def of(cls,
+           game_state: state.GameState,
+           p_id: int
+           ) -> 'TurnPassed':
+        """
+        :param game_state: state before the change
+        :param p_id: id of the next player
+        :return: change from the current turn and player, to the next turn
+        """
+        turn = game_state.get_turn()
+        return cls(turn, game_state.get_current_player(), turn + 1, p_id)
+
+    def apply(self,
+              game_state: state.GameState
+              ) -> None:
+        """
+        :param game_state: state to apply the change to
+        """
+        game_state.set_turn(self.new_turn)
+        game_state.set_current_player(self.new_player)
+
+    def inverse(self) -> 'TurnPassed':
+        """
+        :return: event restoring the values before the change
+        """
+        return TurnPassed(self.new_turn, self.new_player, self.old_turn, self.old_player)
+
+
+Event = MoneyChanged | PlayerMoved | OwnerChanged | HotelUpgraded | EntranceChanged | CellOccupied | TurnPassed
+
+
+class EventLog:
+    """
+    EventLog class
+    Events applied to a state, in order, and the events undone since the last new event (redo stack)
+    Changes made by the model mutators or GameManager are not recorded: undo only reverts the logged events,
+    so undo them before the state is changed by other means
+    """
+
+    __slots__ = ('__done', '__undone')
+
+    def __init__(self):
+        self.__done: list[Event] = []
+        self.__undone: list[Event] = []
+
+    def __len__(self):
+        return len(self.__done)
+
+    def get_events(self) -> list[Event]:
+        """
+        :return: events applied, oldest first
+        """
+        return self.__done
+
+    def mark(self) -> int:
+        """
+        :return: position in the log, to undo back to with undo_to
+        """
+        return len(self.__done)
+
+    def apply(self,
+              event: Event,
+              game_state: state.GameState
+              ) -> None:
+        """
+        Apply a new event and record it, clearing the redo stack
+        :param event: event to apply
+        :param game_state: state to apply it to
+        """
+        event.apply(game_state)
+        self.__done.append(event)
+        if self.__undone:
+            self.__undone.clear()
+
+    def undo(self,
+             game_state: state.GameState
+             ) -> Event:
+        """
+        Undo the last event
+        :param game_state: state the event was applied to
+        :return: event undone
+        :raise IndexError if there is nothing to undo
+        """
+        if not self.__done:
+            raise IndexError(f'Nothing to undo')
+        event = self.__done.pop()
+        event.inverse().apply(game_state)
+        self.__undone.append(event)
+        return event
+
+    def redo(self,
+             game_state: state.GameState
+             ) -> Event:
+        """
+        Apply again the last event undone
+        :param game_state: state the event was applied to
+        :return: event redone
+        :raise IndexError if there is nothing to redo
+        """
+        if not self.__undone:
+            raise IndexError(f'Nothing to redo')
+        event = self.__undone.pop()
+        event.apply(game_state)
+        self.__done.append(event)
+        return event
+
+    def undo_to(self,
+                mark: int,
+                game_state: state.GameState
+                ) -> None:
+        """
+        Undo every event after a mark, without keeping them for redo: unmake of a depth-first search
+        :param mark: position returned by mark
+        :param game_state: state the events were applied to
+        """
+        done = self.__done
+        while len(done) > mark:
+            done.pop().inverse().apply(game_state)
@@ -2,9 +2,12 @@
 Contains Game class
 Game is the main model class, where every model information is grouped
 """
+import game.model.bitboard as bitboard
+import game.model.events as events
 import game.model.player as player
 import game.model.hotel as hotel
 import game.model.board as board
+import game.model.state as state
 
 from easydict import EasyDict
 
@@ -15,37 +18,163 @@ class Game:
     """
 
     def __init__(self,
-                 config: EasyDict):
+                 config: EasyDict,
+                 game_state: state.GameState = None):
         """
         Build Game reading configuration
         :param config: global config dictionary
+        :param game_state: state to build the game on, a new game if not specified
         """
+        self.__config: EasyDict = config
+        # array-backed state, every model instance below is a view over it
+        if game_state is None:
+            game_state = state.GameState(
+                state.StateLayout(player_names=[p.name for p in config.game_dict.player_list],
+                                  hotel_names=config.hotel_dict.keys()))
+        self.__state: state.GameState = game_state
+        # players kept by a clone and their property lists, by name, applied once its views are built (see clone)
+        self.__properties: dict[str: list[str]] or None = None
+        # views over the state, built on first access
+        self.__player_list: dict[str: player.Player] or None = None
+        self.__hotel_list: dict[str: hotel.Hotel] or None = None
+        self.__hotel_by_id: dict[int: hotel.Hotel] or None = None
+        self.__board: board.Board or None = None
+        self.__build_views()
+        # reversible mutations applied through Game.apply
+        self.__log: events.EventLog = events.EventLog()
+
+    def __build_views(self) -> None:
+        """
+        Build the Player, Hotel and Board views over the state, with the players and properties of the game cloned
+        """
+        config = self.__config
         # dict to track players status
-        self.__player_list: dict[str: player.Player] = {
+        self.__player_list = {
             p.name:
-                player.AiPlayer(name=p.name) if p.is_ai
-                else player.HumanPlayer(name=p.name)
+                player.AiPlayer(name=p.name, game_state=self.__state) if p.is_ai
+                else player.HumanPlayer(name=p.name, game_state=self.__state)
             for p in config.game_dict.player_list
+            if self.__properties is None or p.name in self.__properties
         }
-        # board for the game
-        self.__board: board.Board = board.Board(config=config,
-                                                player_list=self.__player_list.values())
         # dict to track hotels status
-        self.__hotel_list: dict[str: hotel.Hotel] = {
-            hotel_name: hotel.Hotel(name=hotel_name, config=config)
+        self.__hotel_list = {
+            hotel_name: hotel.Hotel(name=hotel_name, config=config, game_state=self.__state)
             for hotel_name in config.hotel_dict.keys()
         }
+        # hotels by id, to resolve the indexes of the game state
+        self.__hotel_by_id = {h.get_id(): h for h in self.__hotel_list.values()}
+        # board for the game
+        self.__board = board.Board(config=config,
+                                   player_list=self.__player_list.values(),
+                                   game_state=self.__state,
+                                   hotels=self.__hotel_by_id)
+        if self.__properties is not None:
+            # property lists refer to the hotels of this game
+            for name, hotel_names in self.__properties.items():
+                pl = self.__player_list[name]
+                for hotel_name in hotel_names:
+                    pl.add_property(h=self.__hotel_list[hotel_name])
+            self.__properties = None
+
+    def __views(self) -> 'Game':
+        """
+        :return: this game, its views built
+        """
+        if self.__player_list is None:
+            self.__build_views()
+        return self
 
     def __repr__(self):
         _repr = 'Game State: \n\n'
         # player state
-        for pl in self.__player_list.values():
+        for pl in self.get_player_list().values():
             _repr += f'{pl}\n'
         # board state
-        _repr += f'{self.__board}'
+        _repr += f'{self.get_board()}'
 
         return _repr
 
+    def clone(self) -> 'Game':
+        """
+        Copy the game, sharing config and state layout
+        The state is copied on write and the views of the clone are only built on first access, so a clone costs
+        about a snapshot until it is used through its views. Search should still snapshot and restore one game
+        :return: independent copy of the game
+        """
+        clone = Game.__new__(Game)
+        clone.__config = self.__config
+        clone.__state = self.__state.snapshot()
+        clone.__properties = {name: list(pl.get_property_list().keys())
+                              for name, pl in self.__views().__player_list.items()}
+        clone.__player_list = clone.__hotel_list = clone.__hotel_by_id = clone.__board = None
+        clone.__log = events.EventLog()
+        return clone
+
+    def snapshot(self) -> state.GameState:
+        """
+        Copy-on-write snapshot of the mutable state only (money, positions, ownership, stars, ...)
+        Cheaper than clone, meant to be restored on this same game
+        :return: snapshot of the game state
+        """
+        return self.__state.snapshot()
+
+    def restore(self,
+                snapshot: state.GameState
+                ) -> None:
+        """
+        Bring the game back to a snapshot taken with Game.snapshot
+        Player list and property lists are not part of the snapshot
+        :param snapshot: snapshot to restore
+        """
+        self.__state.restore(snapshot)
+
+    def apply(self,
+              event: events.Event
+              ) -> None:
+        """
+        Apply a mutation to the game state and record it in the event log, so that it can be undone
+        :param event: event built on the current state, see events
+        """
+        self.__log.apply(event, self.__state)
+
+    def undo(self) -> events.Event:
+        """
+        Undo the last event applied, O(1)
+        :return: event undone
+        :raise IndexError if there is nothing to undo
+        """
+        return self.__log.undo(self.__state)
+
+    def redo(self) -> events.Event:
+        """
+        Apply again the last event undone, O(1)
+        :return: event redone
+        :raise IndexError if there is nothing to redo
+        """
+        return self.__log.redo(self.__state)
+
+    def mark(self) -> int:
+        """
+        Make / unmake for depth-first search: mark, apply the events of a move, then undo_to the mark
+        :return: position in the event log
+        """
+        return self.__log.mark()
+
+    def undo_to(self,
+                mark: int
+                ) -> None:
+        """
+        Undo every event applied after a mark, the redo stack is left untouched
+        :param mark: position returned by mark
+        """
+        self.__log.undo_to(mark, self.__state)
+
+    def get_log(self) -> events.EventLog:
+        """
+        :return: event log of the game
+        """
+        return self.__log
+
     def remove_player(self,
                       p: player.Player = None,
                       name: str = None
@@ -60,7 +189,7 @@ class Game:
         assert p or name, f'No player to remove'
         if p:
             name = p.get_name()
-        if name in self.__player_list.keys():
+        if name in self.get_player_list().keys():
             del self.__player_list[name]
 
     def get_player(self,
@@ -72,7 +201,7 @@ class Game:
         :return: player instance
         :raise IndexError if player is not in the game
         """
-        if name not in self.__player_list.keys():
+        if name not in self.get_player_list().keys():
             raise IndexError(f'Could not find Player {name} in the game')
         return self.__player_list[name]
 
@@ -85,24 +214,43 @@ class Game:
         :return: hotel instance
         :raise IndexError if hotel is not in the game
         """
-        if name not in self.__hotel_list.keys():
+        if name not in self.get_hotel_list().keys():
             raise IndexError(f'Could not find Hotel {name} in the game')
         return self.__hotel_list[name]
 
+    def get_player_hotels(self,
+                          name: str
+                          ) -> list[hotel.Hotel]:
+        """
+        Get the hotels owned by a player, from the player -> hotels index of the game state
+        Unlike the property list of the player, always in sync with Hotel.set_owner
+        :param name: name of the player
+        :return: hotel instances, by id
+        :raise IndexError if player is not in the game
+        """
+        p_id = self.get_player(name=name).get_id()
+        return [self.__views().__hotel_by_id[h_id] for h_id in bitboard.iter_bits(self.__state.get_owner_mask(p_id))]
+
+    def get_state(self) -> state.GameState:
+        """
+        :return: array-backed state of the game
+        """
+        return self.__state
+
     def get_board(self) -> board.Board:
         """
         :return: board of the game
         """
-        return self.__board
+        return self.__views().__board
 
     def get_player_list(self) -> dict[str: player.Player]:
         """
         :return: player list of the game
         """
-        return self.__player_list
+        return self.__views().__player_list
 
     def get_hotel_list(self) -> dict[str: hotel.Hotel]:
         """
         :return: hotel list of the game
         """
-        return self.__hotel_list
\ No newline at end of file
+        return self.__views().__hotel_list
\ No newline at end of file
@@ -2,8 +2,48 @@
 Contains Hotel class and all methods to manipulate a hotel instance
 """
 
+import game.model.state as state
+
 from prettytable import PrettyTable
 from easydict import EasyDict
+from utils.compiled_config import get_compiled, HotelSpec
+
+
+# static part of the repr of each hotel (costs and payment table), by spec and upgrade names
+_static_reprs: dict[tuple[HotelSpec, tuple[str]]: str] = dict()
+
+
+def _static_repr(spec: HotelSpec,
+                 upgrade_names: tuple[str]
+                 ) -> str:
+    """
+    Costs and payment table of a hotel, built once per config: they never change during a game
+    :param spec: static data of the hotel
+    :param upgrade_names: names of the upgrades, by idx
+    :return: end of the repr of the hotel
+    """
+    key = (spec, upgrade_names)
+    _repr = _static_reprs.get(key)
+    if _repr is None:
+        # table for payments
+        table = PrettyTable()
+        table.field_names = ['1 night', '2 night', '3 night', '4 night', '5 night', '6 night']
+        for row in spec.payments:
+            table.add_row(row)
+        table.border = False
+        table.left_padding_width = 8
+
+        costs = ''.join(f'\t\t{name}: {cost}\n' for name, cost in zip(upgrade_names, spec.costs))
+        _repr = _static_reprs[key] = (
+            f'\tLand cost: {spec.land_cost}\n'
+            f'\tExpropriation price: {spec.expropriation_price}\n'
+            f'\tEntrance cost: {spec.entrance_cost}\n'
+            f'\tCosts:\n'
+            f'{costs}'
+            f'\tpayments:\n'
+            f'{table}\n'
+        )
+    return _repr
 
 
 class Hotel:
@@ -14,22 +54,24 @@ class Hotel:
 
     def __init__(self,
                  name: str,
-                 config: EasyDict):
+                 config: EasyDict,
+                 game_state: state.GameState = None):
         """
         Build Hotel reading configuration
         :param name: name of the hotel, unique
         :param config: global config dictionary
+        :param game_state: state of the game the hotel belongs to, a standalone one if not specified
         """
         self.__name: str = name
-        self.__hotel_config: EasyDict = config.hotel_dict[name]
-        self.__hotel_upgrade_type_dict: dict[str: int] = config.hotel_upgrade_type_dict
-        self.__hotel_upgrade_type_dict_reverse: dict[int: str] = {  # reverse dictionary for easier access on repr
-            value: key
-            for key, value in self.__hotel_upgrade_type_dict.items()
-        }
-        self.__owner: str or None = None
-        self.__star_level: int = 0
-        self.__last_upgrade_idx: int = -1      # keep track of last upgrade
+        # static data, read from the compiled config instead of the yaml dicts
+        compiled = get_compiled(config)
+        self.__spec: HotelSpec = compiled.hotel(name)
+        self.__upgrade_names: tuple[str] = compiled.upgrade_names
+        if game_state is None:
+            game_state = state.GameState(state.StateLayout(player_names=[], hotel_names=[name], standalone=True))
+        # owner, star level and last upgrade live in the game state
+        self.__state: state.GameState = game_state
+        self.__id: int = game_state.get_layout().hotel_id(name)
 
     def __eq__(self, other):
         return self.__name == other.get_name()
@@ -38,36 +80,16 @@ class Hotel:
         return hash(self.__name)
 
     def __repr__(self):
-        hotel_cfg = self.__hotel_config
-
         # get and format last upgrade performed as a string
-        last_upgrade = self.__hotel_upgrade_type_dict_reverse[self.__last_upgrade_idx]
-
-        # table for payments
-        table = PrettyTable()
-        table.field_names = ['1 night', '2 night', '3 night', '4 night', '5 night', '6 night']
-        for row in hotel_cfg.payments:
-            table.add_row(row)
-        table.border = False
-        table.left_padding_width = 8
+        last_upgrade_idx = self.get_last_upgrade()
+        last_upgrade = 'none' if last_upgrade_idx == state.NO_UPGRADE else self.__upgrade_names[last_upgrade_idx]
 
         _repr = (
             f'{self.__name}\n'
-            f'\tOwner: {self.__owner}\n'
-            f'\t{self.__star_level} star\n'
+            f'\tOwner: {self.get_owner()}\n'
+            f'\t{self.get_star_level()} star\n'
             f'\tLast upgrade: {last_upgrade}\n'
-            f'\tLand cost: {hotel_cfg.land_cost}\n'
-            f'\tExpropriation price: {hotel_cfg.expropriation_price}\n'
-            f'\tEntrance cost: {hotel_cfg.entrance_cost}\n'
-            f'\tCosts:\n'
-            f'\t\tmain_building: {hotel_cfg.costs.main_building}\n'
-            f'\t\tI_dependance: {hotel_cfg.costs.I_dependance}\n'
-            f'\t\tII_dependance: {hotel_cfg.costs.II_dependance}\n'
-            f'\t\tIII_dependance: {hotel_cfg.costs.III_dependance}\n'
-            f'\t\tIV_dependance: {hotel_cfg.costs.IV_dependance}\n'
-            f'\t\tfacilities: {hotel_cfg.costs.facilities}\n'
-            f'\tpayments:\n'
-            f'{table}\n'
+            f'{_static_repr(self.__spec, self.__upgrade_names)}'
         )
         return _repr
 
@@ -77,11 +99,20 @@ class Hotel:
         """
         return self.__name
 
+    def get_id(self) -> int:
+        """
+        :return: id of the hotel in the game state
+        """
+        return self.__id
+
     def get_owner(self) -> str or None:
         """
         :return: return Player object who owns the property, None if no player
         """
-        return self.__owner
+        owner_id = self.__state.get_owner(self.__id)
+        if owner_id == state.NO_OWNER:
+            return None
+        return self.__state.get_layout().get_player_names()[owner_id]
 
     def set_owner(self,
                   player_name: str
@@ -89,26 +120,26 @@ class Hotel:
         """
         :param: player_name: name of the player who is currently owning the hotel
         """
-        self.__owner = player_name
+        self.__state.set_owner(self.__id, self.__state.get_layout().player_id(player_name))
 
     def free_property(self) -> None:
         """
         Remove the owner of the property
         """
-        self.__owner = None
+        self.__state.set_owner(self.__id, state.NO_OWNER)
 
     def get_star_level(self) -> int:
         """
         :return: current star level of the property
         """
-        return self.__star_level
+        return self.__state.get_star_level(self.__id)
 
     def get_last_upgrade(self) -> int:
         """
         Return idx for last upgrade of the Hotel
         :return: idx for hotel_upgrade_type_dict
         """
-        return self.__last_upgrade_idx
+        return self.__state.get_last_upgrade(self.__id)
 
     def upgrade(self,
                 upgrade_type: int
@@ -117,48 +148,41 @@ class Hotel:
         Set the star level of the hotel accordingly to the upgrade done
         :param upgrade_type: corresponding to the upgrade type selected
         """
-        self.__last_upgrade_idx = upgrade_type
-        self.__star_level = self.__hotel_config.star_upgrade[upgrade_type]
+        self.__state.set_upgrade(self.__id, upgrade_type, self.__spec.star_upgrade[upgrade_type])
 
     def get_land_cost(self) -> int:
         """
         :return: cost of buying the hotel land
         """
-        return self.__hotel_config.land_cost
+        return self.__spec.land_cost
 
     def get_expropriation_price(self) -> int:
         """
         :return: expropriation price for the hotel terrain
         """
-        return self.__hotel_config.expropriation_price
+        return self.__spec.expropriation_price
 
     def get_entrance_cost(self) -> int:
         """
         :return: cost of buying an entrance for the hotel
         """
-        return self.__hotel_config.entrance_cost
+        return self.__spec.entrance_cost
 
-    def get_upgrade_costs(self) -> EasyDict:
+    def get_upgrade_costs(self) -> dict[str: int]:
         """
         Get the upgrade costs of the available building options for the hotel, starting FROM the last built option
         :return: dictionary of costs
         """
-        return EasyDict(
-            {
-                key: value
-                for key, value
-                in self.__hotel_config.costs.items()  # loop over costs dictionary
-                # anything in upgrade_type_dict with value > last_upgrade_idx can be seen
-                # e.g., if last_upgrade idx = 3 --> "IV_dependance" (4) and "facilities" (5) can be seen
-                if value != 'None' and  # filter upgrades unavailable
-                   int(self.__hotel_upgrade_type_dict[key]) > self.__last_upgrade_idx
-            }
-        )
+        # anything with upgrade idx > last_upgrade_idx can be seen, unavailable upgrades are filtered at compile time
+        # e.g., if last_upgrade idx = 3 --> "IV_dependance" (4) and "facilities" (5) can be seen
+        costs = self.__spec.costs
+        names = self.__upgrade_names
+        return {names[u]: costs[u] for u in self.__spec.upgrades_after[self.__state.get_last_upgrade(self.__id) + 1]}
 
-    def get_payments(self) -> list[list[int]]:
+    def get_payments(self) -> tuple[tuple[int]]:
         """
         Return the payment matrix
         Row = number of stars, column = number of nights
         :return: matrix representing payments
         """
-        return self.__hotel_config.payments
+        return self.__spec.payments
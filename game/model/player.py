@@ -4,6 +4,7 @@ Contains Player class and all methods to interact with a player
 
 import game.view.player_interface as i_f
 import game.model.hotel as hotel
+import game.model.state as state
 
 from abc import ABC, abstractmethod
 
@@ -15,12 +16,17 @@ class Player(ABC):
     """
 
     def __init__(self,
-                 name: str):
+                 name: str,
+                 game_state: state.GameState = None):
         """
         :param: name: unique id of the player
+        :param: game_state: state of the game the player belongs to, a standalone one if not specified
         """
         self.__name: str = name
-        self.__money: int = 12000    # standard start of the game
+        if game_state is None:
+            game_state = state.GameState(state.StateLayout(player_names=[name], hotel_names=[], standalone=True))
+        self.__state: state.GameState = game_state
+        self.__id: int = game_state.get_layout().player_id(name)
         self.__property_list: dict[str: hotel.Hotel] = dict()
 
     def __eq__(self, other):
@@ -58,17 +64,29 @@ class Player(ABC):
         :return: User Interface
         """
 
+    def get_id(self) -> int:
+        """
+        :return: id of the player in the game state
+        """
+        return self.__id
+
+    def get_state(self) -> state.GameState:
+        """
+        :return: game state the player is a view of
+        """
+        return self.__state
+
     def get_money(self) -> int:
         """
         :return: money owned by the player
         """
-        return self.__money
+        return self.__state.get_money(self.__id)
 
     def is_broke(self) -> bool:
         """
         :return: True if the player has no more money left
         """
-        return self.__money <= 0
+        return self.__state.get_money(self.__id) <= 0
 
     def change_money(self,
                      amount: int
@@ -76,7 +94,7 @@ class Player(ABC):
         """
         :param: amount: int, negative -> removing money, positive -> adding money
         """
-        self.__money += amount
+        self.__state.change_money(self.__id, amount)
 
     def get_property_list(self) -> dict[str:hotel.Hotel]:
         """
@@ -115,8 +133,9 @@ class HumanPlayer(Player):
     """
 
     def __init__(self,
-                 name: str):
-        super(HumanPlayer, self).__init__(name=name)
+                 name: str,
+                 game_state: state.GameState = None):
+        super(HumanPlayer, self).__init__(name=name, game_state=game_state)
         self.__ui = self.set_interface()
 
     def set_interface(self) -> i_f.PlayerInterface:
@@ -137,8 +156,9 @@ class AiPlayer(Player):
     """
 
     def __init__(self,
-                 name: str):
-        super(AiPlayer, self).__init__(name=name)
+                 name: str,
+                 game_state: state.GameState = None):
+        super(AiPlayer, self).__init__(name=name, game_state=game_state)
         self.__ui = self.set_interface()
 
     def set_interface(self) -> i_f.PlayerInterface:
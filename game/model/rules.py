@@ -0,0 +1,662 @@
+"""
+Contains Rules class
+Rules play the game directly on the raw GameState buffer, without going through the model views
+Used by simulations and AI players, where the object model is too slow
+Rules keep the bitboards of the buffer in sync with the ownership and entrance vectors
+
+Turn structure, for the current player:
+    1. roll the die and move
+    2. pay rent if the cell holds the entrance of a hotel owned by another player
+       (roll the die again for the number of nights)
+    3. choose one action allowed by the cell type: buy land, build, buy entrance or pass
+    4. next active player
+A player whose money drops to zero or below is out: removed from the board, properties freed
+"""
+
+import game.model.bitboard as bitboard
+import game.model.state as state
+import game.model.topology as topology
+
+from easydict import EasyDict
+from array import array
+from random import Random
+from utils.compiled_config import get_compiled
+from typing import MutableSequence, Callable, Sequence
+
+DIE_FACES = 6
+
+# cell types, as in configs/cell_type.yaml
+BUILDING_PERMISSION = 0
+BUYING_LAND = 1
+FREE_STAGE = 2
+FREE_ENTRANCE = 3
+START = 4
+
+# action kinds, an action is encoded as kind offset + hotel id
+PASS = 0
+BUY_LAND = 1
+BUILD = 2
+BUY_ENTRANCE = 3
+
+
+class Rules:
+    """
+    Rules class
+    Immutable tables compiled from the config, shared by every state of the same game
+    """
+
+    def __init__(self,
+                 config: EasyDict,
+                 layout: state.StateLayout):
+        """
+        :param config: global config dictionary
+        :param layout: layout of the states the rules are applied to
+        """
+        self.layout: state.StateLayout = layout
+        self.n_players: int = layout.get_n_players()
+        self.n_hotels: int = layout.get_n_hotels()
+        hotel_names = layout.get_hotel_names()[:self.n_hotels]
+        compiled = get_compiled(config)
+
+        # per hotel tables, indexed by hotel id
+        hotels = [compiled.hotel(name) for name in hotel_names]
+        self.land_cost: tuple[int] = tuple(h.land_cost for h in hotels)
+        self.entrance_cost: tuple[int] = tuple(h.entrance_cost for h in hotels)
+        self.star_upgrade: tuple[tuple[int]] = tuple(h.star_upgrade for h in hotels)
+        self.payments: tuple[tuple[tuple[int]]] = tuple(h.payments for h in hotels)
+        # cost of each upgrade by upgrade idx, None if not available
+        self.upgrade_cost: tuple[tuple[int or None]] = tuple(h.costs for h in hotels)
+        # next upgrade available after each last upgrade idx (shifted by one for NO_UPGRADE), None if no more
+        self.next_upgrade: tuple[tuple[int or None]] = tuple(
+            tuple(upgrades[0] if upgrades else None for upgrades in h.upgrades_after)
+            for h in hotels
+        )
+        # money invested in the buildings after each last upgrade idx (shifted by one for NO_UPGRADE)
+        self.invested: tuple[tuple[int]] = tuple(
+            tuple(sum(c for c in costs[:last + 1] if c is not None)
+                  for last in range(-1, len(costs)))
+            for costs in self.upgrade_cost
+        )
+
+        # per cell tables, indexed by cell_id + 1, from the topology shared with the boards
+        board_topology = topology.get_topology(config)
+        hotel_ids = {name: i for i, name in enumerate(hotel_names)}
+        self.cell_type: tuple[int] = board_topology.cell_type
+        # cells of the ring the players move around, the start cell excluded
+        self.ring_size: int = board_topology.ring_size
+        self.hotels_near: tuple[tuple[int]] = tuple(
+            tuple(hotel_ids[name] for name in names)
+            for names in board_topology.hotels_near
+        )
+
+        # transition table, for each cell (cell_id + 1) and die value - 1: (cell reached, its type, hotels near it)
+        self.transition: tuple[tuple[tuple[int, int, tuple[int]]]] = tuple(
+            tuple(((cell_id + die) % self.ring_size,
+                   self.cell_type[(cell_id + die) % self.ring_size + 1],
+                   self.hotels_near[(cell_id + die) % self.ring_size + 1])
+                  for die in range(1, DIE_FACES + 1))
+            for cell_id in range(-1, layout.get_n_cells() - 1)
+        )
+
+        # bitboards, see bitboard: cells reachable by one roll from each cell (cell_id + 1), cells near each hotel
+        self.reach_mask: tuple[int] = tuple(
+            sum(bitboard.cell_bit(dest) for dest, _, _ in moves)
+            for moves in self.transition
+        )
+        self.near_mask: tuple[int] = tuple(
+            sum(bitboard.cell_bit(cell_idx - 1) for cell_idx, near in enumerate(self.hotels_near) if h_id in near)
+            for h_id in range(self.n_hotels)
+        )
+
+        # action encoding
+        self.n_actions: int = 1 + 3 * self.n_hotels
+        # most actions legal at once: PASS, then buy land, or build and buy an entrance, for each hotel near
+        self.max_actions: int = 1 + 2 * max((len(near) for near in self.hotels_near), default=0)
+        # actions of the turn played by play_turn, reused turn after turn
+        self.__turn_actions: array = self.new_action_buffer()
+
+    def action(self,
+               kind: int,
+               h_id: int = 0
+               ) -> int:
+        """
+        :param kind: PASS, BUY_LAND, BUILD or BUY_ENTRANCE
+        :param h_id: id of the hotel the action is about
+        :return: encoded action
+        """
+        if kind == PASS:
+            return 0
+        return 1 + (kind - 1) * self.n_hotels + h_id
+
+    def decode(self,
+               action: int
+               ) -> tuple[int, int]:
+        """
+        :param action: encoded action
+        :return: (kind, hotel id)
+        """
+        if action == 0:
+            return PASS, 0
+        kind, h_id = divmod(action - 1, self.n_hotels)
+        return kind + 1, h_id
+
+    @staticmethod
+    def roll(rng: Random) -> int:
+        """
+        :param rng: random generator
+        :return: die value
+        """
+        return int(rng.random() * DIE_FACES) + 1
+
+    def move(self,
+             data: MutableSequence[int],
+             delta: int
+             ) -> int:
+        """
+        Move the current player, as Board.move_player
+        :param data: state buffer
+        :param delta: number of cells to move
+        :return: id of the cell reached
+        """
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        pos_idx = layout.position_off + p_id
+        cell_id = (data[pos_idx] + delta) % self.ring_size
+        data[layout.cell_players_off + data[pos_idx] + 1] &= ~(1 << p_id)
+        data[layout.cell_players_off + cell_id + 1] |= 1 << p_id
+        data[pos_idx] = cell_id
+        return cell_id
+
+    def rent_due(self,
+                 data: MutableSequence[int]
+                 ) -> int:
+        """
+        :param data: state buffer
+        :return: id of the hotel the current player has to pay, NO_OWNER if none
+        """
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        h_id = data[layout.entrance_off + data[layout.position_off + p_id] + 1]
+        if h_id == state.NO_ENTRANCE:
+            return state.NO_OWNER
+        owner = data[layout.owner_off + h_id]
+        if owner == state.NO_OWNER or owner == p_id or data[layout.star_off + h_id] == 0:
+            return state.NO_OWNER
+        return h_id
+
+    def pay_rent(self,
+                 data: MutableSequence[int],
+                 h_id: int,
+                 nights: int
+                 ) -> bool:
+        """
+        Current player pays the owner of the hotel for the nights spent
+        :param data: state buffer
+        :param h_id: id of the hotel
+        :param nights: die value, number of nights
+        :return: True if the player went broke and is out of the game
+        """
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        amount = self.payments[h_id][data[layout.star_off + h_id] - 1][nights - 1]
+        data[layout.money_off + p_id] -= amount
+        data[layout.money_off + data[layout.owner_off + h_id]] += amount
+        if data[layout.money_off + p_id] <= 0:
+            self.eliminate(data, p_id)
+            return True
+        return False
+
+    def eliminate(self,
+                  data: MutableSequence[int],
+                  p_id: int
+                  ) -> None:
+        """
+        Remove a broke player from the board and free the properties
+        :param data: state buffer
+        :param p_id: id of the player
+        """
+        layout = self.layout
+        data[layout.cell_players_off + data[layout.position_off + p_id] + 1] &= ~(1 << p_id)
+        data[layout.position_off + p_id] = state.OFF_BOARD
+        for h_id in range(self.n_hotels):
+            if data[layout.owner_off + h_id] == p_id:
+                data[layout.owner_off + h_id] = state.NO_OWNER
+        data[layout.owner_mask_off + p_id] = 0
+
+    def generate_actions(self,
+                         data: MutableSequence[int],
+                         out: MutableSequence[int],
+                         offset: int = 0
+                         ) -> int:
+        """
+        Write the actions the current player can choose on the cell reached into a preallocated buffer
+        Each action is checked against the money of the player; rent is not an action, it is paid on landing
+        Nothing is allocated: meant for search and self-play, which generate actions at every node
+        :param data: state buffer
+        :param out: action buffer, with at least max_actions slots from offset (see new_action_buffer)
+        :param offset: first slot of out to write
+        :return: number of actions written, PASS always first
+        """
+        layout = self.layout
+        n_hotels = self.n_hotels
+        p_id = data[state.CURRENT_PLAYER]
+        cell_idx = data[layout.position_off + p_id] + 1
+        out[offset] = PASS
+        if cell_idx < 0:    # off board
+            return 1
+        money = data[layout.money_off + p_id]
+        cell_type = self.cell_type[cell_idx]
+        free_cell = data[layout.entrance_off + cell_idx] == state.NO_ENTRANCE
+
+        n = offset + 1
+        for h_id in self.hotels_near[cell_idx]:
+            owner = data[layout.owner_off + h_id]
+            if owner == state.NO_OWNER:
+                if cell_type == BUYING_LAND and money > self.land_cost[h_id]:
+                    out[n] = 1 + h_id
+                    n += 1
+                continue
+            if owner != p_id:
+                continue
+            if cell_type == BUILDING_PERMISSION or cell_type == FREE_STAGE:
+                upgrade = self.next_upgrade[h_id][data[layout.upgrade_off + h_id] + 1]
+                if upgrade is not None and \
+                        (cell_type == FREE_STAGE or money > self.upgrade_cost[h_id][upgrade]):
+                    out[n] = 1 + n_hotels + h_id
+                    n += 1
+            if free_cell and data[layout.star_off + h_id] > 0 and \
+                    (cell_type == FREE_ENTRANCE or money > self.entrance_cost[h_id]):
+                out[n] = 1 + 2 * n_hotels + h_id
+                n += 1
+        return n - offset
+
+    def generate_actions_batch(self,
+                               buffers: Sequence[MutableSequence[int]],
+                               out: MutableSequence[int],
+                               counts: MutableSequence[int]
+                               ) -> None:
+        """
+        generate_actions for many states at once, into one flat preallocated buffer
+        The actions of state i are out[i * max_actions: i * max_actions + counts[i]]
+        :param buffers: state buffers
+        :param out: action buffer, with at least len(buffers) * max_actions slots
+        :param counts: number of actions of each state, written
+        """
+        generate = self.generate_actions
+        stride = self.max_actions
+        for i, data in enumerate(buffers):
+            counts[i] = generate(data, out, i * stride)
+
+    def new_action_buffer(self,
+                          n_states: int = 1
+                          ) -> array:
+        """
+        :param n_states: number of states the buffer is for
+        :return: action buffer for generate_actions or generate_actions_batch
+        """
+        return array('i', bytes(4 * n_states * self.max_actions))
+
+    def legal_actions(self,
+                      data: MutableSequence[int]
+                      ) -> list[int]:
+        """
+        Actions the current player can choose on the cell reached, as a new list
+        For convenience callers: hot paths use generate_actions with a preallocated buffer
+        :param data: state buffer
+        :return: list of encoded actions, PASS always included
+        """
+        out = [PASS] * self.max_actions
+        return out[:self.generate_actions(data, out)]
+
+    def apply_action(self,
+                     data: MutableSequence[int],
+                     action: int
+                     ) -> None:
+        """
+        Apply a legal action for the current player
+        :param data: state buffer
+        :param action: encoded action, as returned by legal_actions
+        """
+        if action == PASS:
+            return
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        cell_idx = data[layout.position_off + p_id] + 1
+        cell_type = self.cell_type[cell_idx]
+        kind, h_id = divmod(action - 1, self.n_hotels)
+
+        if kind == BUY_LAND - 1:
+            data[layout.money_off + p_id] -= self.land_cost[h_id]
+            data[layout.owner_off + h_id] = p_id
+            data[layout.owner_mask_off + p_id] |= 1 << h_id     # n_hotels < 31: never the sign bit
+        elif kind == BUILD - 1:
+            upgrade = self.next_upgrade[h_id][data[layout.upgrade_off + h_id] + 1]
+            if cell_type != FREE_STAGE:
+                data[layout.money_off + p_id] -= self.upgrade_cost[h_id][upgrade]
+            data[layout.upgrade_off + h_id] = upgrade
+            data[layout.star_off + h_id] = self.star_upgrade[h_id][upgrade]
+        else:
+            if cell_type != FREE_ENTRANCE:
+                data[layout.money_off + p_id] -= self.entrance_cost[h_id]
+            data[layout.entrance_off + cell_idx] = h_id
+            mask_idx = layout.entrance_mask_off + h_id
+            data[mask_idx] = bitboard.to_int32(bitboard.to_uint32(data[mask_idx]) | (1 << cell_idx))
+
+    def end_turn(self,
+                 data: MutableSequence[int]
+                 ) -> None:
+        """
+        Pass the turn to the next player still on the board
+        :param data: state buffer
+        """
+        position_off = self.layout.position_off
+        n_players = self.n_players
+        p_id = data[state.CURRENT_PLAYER]
+        for _ in range(n_players):
+            p_id += 1
+            if p_id == n_players:
+                p_id = 0
+            if data[position_off + p_id] != state.OFF_BOARD:
+                break
+        data[state.CURRENT_PLAYER] = p_id
+        data[state.TURN] += 1
+
+    def n_active(self,
+                 data: MutableSequence[int]
+                 ) -> int:
+        """
+        :param data: state buffer
+        :return: number of players still on the board
+        """
+        position_off = self.layout.position_off
+        return sum(1 for p_id in range(self.n_players)
+                   if data[position_off + p_id] != state.OFF_BOARD)
+
+    def is_over(self,
+                data: MutableSequence[int]
+                ) -> bool:
+        """
+        :param data: state buffer
+        :return: True if at most one player is left on the board
+        """
+        return self.n_active(data) <= 1
+
+    def entrances_in_reach(self,
+                           data: MutableSequence[int],
+                           cell_id: int
+                           ) -> int:
+        """
+        Hotels with an entrance on a cell reachable by one roll, read from the bitboards
+        :param data: state buffer
+        :param cell_id: id of the cell the roll starts from
+        :return: bitboard of the hotels, bit hotel id
+        """
+        reach = self.reach_mask[cell_id + 1]
+        entrance_mask_off = self.layout.entrance_mask_off
+        hotels = 0
+        for h_id in range(self.n_hotels):
+            if data[entrance_mask_off + h_id] & reach:
+                hotels |= 1 << h_id
+        return hotels
+
+    def cells_near_owned(self,
+                         data: MutableSequence[int],
+                         p_id: int
+                         ) -> int:
+        """
+        Cells where the player can build or place entrances, read from the bitboards
+        :param data: state buffer
+        :param p_id: id of the player
+        :return: bitboard of the cells near the hotels owned by the player, bit cell_id + 1
+        """
+        near_mask = self.near_mask
+        cells = 0
+        for h_id in bitboard.iter_bits(data[self.layout.owner_mask_off + p_id]):
+            cells |= near_mask[h_id]
+        return cells
+
+    def net_worth(self,
+                  data: MutableSequence[int],
+                  p_id: int
+                  ) -> int:
+        """
+        Money plus value of lands, buildings and entrances owned
+        :param data: state buffer
+        :param p_id: id of the player
+        :return: net worth of the player, 0 if out of the game
+        """
+        layout = self.layout
+        if data[layout.position_off + p_id] == state.OFF_BOARD:
+            return 0
+        worth = data[layout.money_off + p_id]
+        owned = [False] * self.n_hotels
+        for h_id in range(self.n_hotels):
+            if data[layout.owner_off + h_id] == p_id:
+                owned[h_id] = True
+                worth += self.land_cost[h_id] + self.invested[h_id][data[layout.upgrade_off + h_id] + 1]
+        for cell_idx in range(layout.get_n_cells()):
+            h_id = data[layout.entrance_off + cell_idx]
+            if h_id != state.NO_ENTRANCE and owned[h_id]:
+                worth += self.entrance_cost[h_id]
+        return worth
+
+    def play_turn(self,
+                  data: MutableSequence[int],
+                  rng: Random,
+                  policy: Callable,
+                  recorder: Callable = None
+                  ) -> bool:
+        """
+        Play a whole turn of the current player
+        The actions are generated into a buffer of the rules, nothing is allocated unless the policy has a choice
+        to make: a Rules instance plays one turn at a time, threads playing at once need their own rules
+        :param data: state buffer
+        :param rng: random generator for the dice
+        :param policy: policy(rules, data, actions, rng) -> action, choosing among the legal actions
+        :param recorder: recorder(data, p_id, move, nights, action), called before the turn passes (see replay)
+                         nights is 0 if no rent was paid
+        :return: True if the player went broke during the turn
+        """
+        # move and rent_due, inlined: this is the innermost loop of every simulation
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        pos_idx = layout.position_off + p_id
+        move = int(rng.random() * DIE_FACES) + 1
+        cell_id = (data[pos_idx] + move) % self.ring_size
+        data[layout.cell_players_off + data[pos_idx] + 1] &= ~(1 << p_id)
+        data[layout.cell_players_off + cell_id + 1] |= 1 << p_id
+        data[pos_idx] = cell_id
+        broke = False
+        nights = 0
+        action = PASS
+        if data[layout.entrance_off + cell_id + 1] != state.NO_ENTRANCE:
+            h_id = self.rent_due(data)
+            if h_id != state.NO_OWNER:
+                nights = int(rng.random() * DIE_FACES) + 1
+                broke = self.pay_rent(data, h_id, nights)
+        if not broke:
+            actions = self.__turn_actions
+            n = self.generate_actions(data, actions)
+            if n > 1:
+                action = policy(self, data, actions[:n], rng)
+                self.apply_action(data, action)
+        if recorder is not None:
+            recorder(data, p_id, move, nights, action)
+        self.end_turn(data)
+        return broke
+
+    # make / unmake: the same transitions, recording the slots written in a trail
+    # of (slot, previous value) pairs, so that depth-first search can undo them in place
+
+    def make_move(self,
+                  data: MutableSequence[int],
+                  delta: int,
+                  trail: list[int],
+                  dest: int = None
+                  ) -> int:
+        """
+        move, recorded in the trail
+        :param data: state buffer
+        :param delta: number of cells to move
+        :param trail: undo trail, extended
+        :param dest: id of the cell reached, read from the transition table by the caller, computed if not specified
+        :return: id of the cell reached
+        """
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        pos_idx = layout.position_off + p_id
+        if dest is None:
+            dest = (data[pos_idx] + delta) % self.ring_size
+        src_idx = layout.cell_players_off + data[pos_idx] + 1
+        dest_idx = layout.cell_players_off + dest + 1
+        trail += (pos_idx, data[pos_idx], src_idx, data[src_idx], dest_idx, data[dest_idx])
+        data[src_idx] &= ~(1 << p_id)
+        data[dest_idx] |= 1 << p_id
+        data[pos_idx] = dest
+        return dest
+
+    def make_rent(self,
+                  data: MutableSequence[int],
+                  h_id: int,
+                  nights: int,
+                  trail: list[int]
+                  ) -> bool:
+        """
+        pay_rent, recorded in the trail, then end_turn if the player went broke
+        :param data: state buffer
+        :param h_id: id of the hotel
+        :param nights: die value, number of nights
+        :param trail: undo trail, extended
+        :return: True if the player went broke and is out of the game
+        """
+        layout = self.layout
+        p_id = data[state.CURRENT_PLAYER]
+        money_idx = layout.money_off + p_id
+        owner_money_idx = layout.money_off + data[layout.owner_off + h_id]
+        trail += (money_idx, data[money_idx], owner_money_idx, data[owner_money_idx])
+        amount = self.payments[h_id][data[layout.star_off + h_id] - 1][nights - 1]
+        if data[money_idx] - amount > 0:
+            self.pay_rent(data, h_id, nights)
+            return False
+        # eliminate: position, players on the cell, hotels owned
+        pos_idx = layout.position_off + p_id
+        cell_idx = layout.cell_players_off + data[pos_idx] + 1
+        mask_idx = layout.owner_mask_off + p_id
+        trail += (pos_idx, data[pos_idx], cell_idx, data[cell_idx], mask_idx, data[mask_idx])
+        for owned in bitboard.iter_bits(data[mask_idx]):
+            trail += (layout.owner_off + owned, p_id)
+        trail += (state.CURRENT_PLAYER, p_id, state.TURN, data[state.TURN])
+        self.pay_rent(data, h_id, nights)
+        self.end_turn(data)
+        return True
+
+    def make_action(self,
+                    data: MutableSequence[int],
+                    action: int,
+                    trail: list[int]
+                    ) -> None:
+        """
+        apply_action then end_turn, recorded in the trail
+        :param data: state buffer
+        :param action: encoded action, as returned by legal_actions
+        :param trail: undo trail, extended
+        """
+        trail += (state.CURRENT_PLAYER, data[state.CURRENT_PLAYER], state.TURN, data[state.TURN])
+        if action != PASS:
+            layout = self.layout
+            p_id = data[state.CURRENT_PLAYER]
+            money_idx = layout.money_off + p_id
+            kind, h_id = divmod(action - 1, self.n_hotels)
+            if kind == BUY_LAND - 1:
+                owner_idx, mask_idx = layout.owner_off + h_id, layout.owner_mask_off + p_id
+                trail += (money_idx, data[money_idx], owner_idx, data[owner_idx], mask_idx, data[mask_idx])
+            elif kind == BUILD - 1:
+                upgrade_idx, star_idx = layout.upgrade_off + h_id, layout.star_off + h_id
+                trail += (money_idx, data[money_idx], upgrade_idx, data[upgrade_idx], star_idx, data[star_idx])
+            else:
+                entrance_idx = layout.entrance_off + data[layout.position_off + p_id] + 1
+                mask_idx = layout.entrance_mask_off + h_id
+                trail += (money_idx, data[money_idx], entrance_idx, data[entrance_idx], mask_idx, data[mask_idx])
+            self.apply_action(data, action)
+        self.end_turn(data)
+
+    @staticmethod
+    def unmake(data: MutableSequence[int],
+               trail: list[int],
+               mark: int
+               ) -> None:
+        """
+        Undo the transitions recorded after a mark, latest first
+        :param data: state buffer
+        :param trail: undo trail, shortened to the mark
+        :param mark: length of the trail before the transitions to undo
+        """
+        for i in range(len(trail) - 2, mark - 2, -2):
+            data[trail[i]] = trail[i + 1]
+        del trail[mark:]
+
+    def state_key(self,
+                  data: Sequence[int]
+                  ) -> int:
+        """
+        Zobrist hash of a raw buffer, from scratch: search hashes its root once, then follows key_delta
+        :param data: state buffer
+        :return: hash of the state, as GameState.get_key
+        """
+        return self.layout.zobrist.full_hash(data)
+
+    def key_delta(self,
+                  data: Sequence[int],
+                  trail: list[int],
+                  mark: int
+                  ) -> int:
+        """
+        Change of the Zobrist hash made by the transitions recorded after a mark, the incremental update of
+        GameState for raw buffers: XOR it into the hash before the transitions to get the hash after them,
+        and again after unmake to get it back
+        :param data: state buffer, after the transitions
+        :param trail: undo trail
+        :param mark: length of the trail before the transitions
+        :return: XOR of the keys of the slots changed, before and after
+        """
+        # value of each slot before the transitions: its first record after the mark
+        before = dict()
+        for i in range(len(trail) - 2, mark - 2, -2):
+            before[trail[i]] = trail[i + 1]
+        key = self.layout.zobrist.key
+        delta = 0
+        for idx, value in before.items():
+            delta ^= key(idx, value) ^ key(idx, data[idx])
+        return delta
+
+
+def random_policy(rules: Rules,
+                  data: MutableSequence[int],
+                  actions: list[int],
+                  rng: Random
+                  ) -> int:
+    """
+    Default policy: uniform choice among the legal actions
+    :param rules: rules of the game
+    :param data: state buffer
+    :param actions: legal actions
+    :param rng: random generator
+    :return: chosen action
+    """
+    return actions[int(rng.random() * len(actions))]
+
+
+def greedy_policy(rules: Rules,
+                  data: MutableSequence[int],
+                  actions: list[int],
+                  rng: Random
+                  ) -> int:
+    """
+    Always act whenever possible, preferring entrances, then buildings, then lands
+    :param rules: rules of the game
+    :param data: state buffer
+    :param actions: legal actions
+    :param rng: random generator, unused
+    :return: chosen action
+    """
+    return max(actions)
@@ -0,0 +1,571 @@
+"""
+Contains StateLayout and GameState classes
+GameState is the compact, array-backed storage of every mutable information of a game
+Model classes (Player, Hotel, Cell, Board) are thin views over a GameState
+"""
+
+import game.model.bitboard as bitboard
+import game.model.zobrist as zobrist
+
+from array import array
+from typing import Iterable, MutableSequence
+
+START_MONEY = 12000     # standard start of the game
+N_CELLS = 32            # cell ids go from -1 (start) to 30
+
+START_CELL = -1
+OFF_BOARD = -2          # position of a player removed from the board
+NO_OWNER = -1
+NO_ENTRANCE = -1
+NO_UPGRADE = -1
+
+# header slots, before the per-entity vectors
+TURN = 0
+CURRENT_PLAYER = 1
+HEADER_SIZE = 2
+
+
+class StateLayout:
+    """
+    Describes how the vectors of a game are packed in a single flat buffer
+    One layout is shared by every GameState of the same game (and by its clones)
+
+    Buffer layout:
+        [turn, current player,
+         money * n_players, position * n_players,
+         owner * n_hotels, star level * n_hotels, last upgrade * n_hotels,
+         entrance * n_cells, occupied * n_cells,
+         occupied cells mask, entrance cells mask * n_hotels, owned hotels mask * n_players,
+         players mask * n_cells]
+    Players and hotels are addressed by integer id, cells by cell_id + 1
+    The masks are bitboards (see bitboard) derived from the vectors, kept in sync by the GameState setters
+    and by Rules; they are left out of the Zobrist hash. They double as reverse indexes:
+    hotel -> entrance cells, player -> owned hotels, cell -> players standing on it
+    """
+
+    def __init__(self,
+                 player_names: Iterable[str],
+                 hotel_names: Iterable[str],
+                 n_cells: int = N_CELLS,
+                 standalone: bool = False):
+        """
+        :param player_names: names of the players, in id order
+        :param hotel_names: names of the hotels, in id order
+        :param n_cells: number of cells of the board, start cell included
+        :param standalone: True for the private layout of a view built outside a game, which registers
+        unknown names instead of raising
+        """
+        self.__player_names: list[str] = list(player_names)
+        self.__player_ids: dict[str: int] = {name: i for i, name in enumerate(self.__player_names)}
+        self.__hotel_names: list[str] = list(hotel_names)
+        self.__hotel_ids: dict[str: int] = {name: i for i, name in enumerate(self.__hotel_names)}
+
+        self.__n_players: int = len(self.__player_names)
+        self.__n_hotels: int = len(self.__hotel_names)
+        self.__n_cells: int = n_cells
+        self.__standalone: bool = standalone
+
+        # offsets of each vector inside the buffer
+        self.money_off: int = HEADER_SIZE
+        self.position_off: int = self.money_off + self.__n_players
+        self.owner_off: int = self.position_off + self.__n_players
+        self.star_off: int = self.owner_off + self.__n_hotels
+        self.upgrade_off: int = self.star_off + self.__n_hotels
+        self.entrance_off: int = self.upgrade_off + self.__n_hotels
+        self.occupied_off: int = self.entrance_off + n_cells
+        self.occupied_mask_off: int = self.occupied_off + n_cells
+        self.entrance_mask_off: int = self.occupied_mask_off + 1
+        self.owner_mask_off: int = self.entrance_mask_off + self.__n_hotels
+        self.cell_players_off: int = self.owner_mask_off + self.__n_players
+        self.size: int = self.cell_players_off + n_cells
+        assert self.__n_players < 31, f'Players must fit in the bits of an int32 mask'
+        assert self.__n_hotels < 31, f'Hotels must fit in the bits of an int32 mask'
+
+        # buffer of a new game, copied by every new state
+        self.__template: array = array('i', [0] * self.size)
+        t = self.__template
+        for i in range(self.__n_players):
+            t[self.money_off + i] = START_MONEY
+            t[self.position_off + i] = START_CELL
+        for i in range(self.__n_hotels):
+            t[self.owner_off + i] = NO_OWNER
+            t[self.upgrade_off + i] = NO_UPGRADE
+        for i in range(n_cells):
+            t[self.entrance_off + i] = NO_ENTRANCE
+        t[self.cell_players_off + START_CELL + 1] = (1 << self.__n_players) - 1
+
+        # Zobrist keys of the slots, shared by every state of the layout
+        self.zobrist: zobrist.ZobristKeys = zobrist.ZobristKeys(size=self.size,
+                                                                money_slots=range(self.money_off, self.position_off),
+                                                                unhashed=(TURN, *range(self.occupied_mask_off,
+                                                                                       self.size)))
+        self.__template_key: int = self.zobrist.full_hash(self.__template)
+
+    def get_n_players(self) -> int:
+        """
+        :return: number of player slots in the buffer
+        """
+        return self.__n_players
+
+    def get_n_hotels(self) -> int:
+        """
+        :return: number of hotel slots in the buffer
+        """
+        return self.__n_hotels
+
+    def get_n_cells(self) -> int:
+        """
+        :return: number of cell slots in the buffer
+        """
+        return self.__n_cells
+
+    def get_player_names(self) -> list[str]:
+        """
+        :return: player names, indexed by player id
+        """
+        return self.__player_names
+
+    def get_hotel_names(self) -> list[str]:
+        """
+        :return: hotel names, indexed by hotel id
+        """
+        return self.__hotel_names
+
+    def player_id(self,
+                  name: str
+                  ) -> int:
+        """
+        Get the id of a player given the name
+        A standalone layout registers unknown names with a new id, so that views can refer to players outside
+        the game (e.g. a standalone Hotel owned by any name). Such ids have no money nor position slot
+        :param name: name of the player
+        :return: id of the player
+        :raise KeyError if the player is not in the layout of a game
+        """
+        p_id = self.__player_ids.get(name)
+        if p_id is None:
+            if not self.__standalone:
+                raise KeyError(f'Could not find Player {name} in the game')
+            p_id = self.__player_ids[name] = len(self.__player_names)
+            self.__player_names.append(name)
+        return p_id
+
+    def hotel_id(self,
+                 name: str
+                 ) -> int:
+        """
+        Get the id of a hotel given the name
+        A standalone layout registers unknown names with a new id, see player_id
+        :param name: name of the hotel
+        :return: id of the hotel
+        :raise KeyError if the hotel is not in the layout of a game
+        """
+        h_id = self.__hotel_ids.get(name)
+        if h_id is None:
+            if not self.__standalone:
+                raise KeyError(f'Could not find Hotel {name} in the game')
+            h_id = self.__hotel_ids[name] = len(self.__hotel_names)
+            self.__hotel_names.append(name)
+        return h_id
+
+    def has_player(self,
+                   name: str
+                   ) -> bool:
+        """
+        :param name: name of the player
+        :return: True if the player has a slot in the buffer
+        """
+        p_id = self.__player_ids.get(name)
+        return p_id is not None and p_id < self.__n_players
+
+    def rebuild_masks(self,
+                      data: MutableSequence[int]
+                      ) -> None:
+        """
+        Recompute the bitboards of a buffer from its vectors, after raw writes that did not maintain them
+        :param data: state buffer
+        """
+        n_players, n_hotels = self.__n_players, self.__n_hotels
+        occupied = 0
+        entrances = [0] * n_hotels
+        owned = [0] * n_players
+        players = [0] * self.__n_cells
+        for p_id in range(n_players):
+            pos = data[self.position_off + p_id]
+            if pos != OFF_BOARD:
+                players[pos + 1] |= 1 << p_id
+        for cell_idx in range(self.__n_cells):
+            if data[self.occupied_off + cell_idx]:
+                occupied |= 1 << cell_idx
+            h_id = data[self.entrance_off + cell_idx]
+            if 0 <= h_id < n_hotels:
+                entrances[h_id] |= 1 << cell_idx
+        for h_id in range(n_hotels):
+            p_id = data[self.owner_off + h_id]
+            if 0 <= p_id < n_players:
+                owned[p_id] |= 1 << h_id
+        data[self.occupied_mask_off] = bitboard.to_int32(occupied)
+        for h_id, mask in enumerate(entrances):
+            data[self.entrance_mask_off + h_id] = bitboard.to_int32(mask)
+        for p_id, mask in enumerate(owned):
+            data[self.owner_mask_off + p_id] = bitboard.to_int32(mask)
+        for cell_idx, mask in enumerate(players):
+            data[self.cell_players_off + cell_idx] = mask
+
+    def new_buffer(self) -> array:
+        """
+        :return: buffer of a new game
+        """
+        return array('i', self.__template)
+
+    def get_new_key(self) -> int:
+        """
+        :return: Zobrist hash of the buffer of a new game
+        """
+        return self.__template_key
+
+
+class GameState:
+    """
+    GameState class
+    Every mutable value of a game, stored as int32 in one flat array
+    Snapshots share the buffer copy-on-write: the buffer is copied on the first write after a snapshot
+    The Zobrist hash of the buffer is kept up to date by every setter
+    """
+
+    __slots__ = ('__layout', '__data', '__shared', '__key')
+
+    def __init__(self,
+                 layout: StateLayout,
+                 data: array = None,
+                 shared: bool = False,
+                 key: int = None):
+        """
+        :param layout: layout of the buffer, shared among states of the same game
+        :param data: buffer to wrap, a new game buffer if not specified
+        :param shared: True if the buffer is shared with another state and must be copied before writing
+        :param key: Zobrist hash of the buffer, computed if not specified
+        """
+        self.__layout: StateLayout = layout
+        if data is None:
+            data = layout.new_buffer()
+            key = layout.get_new_key()
+        self.__data: array = data
+        self.__shared: bool = shared
+        self.__key: int = key if key is not None else layout.zobrist.full_hash(data)
+
+    def __eq__(self, other):
+        return self.__data == other.get_data()
+
+    def __hash__(self):
+        return self.__key
+
+    def __write(self,
+                idx: int,
+                value: int
+                ) -> None:
+        """
+        Write a slot of the buffer, copying the buffer if shared and updating the Zobrist hash
+        :param idx: slot of the buffer
+        :param value: new value
+        """
+        data = self.get_mutable_data()
+        key = self.__layout.zobrist.key
+        self.__key ^= key(idx, data[idx]) ^ key(idx, value)
+        data[idx] = value
+
+    def __repr__(self):
+        return f'GameState: {self.__data.tolist()}'
+
+    def get_layout(self) -> StateLayout:
+        """
+        :return: layout of the buffer
+        """
+        return self.__layout
+
+    def get_data(self) -> array:
+        """
+        Read only access to the buffer, the buffer may be shared with snapshots
+        :return: raw buffer, for code iterating on the state in its inner loop
+        """
+        return self.__data
+
+    def get_mutable_data(self) -> array:
+        """
+        Writable access to the buffer, copying it first if shared with snapshots
+        Raw writes bypass the Zobrist hash and the bitboards, call rehash and rebuild_masks when done
+        :return: raw buffer, owned by this state only
+        """
+        if self.__shared:
+            self.__data = array('i', self.__data)
+            self.__shared = False
+        return self.__data
+
+    def snapshot(self) -> 'GameState':
+        """
+        Copy-on-write copy of the state, O(1)
+        :return: new state sharing the buffer until one of the two is written
+        """
+        self.__shared = True
+        return GameState(self.__layout, self.__data, shared=True, key=self.__key)
+
+    def copy(self) -> 'GameState':
+        """
+        Eager copy of the state
+        :return: new state with its own buffer
+        """
+        return GameState(self.__layout, array('i', self.__data), key=self.__key)
+
+    def get_key(self) -> int:
+        """
+        :return: Zobrist hash of the state, turn counter excluded
+        """
+        return self.__key
+
+    def rehash(self) -> None:
+        """
+        Recompute the Zobrist hash from scratch, after raw writes to the buffer
+        """
+        self.__key = self.__layout.zobrist.full_hash(self.__data)
+
+    def rebuild_masks(self) -> None:
+        """
+        Recompute the bitboards from scratch, after raw writes to the buffer
+        """
+        self.__layout.rebuild_masks(self.get_mutable_data())
+
+    def restore(self,
+                snapshot: 'GameState'
+                ) -> None:
+        """
+        Bring the state back to a snapshot, O(1)
+        Views over this state stay valid
+        :param snapshot: state to restore, must share the same layout
+        :raise AssertionError if the layouts differ
+        """
+        assert snapshot.get_layout() is self.__layout, f'Cannot restore a state of a different game'
+        self.__data = snapshot.snapshot().get_data()
+        self.__shared = True
+        self.__key = snapshot.get_key()
+
+    def get_turn(self) -> int:
+        """
+        :return: number of turns played
+        """
+        return self.__data[TURN]
+
+    def set_turn(self,
+                 turn: int
+                 ) -> None:
+        """
+        :param turn: number of turns played
+        """
+        self.__write(TURN, turn)
+
+    def get_current_player(self) -> int:
+        """
+        :return: id of the player whose turn it is
+        """
+        return self.__data[CURRENT_PLAYER]
+
+    def set_current_player(self,
+                           p_id: int
+                           ) -> None:
+        """
+        :param p_id: id of the player whose turn it is
+        """
+        self.__write(CURRENT_PLAYER, p_id)
+
+    def get_money(self,
+                  p_id: int
+                  ) -> int:
+        """
+        :param p_id: id of the player
+        :return: money owned by the player
+        """
+        return self.__data[self.__layout.money_off + p_id]
+
+    def change_money(self,
+                     p_id: int,
+                     amount: int
+                     ) -> None:
+        """
+        :param p_id: id of the player
+        :param amount: negative -> removing money, positive -> adding money
+        """
+        idx = self.__layout.money_off + p_id
+        self.__write(idx, self.__data[idx] + amount)
+
+    def get_position(self,
+                     p_id: int
+                     ) -> int:
+        """
+        :param p_id: id of the player
+        :return: id of the cell the player is standing in, OFF_BOARD if removed
+        """
+        return self.__data[self.__layout.position_off + p_id]
+
+    def set_position(self,
+                     p_id: int,
+                     cell_id: int
+                     ) -> None:
+        """
+        :param p_id: id of the player
+        :param cell_id: id of the cell the player is moved to, OFF_BOARD to remove the player
+        """
+        layout = self.__layout
+        if p_id < layout.get_n_players():
+            old = self.__data[layout.position_off + p_id]
+            if old != OFF_BOARD:
+                idx = layout.cell_players_off + old + 1
+                self.__write(idx, self.__data[idx] & ~(1 << p_id))
+            if cell_id != OFF_BOARD:
+                idx = layout.cell_players_off + cell_id + 1
+                self.__write(idx, self.__data[idx] | (1 << p_id))
+        self.__write(layout.position_off + p_id, cell_id)
+
+    def get_cell_players(self,
+                         cell_id: int
+                         ) -> int:
+        """
+        :param cell_id: id of the cell
+        :return: bitboard of the players standing on the cell, bit player id
+        """
+        return self.__data[self.__layout.cell_players_off + cell_id + 1]
+
+    def get_owner(self,
+                  h_id: int
+                  ) -> int:
+        """
+        :param h_id: id of the hotel
+        :return: id of the owner, NO_OWNER if none
+        """
+        return self.__data[self.__layout.owner_off + h_id]
+
+    def set_owner(self,
+                  h_id: int,
+                  p_id: int
+                  ) -> None:
+        """
+        :param h_id: id of the hotel
+        :param p_id: id of the owner, NO_OWNER to free the property
+        """
+        layout = self.__layout
+        n_players = layout.get_n_players()
+        if h_id < layout.get_n_hotels():
+            old = self.__data[layout.owner_off + h_id]
+            if 0 <= old < n_players:
+                idx = layout.owner_mask_off + old
+                self.__write(idx, bitboard.to_int32(bitboard.to_uint32(self.__data[idx]) & ~(1 << h_id)))
+            if 0 <= p_id < n_players:
+                idx = layout.owner_mask_off + p_id
+                self.__write(idx, bitboard.to_int32(bitboard.to_uint32(self.__data[idx]) | (1 << h_id)))
+        self.__write(layout.owner_off + h_id, p_id)
+
+    def get_owner_mask(self,
+                       p_id: int
+                       ) -> int:
+        """
+        :param p_id: id of the player
+        :return: bitboard of the hotels owned by the player, bit hotel id
+        """
+        return self.__data[self.__layout.owner_mask_off + p_id]
+
+    def get_star_level(self,
+                       h_id: int
+                       ) -> int:
+        """
+        :param h_id: id of the hotel
+        :return: current star level of the hotel
+        """
+        return self.__data[self.__layout.star_off + h_id]
+
+    def get_last_upgrade(self,
+                         h_id: int
+                         ) -> int:
+        """
+        :param h_id: id of the hotel
+        :return: idx of the last upgrade built, NO_UPGRADE if none
+        """
+        return self.__data[self.__layout.upgrade_off + h_id]
+
+    def set_upgrade(self,
+                    h_id: int,
+                    upgrade_type: int,
+                    star_level: int
+                    ) -> None:
+        """
+        :param h_id: id of the hotel
+        :param upgrade_type: idx of the upgrade built
+        :param star_level: star level reached with the upgrade
+        """
+        layout = self.__layout
+        self.__write(layout.upgrade_off + h_id, upgrade_type)
+        self.__write(layout.star_off + h_id, star_level)
+
+    def get_entrance(self,
+                     cell_id: int
+                     ) -> int:
+        """
+        :param cell_id: id of the cell
+        :return: id of the hotel with an entrance on the cell, NO_ENTRANCE if none
+        """
+        return self.__data[self.__layout.entrance_off + cell_id + 1]
+
+    def set_entrance(self,
+                     cell_id: int,
+                     h_id: int
+                     ) -> None:
+        """
+        :param cell_id: id of the cell
+        :param h_id: id of the hotel with an entrance on the cell, NO_ENTRANCE to remove it
+        """
+        layout = self.__layout
+        n_hotels = layout.get_n_hotels()
+        bit = bitboard.cell_bit(cell_id)
+        old = self.__data[layout.entrance_off + cell_id + 1]
+        if 0 <= old < n_hotels:
+            idx = layout.entrance_mask_off + old
+            self.__write(idx, bitboard.to_int32(bitboard.to_uint32(self.__data[idx]) & ~bit))
+        if 0 <= h_id < n_hotels:
+            idx = layout.entrance_mask_off + h_id
+            self.__write(idx, bitboard.to_int32(bitboard.to_uint32(self.__data[idx]) | bit))
+        self.__write(layout.entrance_off + cell_id + 1, h_id)
+
+    def get_entrance_mask(self,
+                          h_id: int
+                          ) -> int:
+        """
+        :param h_id: id of the hotel
+        :return: bitboard of the cells with an entrance of the hotel, bit cell_id + 1
+        """
+        return bitboard.to_uint32(self.__data[self.__layout.entrance_mask_off + h_id])
+
+    def is_occupied(self,
+                    cell_id: int
+                    ) -> bool:
+        """
+        :param cell_id: id of the cell
+        :return: True if cell is occupied by a player car
+        """
+        return self.__data[self.__layout.occupied_off + cell_id + 1] != 0
+
+    def set_occupied(self,
+                     cell_id: int,
+                     occupied: bool
+                     ) -> None:
+        """
+        :param cell_id: id of the cell
+        :param occupied: new occupancy of the cell
+        """
+        layout = self.__layout
+        mask = bitboard.to_uint32(self.__data[layout.occupied_mask_off])
+        mask = mask | bitboard.cell_bit(cell_id) if occupied else mask & ~bitboard.cell_bit(cell_id)
+        self.__write(layout.occupied_mask_off, bitboard.to_int32(mask))
+        self.__write(layout.occupied_off + cell_id + 1, int(occupied))
+
+    def get_occupied_mask(self) -> int:
+        """
+        :return: bitboard of the occupied cells, bit cell_id + 1
+        """
+        return bitboard.to_uint32(self.__data[self.__layout.occupied_mask_off])
@@ -0,0 +1,217 @@
+"""
+Contains StateSync and StateReplica classes, and the delta encoding
+A server commits the successive versions of a state buffer; each client acknowledges the last version it
+applied and is sent only the slots changed since, merged into one delta, instead of a full dump of the game
+Only the vectors are sent: the bitboards derive from them and are rebuilt by the replica
+
+Version 0 is the buffer of a new game, known to both sides: a client too far behind, or new, is sent the
+delta from version 0, which is never larger than the live vectors
+
+Delta encoding, bytes:
+    base version, version, number of changes        unsigned varints
+    per change, in increasing slot order:
+        slot gap (slot - previous slot - 1)         unsigned varint
+        new value                                   zigzag varint
+A turn changes a handful of slots (turn, current player, a position, some money, an owner): ~10 to 30 bytes
+"""
+
+from array import array
+from collections import deque
+
+import game.model.state as state
+
+
+def _write_uvarint(out: bytearray,
+                   value: int
+                   ) -> None:
+    """
+    :param out: bytes written to
+    :param value: unsigned int, 7 bits per byte, low bits first
+    """
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_uvarint(payload: bytes,
+                  pos: int
+                  ) -> tuple[int, int]:
+    """
+    :param payload: encoded bytes
+    :param pos: offset of the varint
+    :return: value, offset after the varint
+    :raise ValueError if the payload is truncated
+    """
+    value = shift = 0
+    while True:
+        if pos >= len(payload):
+            raise ValueError(f'Truncated delta')
+        b = payload[pos]
+        pos += 1
+        value |= (b & 0x7f) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_delta(base: int,
+                 version: int,
+                 changes: list[tuple[int, int]]
+                 ) -> bytes:
+    """
+    :param base: version the delta applies to
+    :param version: version reached once applied
+    :param changes: (slot, new value) pairs, in increasing slot order
+    :return: encoded delta
+    """
+    out = bytearray()
+    _write_uvarint(out, base)
+    _write_uvarint(out, version)
+    _write_uvarint(out, len(changes))
+    previous = -1
+    for slot, value in changes:
+        _write_uvarint(out, slot - previous - 1)
+        _write_uvarint(out, (value << 1) ^ (value >> 63))
+        previous = slot
+    return bytes(out)
+
+
+def decode_delta(payload: bytes) -> tuple[int, int, list[tuple[int, int]]]:
+    """
+    :param payload: encoded delta, see encode_delta
+    :return: base version, version, (slot, new value) pairs
+    :raise ValueError if the payload is truncated or too long
+    """
+    base, pos = _read_uvarint(payload, 0)
+    version, pos = _read_uvarint(payload, pos)
+    n, pos = _read_uvarint(payload, pos)
+    changes = []
+    slot = -1
+    for _ in range(n):
+        gap, pos = _read_uvarint(payload, pos)
+        zigzag, pos = _read_uvarint(payload, pos)
+        slot += gap + 1
+        changes.append((slot, (zigzag >> 1) ^ -(zigzag & 1)))
+    if pos != len(payload):
+        raise ValueError(f'Expected {pos} bytes of delta, got {len(payload)}')
+    return base, version, changes
+
+
+class StateSync:
+    """
+    StateSync class
+    Server side: versions of one game, and the slots changed by each of the recent ones
+    """
+
+    def __init__(self,
+                 layout: state.StateLayout,
+                 history: int = 256):
+        """
+        :param layout: layout of the state buffers committed
+        :param history: number of versions kept, older clients are sent the delta from version 0
+        """
+        self.__layout: state.StateLayout = layout
+        # vectors only, the bitboards start at occupied_mask_off
+        self.__n_slots: int = layout.occupied_mask_off
+        self.__template: list[int] = layout.new_buffer().tolist()[:self.__n_slots]
+        self.__last: list[int] = self.__template[:]
+        self.__version: int = 0
+        # (version, slots changed from the previous version) of the recent versions, oldest first
+        self.__history: deque[tuple[int, list[int]]] = deque(maxlen=history)
+
+    def get_version(self) -> int:
+        """
+        :return: last version committed, 0 before the first change
+        """
+        return self.__version
+
+    def commit(self,
+               data: array or list[int]
+               ) -> int:
+        """
+        :param data: state buffer, the new version if it differs from the last one
+        :return: version of the buffer
+        """
+        last = self.__last
+        n_slots = self.__n_slots
+        changed = [i for i in range(n_slots) if data[i] != last[i]]
+        if changed:
+            self.__version += 1
+            self.__history.append((self.__version, changed))
+            last[:] = data[:n_slots]
+        return self.__version
+
+    def delta(self,
+              since: int
+              ) -> bytes:
+        """
+        :param since: last version acknowledged by the client, 0 if none
+        :return: encoded delta from that version, or from version 0 if it is not kept anymore, to the last one
+        """
+        history, last, version = self.__history, self.__last, self.__version
+        if 0 < since <= version and (since == version or history[0][0] <= since + 1):
+            slots = set()
+            for v, changed in reversed(history):
+                if v <= since:
+                    break
+                slots.update(changed)
+        else:
+            since = 0
+            template = self.__template
+            slots = [i for i in range(self.__n_slots) if last[i] != template[i]]
+        return encode_delta(since, version, [(i, last[i]) for i in sorted(slots)])
+
+
+class StateReplica:
+    """
+    StateReplica class
+    Client side: copy of the state of a game, updated by the deltas of a StateSync
+    """
+
+    def __init__(self,
+                 layout: state.StateLayout):
+        """
+        :param layout: layout of the state of the game, as the server's
+        """
+        self.__layout: state.StateLayout = layout
+        self.__state: state.GameState = state.GameState(layout)
+        self.__version: int = 0
+
+    def get_state(self) -> state.GameState:
+        """
+        :return: state of the replica, bitboards and Zobrist hash included
+        """
+        return self.__state
+
+    def get_version(self) -> int:
+        """
+        :return: version of the replica, to acknowledge to the server
+        """
+        return self.__version
+
+    def apply(self,
+              payload: bytes
+              ) -> list[int]:
+        """
+        A delta from base to version holds the final value of every slot changed in between: it applies to any
+        replica at a version between the two, e.g. after a lost acknowledgement
+        :param payload: encoded delta
+        :return: slots written
+        :raise ValueError if the delta is corrupted or does not apply to the version of the replica
+        """
+        base, version, changes = decode_delta(payload)
+        if base == 0:
+            self.__state = state.GameState(self.__layout)
+        elif not base <= self.__version <= version:
+            raise ValueError(f'Delta from version {base} to {version} does not apply to version {self.__version}')
+        data = self.__state.get_mutable_data()
+        n_slots = self.__layout.occupied_mask_off
+        for slot, value in changes:
+            if slot >= n_slots:
+                raise ValueError(f'Slot {slot} is not a vector slot, expected less than {n_slots}')
+            data[slot] = value
+        self.__state.rebuild_masks()
+        self.__state.rehash()
+        self.__version = version
+        return [slot for slot, _ in changes]
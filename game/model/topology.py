@@ -0,0 +1,68 @@
+"""
+Contains BoardTopology class
+Immutable part of the board: ring order, cell types and hotels near each cell
+One instance is shared (flyweight) by every board built from the same cells config;
+the per-game part of a board (entrances, occupancy, positions) lives in the GameState
+"""
+
+from easydict import EasyDict
+from utils.compiled_config import get_compiled, CellSpec
+
+# shared topologies, by compiled cells: configs parsed separately but equal share the same instance
+_topologies: dict[tuple[CellSpec]: 'BoardTopology'] = dict()
+
+
+class BoardTopology:
+    """
+    BoardTopology class
+    Cells are indexed by cell_id + 1
+    """
+
+    __slots__ = ('n_cells', 'ring_size', 'cell_ids', 'cell_type', 'type_names', 'hotels_near', 'hotel_ids_near')
+
+    def __init__(self,
+                 cells: tuple[CellSpec]):
+        """
+        :param cells: compiled cells, by cell_id + 1
+        """
+        self.n_cells: int = len(cells)
+        # the start cell is left on the first move and never reached again
+        self.ring_size: int = self.n_cells - 1
+        self.cell_ids: tuple[int] = tuple(c.id for c in cells)
+        self.cell_type: tuple[int] = tuple(c.type for c in cells)
+        self.type_names: tuple[str] = tuple(c.type_name for c in cells)
+        self.hotels_near: tuple[tuple[str]] = tuple(c.hotels_near for c in cells)
+        self.hotel_ids_near: tuple[tuple[int]] = tuple(c.hotel_ids_near for c in cells)
+
+    def has_cell(self,
+                 cell_id: int
+                 ) -> bool:
+        """
+        :param cell_id: id of the cell
+        :return: True if the cell is in the board
+        """
+        return 0 <= cell_id + 1 < self.n_cells
+
+    def next_cell(self,
+                  cell_id: int,
+                  delta: int
+                  ) -> int:
+        """
+        :param cell_id: id of the cell the move starts from
+        :param delta: number of cells to move, negative to move backwards
+        :return: id of the cell reached
+        """
+        return (cell_id + delta) % self.ring_size     # modulo takes care of the sign of delta
+
+
+def get_topology(config: EasyDict) -> BoardTopology:
+    """
+    Shared topology of the board of a config, built on first use
+    :param config: global config dictionary
+    :return: topology of the board
+    """
+    cells = get_compiled(config).cells
+    topology = _topologies.get(cells)
+    if topology is None:
+        topology = _topologies[cells] = BoardTopology(cells)
+    return topology
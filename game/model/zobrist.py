@@ -0,0 +1,81 @@
+"""
+Contains ZobristKeys class
+Random 64 bit keys for every (buffer slot, value) pair of a GameState layout
+The Zobrist hash of a state is the XOR of the keys of its slots, and is updated in O(1) on each write:
+by the GameState setters, and by Rules.key_delta for the raw buffers made and unmade by search
+"""
+
+from typing import Sequence, Iterable
+
+MASK_64 = (1 << 64) - 1
+MONEY_BUCKET = 500      # money is hashed by bucket, states with close money are transpositions
+MAX_MONEY_BUCKET = 200
+
+
+def splitmix64(x: int) -> int:
+    """
+    Deterministic 64 bit mixer, used to derive the keys
+    :param x: input integer
+    :return: mixed 64 bit integer
+    """
+    x = (x + 0x9E3779B97F4A7C15) & MASK_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return x ^ (x >> 31)
+
+
+class ZobristKeys:
+    """
+    ZobristKeys class
+    One instance per StateLayout, keys are derived on first use and memoized
+    """
+
+    def __init__(self,
+                 size: int,
+                 money_slots: range,
+                 unhashed: Iterable[int] = (),
+                 seed: int = 0):
+        """
+        :param size: number of slots of the buffer
+        :param money_slots: slots holding money, hashed by bucket
+        :param unhashed: slots left out of the hash, e.g. the turn counter: the same position reached
+                         along different paths must have the same key
+        :param seed: seed of the keys, the same seed gives the same keys in any process
+        """
+        self.__seed: int = splitmix64(seed)
+        self.__money_slots: range = money_slots
+        self.__unhashed: frozenset[int] = frozenset(unhashed)
+        self.__keys: list[dict[int: int]] = [dict() for _ in range(size)]
+
+    def key(self,
+            idx: int,
+            value: int
+            ) -> int:
+        """
+        :param idx: slot of the buffer
+        :param value: value of the slot
+        :return: key of the slot holding the value
+        """
+        if idx in self.__unhashed:
+            return 0
+        if idx in self.__money_slots:
+            value = min(max(value // MONEY_BUCKET, 0), MAX_MONEY_BUCKET)
+        keys = self.__keys[idx]
+        k = keys.get(value)
+        if k is None:
+            k = keys[value] = splitmix64(self.__seed ^ (idx << 32) ^ (value & 0xFFFFFFFF))
+        return k
+
+    def full_hash(self,
+                  data: Sequence[int]
+                  ) -> int:
+        """
+        Hash of a whole buffer, for raw buffers or to check the incremental hash
+        :param data: state buffer
+        :return: Zobrist hash
+        """
+        h = 0
+        key = self.key
+        for idx, value in enumerate(data):
+            h ^= key(idx, value)
+        return h
@@ -0,0 +1,236 @@
+"""
+Contains BatchSimulator class
+Runs N independent games in lockstep, one turn of every game at a time, as NumPy array operations
+Same turn structure as game.model.rules, with a vectorized stochastic policy instead of a callable
+"""
+
+import numpy as np
+import game.model.state as state
+import game.model.rules as rules
+
+MAX_STARS = 5
+N_KINDS = 3     # BUY_LAND, BUILD, BUY_ENTRANCE
+
+
+class BatchSimulator:
+    """
+    BatchSimulator class
+    Every mutable value is a (n_games, ...) array, rules tables are dense arrays compiled once
+    """
+
+    def __init__(self,
+                 game_rules: rules.Rules,
+                 n_games: int,
+                 action_probs: np.ndarray = None,
+                 seed: int = None):
+        """
+        :param game_rules: compiled rules of the game, giving players, hotels and cells
+        :param n_games: number of games simulated together
+        :param action_probs: (n_players, 3) probability of each player to take a legal action of kind
+                             BUY_LAND, BUILD, BUY_ENTRANCE when one is available. Default: always take it
+        :param seed: seed of the random generator
+        """
+        self.__rules: rules.Rules = game_rules
+        self.__n_games: int = n_games
+        self.__rng: np.random.Generator = np.random.default_rng(seed)
+        self.__ring_size: int = game_rules.ring_size
+
+        n_players, n_hotels = game_rules.n_players, game_rules.n_hotels
+        n_cells = game_rules.layout.get_n_cells()
+        if action_probs is None:
+            action_probs = np.ones((n_players, N_KINDS))
+        self.__action_probs: np.ndarray = np.asarray(action_probs, dtype=np.float64)
+        assert self.__action_probs.shape == (n_players, N_KINDS), \
+            f'Expected action_probs of shape {(n_players, N_KINDS)}, got {self.__action_probs.shape}'
+
+        # dense rules tables
+        self.__land_cost: np.ndarray = np.array(game_rules.land_cost, dtype=np.int64)
+        self.__entrance_cost: np.ndarray = np.array(game_rules.entrance_cost, dtype=np.int64)
+        self.__star_upgrade: np.ndarray = np.array(game_rules.star_upgrade, dtype=np.int64)
+        self.__upgrade_cost: np.ndarray = np.array([[c or 0 for c in costs] for costs in game_rules.upgrade_cost],
+                                                   dtype=np.int64)
+        self.__next_upgrade: np.ndarray = np.array([[-1 if u is None else u for u in nxt]
+                                                    for nxt in game_rules.next_upgrade], dtype=np.int64)
+        self.__invested: np.ndarray = np.array(game_rules.invested, dtype=np.int64)
+        self.__payments: np.ndarray = np.zeros((n_hotels, MAX_STARS, rules.DIE_FACES), dtype=np.int64)
+        for h_id, matrix in enumerate(game_rules.payments):
+            self.__payments[h_id, :len(matrix)] = matrix
+        self.__cell_type: np.ndarray = np.array(game_rules.cell_type, dtype=np.int64)
+        # hotels near each cell, padded with -1: actions only concern these few slots, not every hotel
+        max_near = max(len(hotels) for hotels in game_rules.hotels_near)
+        self.__near: np.ndarray = np.full((n_cells, max_near), -1, dtype=np.int64)
+        for cell_idx, hotels in enumerate(game_rules.hotels_near):
+            self.__near[cell_idx, :len(hotels)] = hotels
+
+        # game states
+        self.__games: np.ndarray = np.arange(n_games)
+        self.money: np.ndarray = np.full((n_games, n_players), state.START_MONEY, dtype=np.int64)
+        self.position: np.ndarray = np.full((n_games, n_players), state.START_CELL, dtype=np.int64)
+        self.owner: np.ndarray = np.full((n_games, n_hotels), state.NO_OWNER, dtype=np.int64)
+        self.star: np.ndarray = np.zeros((n_games, n_hotels), dtype=np.int64)
+        self.last_upgrade: np.ndarray = np.full((n_games, n_hotels), state.NO_UPGRADE, dtype=np.int64)
+        self.entrance: np.ndarray = np.full((n_games, n_cells), state.NO_ENTRANCE, dtype=np.int64)
+        self.current: np.ndarray = np.zeros(n_games, dtype=np.int64)
+        self.turn: np.ndarray = np.zeros(n_games, dtype=np.int64)
+        self.done: np.ndarray = np.zeros(n_games, dtype=bool)
+
+    def get_n_games(self) -> int:
+        """
+        :return: number of games simulated together
+        """
+        return self.__n_games
+
+    def step(self) -> None:
+        """
+        Play one turn in every game not over yet
+        """
+        rng = self.__rng
+        g = self.__games[~self.done]
+        if len(g) == 0:
+            return
+        cur = self.current[g]
+
+        # 1. roll and move, as Board.move_player
+        pos = (self.position[g, cur] + rng.integers(1, rules.DIE_FACES + 1, len(g))) % self.__ring_size
+        self.position[g, cur] = pos
+        cell_idx = pos + 1
+
+        # 2. rent
+        h = self.entrance[g, cell_idx]
+        h_safe = np.maximum(h, 0)
+        owner = self.owner[g, h_safe]
+        star = self.star[g, h_safe]
+        due = (h >= 0) & (owner >= 0) & (owner != cur) & (star > 0)
+        nights = rng.integers(1, rules.DIE_FACES + 1, len(g))
+        amount = np.where(due, self.__payments[h_safe, np.maximum(star - 1, 0), nights - 1], 0)
+        self.money[g, cur] -= amount
+        self.money[g[due], owner[due]] += amount[due]
+
+        # broke players are out, properties freed
+        broke = due & (self.money[g, cur] <= 0)
+        if broke.any():
+            gb, cb = g[broke], cur[broke]
+            self.position[gb, cb] = state.OFF_BOARD
+            freed = self.owner[gb] == cb[:, None]
+            owners = self.owner[gb]
+            owners[freed] = state.NO_OWNER
+            self.owner[gb] = owners
+
+        # 3. one action, among the legal ones of the cell
+        self.__act(g[~broke], cur[~broke], cell_idx[~broke])
+
+        # 4. next player on the board
+        self.__end_turn(g)
+
+    def __act(self,
+              g: np.ndarray,
+              cur: np.ndarray,
+              cell_idx: np.ndarray
+              ) -> None:
+        """
+        Choose uniformly among the legal actions, then take it with the player probability for its kind
+        :param g: games acting
+        :param cur: current player of each game
+        :param cell_idx: cell reached in each game, as cell_id + 1
+        """
+        rng = self.__rng
+        near = self.__near[cell_idx]
+        n_near = near.shape[1]
+        is_near = near >= 0
+        h = np.maximum(near, 0)
+        gg = g[:, None]
+
+        money = self.money[g, cur][:, None]
+        cell_type = self.__cell_type[cell_idx][:, None]
+        owner = self.owner[gg, h]
+        mine = is_near & (owner == cur[:, None])
+        nxt = self.__next_upgrade[h, self.last_upgrade[gg, h] + 1]
+        free_cell = (self.entrance[g, cell_idx] == state.NO_ENTRANCE)[:, None]
+
+        buy_land = (cell_type == rules.BUYING_LAND) & is_near & (owner == state.NO_OWNER) \
+            & (money > self.__land_cost[h])
+        build = ((cell_type == rules.BUILDING_PERMISSION) | (cell_type == rules.FREE_STAGE)) & mine & (nxt >= 0) \
+            & ((cell_type == rules.FREE_STAGE) | (money > self.__upgrade_cost[h, np.maximum(nxt, 0)]))
+        buy_entrance = mine & free_cell & (self.star[gg, h] > 0) \
+            & ((cell_type == rules.FREE_ENTRANCE) | (money > self.__entrance_cost[h]))
+
+        legal = np.concatenate((buy_land, build, buy_entrance), axis=1)
+        has = legal.any(axis=1)
+        g, cur, cell_idx, legal, h, nxt = g[has], cur[has], cell_idx[has], legal[has], h[has], nxt[has]
+        choice = np.argmax(rng.random(legal.shape) * legal, axis=1)
+        kind, slot = np.divmod(choice, n_near)
+        take = rng.random(len(g)) < self.__action_probs[cur, kind]
+        rows = np.arange(len(g))
+        h, up = h[rows, slot], nxt[rows, slot]
+        cell_type = self.__cell_type[cell_idx]
+
+        m = take & (kind == 0)
+        self.money[g[m], cur[m]] -= self.__land_cost[h[m]]
+        self.owner[g[m], h[m]] = cur[m]
+
+        m = take & (kind == 1)
+        self.money[g[m], cur[m]] -= np.where(cell_type[m] == rules.FREE_STAGE, 0,
+                                             self.__upgrade_cost[h[m], up[m]])
+        self.last_upgrade[g[m], h[m]] = up[m]
+        self.star[g[m], h[m]] = self.__star_upgrade[h[m], up[m]]
+
+        m = take & (kind == 2)
+        self.money[g[m], cur[m]] -= np.where(cell_type[m] == rules.FREE_ENTRANCE, 0, self.__entrance_cost[h[m]])
+        self.entrance[g[m], cell_idx[m]] = h[m]
+
+    def __end_turn(self,
+                   g: np.ndarray
+                   ) -> None:
+        """
+        Pass the turn to the next player still on the board, end the games with one player left
+        :param g: games that played the turn
+        """
+        n_players = self.__rules.n_players
+        on_board = self.position[g] != state.OFF_BOARD
+        nxt = self.current[g]
+        searching = np.ones(len(g), dtype=bool)
+        for _ in range(n_players):
+            nxt = np.where(searching, (nxt + 1) % n_players, nxt)
+            searching &= ~on_board[np.arange(len(g)), nxt]
+        self.current[g] = nxt
+        self.turn[g] += 1
+        self.done[g] = on_board.sum(axis=1) <= 1
+
+    def run(self,
+            max_turns: int = 1000
+            ) -> np.ndarray:
+        """
+        Play every game until over or max_turns reached
+        :param max_turns: turn horizon
+        :return: turns played by each game
+        """
+        for _ in range(max_turns):
+            if self.done.all():
+                break
+            self.step()
+        return self.turn
+
+    def net_worth(self) -> np.ndarray:
+        """
+        Money plus value of lands, buildings and entrances, as Rules.net_worth
+        :return: (n_games, n_players) net worth, 0 for players out of the game
+        """
+        n_players = self.__rules.n_players
+        hotel_value = self.__land_cost + self.__invested[np.arange(self.owner.shape[1]), self.last_upgrade + 1]
+        ent = self.entrance >= 0
+        ent_value = np.zeros(self.owner.shape, dtype=np.int64)
+        np.add.at(ent_value,
+                  (np.nonzero(ent)[0], self.entrance[ent]),
+                  self.__entrance_cost[self.entrance[ent]])
+        hotel_value = hotel_value + ent_value
+        worth = self.money.copy()
+        for p_id in range(n_players):
+            worth[:, p_id] += np.where(self.owner == p_id, hotel_value, 0).sum(axis=1)
+        worth[self.position == state.OFF_BOARD] = 0
+        return worth
+
+    def winners(self) -> np.ndarray:
+        """
+        :return: id of the winner of each game, by net worth (last player standing if the game is over)
+        """
+        return np.argmax(self.net_worth(), axis=1)
@@ -0,0 +1,262 @@
+"""
+Contains ReplayWriter and ReplayReader classes
+Binary replay of games: one fixed-width record per turn, appended to a file that can hold millions of games
+
+File layout, little endian:
+    header (HEADER_SIZE bytes): magic, version, n_players, n_hotels, record size
+    records, back to back, with the NumPy dtype returned by record_dtype:
+        game        u4          index of the game in the file
+        turn        u4          turn counter before the turn
+        player      i1          id of the player who played the turn
+        move        u1          move die
+        nights      u1          nights die, 0 if no rent was paid
+        position    i1          cell reached, OFF_BOARD if the player went broke
+        action      i2          encoded action, see rules
+        changed     u4          bitboard of the hotels whose owner or star level changed during the turn
+        money_delta i4[players] money change of each player during the turn
+        owner       i1[hotels]  owner of each hotel after the turn
+        star        i1[hotels]  star level of each hotel after the turn
+The reader memory-maps the records: scans and analytics read the columns without parsing anything
+"""
+
+import os
+import struct
+
+import numpy as np
+
+import game.model.state as state
+import game.model.rules as rules
+
+from typing import Iterator, MutableSequence
+
+MAGIC = b'HRPL'
+VERSION = 1
+HEADER = struct.Struct('<4sHBBI4x')     # magic, version, n_players, n_hotels, record size, padding
+HEADER_SIZE = HEADER.size
+
+
+def record_struct(n_players: int,
+                  n_hotels: int
+                  ) -> struct.Struct:
+    """
+    :param n_players: number of players of the games
+    :param n_hotels: number of hotels of the games
+    :return: packing of a turn record, same bytes as record_dtype
+    """
+    return struct.Struct(f'<IIbBBbhI{n_players}i{n_hotels}b{n_hotels}b')
+
+
+def record_dtype(n_players: int,
+                 n_hotels: int
+                 ) -> np.dtype:
+    """
+    :param n_players: number of players of the games
+    :param n_hotels: number of hotels of the games
+    :return: packed structured dtype of a turn record
+    """
+    return np.dtype([
+        ('game', '<u4'),
+        ('turn', '<u4'),
+        ('player', 'i1'),
+        ('move', 'u1'),
+        ('nights', 'u1'),
+        ('position', 'i1'),
+        ('action', '<i2'),
+        ('changed', '<u4'),
+        ('money_delta', '<i4', (n_players, )),
+        ('owner', 'i1', (n_hotels, )),
+        ('star', 'i1', (n_hotels, )),
+    ])
+
+
+class ReplayWriter:
+    """
+    ReplayWriter class
+    Streaming writer: records are packed in a preallocated byte buffer and written when it is full
+    Pass record_turn as the recorder of Rules.play_turn to hook it into the game loop
+    """
+
+    def __init__(self,
+                 path: str,
+                 game_rules: rules.Rules,
+                 buffer_turns: int = 4096):
+        """
+        :param path: replay file, overwritten
+        :param game_rules: rules of the games recorded, giving players and hotels
+        :param buffer_turns: number of records written at once
+        """
+        self.__rules: rules.Rules = game_rules
+        self.__record: struct.Struct = record_struct(game_rules.n_players, game_rules.n_hotels)
+        self.__buffer_turns: int = buffer_turns
+        self.__buffer: bytearray = bytearray(buffer_turns * self.__record.size)
+        self.__n_buffered: int = 0
+        self.__n_games: int = 0
+        self.__n_records: int = 0
+        # money, owners and stars after the last turn recorded, to compute the changes of the next one
+        self.__money: list[int] = []
+        self.__owner: list[int] = []
+        self.__star: list[int] = []
+        self.__file = open(path, 'wb')
+        self.__file.write(HEADER.pack(MAGIC, VERSION, game_rules.n_players, game_rules.n_hotels,
+                                      self.__record.size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_n_games(self) -> int:
+        """
+        :return: number of games started
+        """
+        return self.__n_games
+
+    def get_n_records(self) -> int:
+        """
+        :return: number of turns recorded
+        """
+        return self.__n_records
+
+    def begin_game(self,
+                   data: MutableSequence[int]
+                   ) -> int:
+        """
+        Start recording a new game
+        :param data: state buffer at the start of the game
+        :return: index of the game in the file
+        """
+        layout = self.__rules.layout
+        self.__money = list(data[layout.money_off: layout.position_off])
+        self.__owner = list(data[layout.owner_off: layout.star_off])
+        self.__star = list(data[layout.star_off: layout.upgrade_off])
+        self.__n_games += 1
+        return self.__n_games - 1
+
+    def record_turn(self,
+                    data: MutableSequence[int],
+                    p_id: int,
+                    move: int,
+                    nights: int,
+                    action: int
+                    ) -> None:
+        """
+        Record the turn just played, before the turn passes: recorder of Rules.play_turn
+        :param data: state buffer after the action
+        :param p_id: id of the player who played the turn
+        :param move: move die
+        :param nights: nights die, 0 if no rent was paid
+        :param action: encoded action
+        :raise AssertionError if no game was started
+        """
+        assert self.__n_games, f'No game started, call begin_game first'
+        layout = self.__rules.layout
+        money = data[layout.money_off: layout.position_off]
+        owner = data[layout.owner_off: layout.star_off]
+        star = data[layout.star_off: layout.upgrade_off]
+        changed = 0
+        for h_id in range(len(owner)):
+            if owner[h_id] != self.__owner[h_id] or star[h_id] != self.__star[h_id]:
+                changed |= 1 << h_id
+
+        old_money = self.__money
+        self.__record.pack_into(self.__buffer, self.__n_buffered * self.__record.size,
+                                self.__n_games - 1, data[state.TURN], p_id, move, nights,
+                                data[layout.position_off + p_id], action, changed,
+                                *[m - old_money[i] for i, m in enumerate(money)], *owner, *star)
+        self.__money, self.__owner, self.__star = list(money), list(owner), list(star)
+
+        self.__n_buffered += 1
+        self.__n_records += 1
+        if self.__n_buffered == self.__buffer_turns:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the staged records to the file
+        """
+        if self.__n_buffered:
+            self.__file.write(memoryview(self.__buffer)[:self.__n_buffered * self.__record.size])
+            self.__n_buffered = 0
+        self.__file.flush()
+
+    def close(self) -> None:
+        """
+        Write the staged records and close the file
+        """
+        if not self.__file.closed:
+            self.flush()
+            self.__file.close()
+
+
+class ReplayReader:
+    """
+    ReplayReader class
+    Memory-mapped view of a replay file: records are read by the OS on demand, nothing is parsed
+    """
+
+    def __init__(self,
+                 path: str):
+        """
+        :param path: replay file written by ReplayWriter
+        :raise ValueError if the file is not a replay or its version is not supported
+        """
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f'{path} is not a replay file')
+        magic, version, n_players, n_hotels, itemsize = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a replay file')
+        if version != VERSION:
+            raise ValueError(f'Unsupported replay version {version}, expected {VERSION}')
+        self.__n_players: int = n_players
+        self.__n_hotels: int = n_hotels
+        self.__dtype: np.dtype = record_dtype(n_players, n_hotels)
+        assert self.__dtype.itemsize == itemsize, f'Record size {itemsize} does not match the replay version'
+
+        n_records = (os.path.getsize(path) - HEADER_SIZE) // itemsize
+        self.__records: np.ndarray = np.memmap(path, dtype=self.__dtype, mode='r', offset=HEADER_SIZE,
+                                               shape=(n_records, )) if n_records \
+            else np.zeros(0, dtype=self.__dtype)
+
+    def __len__(self):
+        return len(self.__records)
+
+    def get_n_players(self) -> int:
+        """
+        :return: number of players of the games
+        """
+        return self.__n_players
+
+    def get_n_hotels(self) -> int:
+        """
+        :return: number of hotels of the games
+        """
+        return self.__n_hotels
+
+    def get_records(self) -> np.ndarray:
+        """
+        :return: every record, as a read-only memory-mapped structured array
+        """
+        return self.__records
+
+    def iter_chunks(self,
+                    chunk_size: int = 1 << 16
+                    ) -> Iterator[np.ndarray]:
+        """
+        :param chunk_size: number of records per chunk
+        :return: consecutive views of the records
+        """
+        for start in range(0, len(self.__records), chunk_size):
+            yield self.__records[start: start + chunk_size]
+
+    def iter_games(self) -> Iterator[np.ndarray]:
+        """
+        :return: view of the records of each game, in file order
+        """
+        games = self.__records['game']
+        bounds = [0, *(np.flatnonzero(games[1:] != games[:-1]) + 1).tolist(), len(games)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if end > start:
+                yield self.__records[start: end]
@@ -1,49 +1,248 @@
+"""
+Contains BoardRenderer class and show_board
+Console view of a board: player legend, owner and stars of every hotel, and the ring of cells, each cell
+colored as the first player standing on it
+
+Players are shown in the color of their config entry, cells on the four sides of a rectangle sized after the
+ring of the topology
+
+The static parts (cell labels in every player color, hotel labels, separators) are built once per players,
+colors, hotels and topology, and shared by every board of the same game config. A render reads the state buffer, patches
+only the pieces of the cells whose players changed and of the hotels whose owner or star level changed, then joins
+the pieces; nothing changed costs one comparison per vector
+"""
+
+import weakref
+
+import game.model.state as state
+import game.model.topology as topology
+
 from game.model.board import Board
+from utils.cli_colors import PlayerColorEnum, colorize
+
+# color of the players without a color in the config, by id
+DEFAULT_COLORS = (PlayerColorEnum.Red, PlayerColorEnum.Yellow, PlayerColorEnum.Green, PlayerColorEnum.Blue,
+                  PlayerColorEnum.Magenta, PlayerColorEnum.Cyan, PlayerColorEnum.White)
+
+# tabs between the cells of the left and right sides, on top of the width of the rows
+COLUMN_GAP = 7
+
+
+def player_colors(player_names: tuple[str],
+                  colors: dict[str: str or None]
+                  ) -> tuple[str]:
+    """
+    :param player_names: names of the players, by id
+    :param colors: color name of each player (e.g. Red), by name, None if not set
+    :return: color code of each player for colorize, by id, a default color when not set
+    :raise ValueError if a color is not one of PlayerColorEnum
+    """
+    codes = []
+    for p_id, name in enumerate(player_names):
+        color = colors.get(name)
+        if color is None:
+            codes.append(DEFAULT_COLORS[p_id % len(DEFAULT_COLORS)])
+        elif not color.startswith('_') and hasattr(PlayerColorEnum, color):
+            codes.append(getattr(PlayerColorEnum, color))
+        else:
+            raise ValueError(f'Unknown color {color} of player {name}, '
+                             f'expected one of {[c for c in vars(PlayerColorEnum) if not c.startswith("_")]}')
+    return tuple(codes)
+
+
+def board_sides(ring_size: int
+                ) -> tuple[range, range, range, range]:
+    """
+    Split the start cell and the ring into the four sides of a rectangle, the rows longer than the columns
+    :param ring_size: number of cells of the ring, the start cell excluded
+    :return: ids of the cells of the top row, right column, bottom row and left column, in display order
+    """
+    n_cells = ring_size + 1
+    height = max(0, (n_cells - 12) // 4)
+    width = n_cells - 2 * height
+    top = range(-1, (width + 1) // 2 - 1)
+    right = range(top.stop, top.stop + height)
+    bottom = range(right.stop + width // 2 - 1, right.stop - 1, -1)
+    left = range(ring_size - 1, bottom.start, -1)
+    return top, right, bottom, left
+
+
+class _Skeleton:
+    """
+    Static pieces of the view of the boards of one set of players, hotels and topology
+    """
+
+    __slots__ = ('pieces', 'cell_slots', 'cell_labels', 'owner_slots', 'owner_labels', 'star_slots')
+
+    def __init__(self,
+                 player_names: tuple[str],
+                 colors: tuple[str],
+                 hotel_names: tuple[str],
+                 board_topology: topology.BoardTopology):
+        """
+        :param player_names: names of the players of the boards, by id
+        :param colors: color code of each player, by id, see player_colors
+        :param hotel_names: names of the hotels of the boards, by id
+        :param board_topology: topology of the boards
+        """
+
+        # pieces of a new board, dynamic pieces are patched by the renderers
+        self.pieces: list[str] = []
+        # piece of each cell, by cell_id + 1, and of the owner and star level of each hotel, by id
+        self.cell_slots: list[int] = [-1] * board_topology.n_cells
+        self.owner_slots: list[int] = []
+        self.star_slots: list[int] = []
+        # label of each cell by number of the first player standing on it + 1 (0 if none), by cell_id + 1
+        self.cell_labels: list[list[str]] = [
+            [f'|{cell_id:02}|'] + [colorize(input_string=f'|{cell_id:02}|', fg=c) for c in colors]
+            for cell_id in board_topology.cell_ids
+        ]
+        # label of each owner id + 1 (0 if free)
+        self.owner_labels: list[str] = ['-'] + [colorize(input_string=name, fg=c)
+                                                for name, c in zip(player_names, colors)]
+
+        '''color legend'''
+        self.__add('Players: ' + ''.join(label + ' ' for label in self.owner_labels[1:]) + '\n\n')
+
+        '''hotels: owner and stars'''
+        width = max((len(name) for name in hotel_names), default=0) + 2
+        for name in hotel_names:
+            self.__add(f'{name:<{width}}')
+            self.owner_slots.append(self.__add(self.owner_labels[0]))
+            self.__add(' ')
+            self.star_slots.append(self.__add(''))
+            self.__add('\n')
+        self.__add('\n')
+
+        '''cells: top row, both columns, bottom row'''
+        top, right_cells, bottom, left_cells = board_sides(board_topology.ring_size)
+        self.__add_row(top)
+        self.__add('\n\n')
+        for left, right in zip(left_cells, right_cells):
+            self.__add_cell(left)
+            self.__add('\t' * (2 * len(top) + COLUMN_GAP))
+            self.__add_cell(right)
+            self.__add('\n\n')
+        self.__add_row(bottom)
+
+    def __add(self,
+              piece: str
+              ) -> int:
+        """
+        :param piece: next piece of the view
+        :return: index of the piece
+        """
+        self.pieces.append(piece)
+        return len(self.pieces) - 1
+
+    def __add_cell(self,
+                   cell_id: int
+                   ) -> None:
+        """
+        :param cell_id: id of the cell shown next
+        """
+        self.cell_slots[cell_id + 1] = self.__add(self.cell_labels[cell_id + 1][0])
+
+    def __add_row(self,
+                  cell_ids: range
+                  ) -> None:
+        """
+        :param cell_ids: ids of the cells of the row, in display order
+        """
+        for i, cell_id in enumerate(cell_ids):
+            if i:
+                self.__add('\t\t')
+            self.__add_cell(cell_id)
+
+
+# shared skeletons, by player names, colors, hotel names and topology: every game builds its own layout
+_skeletons: dict[tuple[tuple[str], tuple[str], tuple[str], topology.BoardTopology]: _Skeleton] = dict()
+
+# renderer of each board shown by show_board
+_renderers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+class BoardRenderer:
+    """
+    BoardRenderer class
+    Incremental view of one board: keeps the pieces of the last render and the state vectors they show
+    """
+
+    def __init__(self,
+                 board: Board):
+        """
+        :param board: board shown
+        """
+        self.__state: state.GameState = board.get_state()
+        layout = self.__state.get_layout()
+        player_names = tuple(layout.get_player_names()[:layout.get_n_players()])
+        key = (player_names, player_colors(player_names, board.get_player_colors()),
+               tuple(layout.get_hotel_names()[:layout.get_n_hotels()]), board.get_topology())
+        skeleton = _skeletons.get(key)
+        if skeleton is None:
+            skeleton = _skeletons[key] = _Skeleton(*key)
+        self.__skeleton: _Skeleton = skeleton
+        self.__pieces: list[str] = skeleton.pieces[:]
+
+        # vectors shown by the pieces, the cells and hotels of a new board
+        self.__cells_off: int = layout.cell_players_off
+        self.__owner_off: int = layout.owner_off
+        self.__star_off: int = layout.star_off
+        self.__n_cells: int = layout.get_n_cells()
+        self.__n_hotels: int = layout.get_n_hotels()
+        self.__cells: list[int] = [0] * self.__n_cells
+        self.__owners: list[int] = [state.NO_OWNER] * self.__n_hotels
+        self.__stars: list[int] = [0] * self.__n_hotels
+        self.__text: str or None = None
+
+    def render(self) -> str:
+        """
+        :return: view of the board in its current state
+        """
+        data = self.__state.get_data()
+        skeleton, pieces = self.__skeleton, self.__pieces
+        changed = False
+
+        cells = data[self.__cells_off: self.__cells_off + self.__n_cells].tolist()
+        if cells != self.__cells:
+            labels, slots = skeleton.cell_labels, skeleton.cell_slots
+            for idx, (old, mask) in enumerate(zip(self.__cells, cells)):
+                if old != mask and slots[idx] >= 0:
+                    # lowest bit of the mask: first player standing on the cell
+                    pieces[slots[idx]] = labels[idx][(mask & -mask).bit_length()]
+            self.__cells = cells
+            changed = True
+
+        owners = data[self.__owner_off: self.__owner_off + self.__n_hotels].tolist()
+        if owners != self.__owners:
+            labels, slots = skeleton.owner_labels, skeleton.owner_slots
+            for h_id, (old, owner) in enumerate(zip(self.__owners, owners)):
+                if old != owner:
+                    pieces[slots[h_id]] = labels[owner + 1]
+            self.__owners = owners
+            changed = True
+
+        stars = data[self.__star_off: self.__star_off + self.__n_hotels].tolist()
+        if stars != self.__stars:
+            slots = skeleton.star_slots
+            for h_id, (old, star) in enumerate(zip(self.__stars, stars)):
+                if old != star:
+                    pieces[slots[h_id]] = '*' * star
+            self.__stars = stars
+            changed = True
+
+        if changed or self.__text is None:
+            self.__text = ''.join(pieces)
+        return self.__text
+
 
-def show_board(board : Board
+def show_board(board: Board
                ) -> str:
-    # dict of player pos
-    _player_pos = {
-        val: key
-        for key, val in self.__position_trace.items()
-    }
-
-    def _cell_repr(cell_id: int) -> str:
-        _cell = self.__cell_list[cell_id]   # find the cell
-        # if the cell is occupied
-        if _cell in _player_pos.keys():
-            # for starting cell, get the color of the first player available
-            return colorize(input_string=f'|{cell_id:02}|',
-                            fg=self.__player_color_map[_player_pos[_cell]])
-        return f'|{cell_id:02}|'
-
-    '''split cells into 4 quadrants'''
-    top_cell = [self.__cell_list[i] for i in range(-1, 10)]
-    bot_cell = [self.__cell_list[i] for i in range(25, 14, -1)]
-    right_cell = [self.__cell_list[i] for i in range(10, 15)]
-    left_cell = [self.__cell_list[i] for i in range(30, 25, -1)]
-
-    '''cells representation'''
-    top_row = '\t\t'.join([_cell_repr(c.get_id()) for c in top_cell])
-    bot_row = '\t\t'.join([_cell_repr(c.get_id()) for c in bot_cell])
-    right_col = [_cell_repr(c.get_id()) for c in right_cell]
-    left_col = [_cell_repr(c.get_id()) for c in left_cell]
-
-    '''hotel representation'''
-    upper_top_hotel = '\t  '*5 + ('Boomerang' + '\t  ')*5 + '\t  '*9 + 'President'
-
-    '''color legend'''
-    _repr = 'Players: '
-    for pl, clr in self.__player_color_map.items():
-        _repr += colorize(input_string=pl.get_name(), fg=clr) + ' '
-    _repr += '\n\n'
-
-    '''actual board'''
-    _repr += f'{upper_top_hotel}\n\n'
-    _repr += f'{top_row}\n\n'
-    # transpose to put column in place
-    for item in zip(left_col, right_col):
-        _repr += item[0] + '\t'*29 + item[1] + '\n\n'    # format and tabulate
-    _repr += bot_row
-
-    return _repr
\ No newline at end of file
+    """
+    :param board: board to show
+    :return: view of the board, rendered incrementally from the previous call on the same board
+    """
+    renderer = _renderers.get(board)
+    if renderer is None:
+        renderer = _renderers[board] = BoardRenderer(board)
+    return renderer.render()
@@ -12,8 +12,52 @@ class HumanInterface(PlayerInterface):
     def __init__(self):
         super().__init__()
 
+    @staticmethod
+    def choose_action(actions: list[int],
+                      descriptions: list[str]
+                      ) -> int:
+        """
+        Prompt the player on the console until a valid choice is made
+        :param actions: legal actions
+        :param descriptions: readable description of each action
+        :return: encoded action chosen, see game.model.rules
+        """
+        for i, d in enumerate(descriptions):
+            print(f'\t{i}: {d}')
+        while True:
+            choice = input('Action: ').strip()
+            if choice.isdigit() and int(choice) < len(actions):
+                return actions[int(choice)]
+            print(f'Expected a number between 0 and {len(actions) - 1}')
+
 
 class AiInterface(PlayerInterface):
 
     def __init__(self):
         super().__init__()
+        self.__agent = None
+
+    def set_agent(self,
+                  agent
+                  ) -> None:
+        """
+        :param agent: decision maker of the AI, any object with choose_action(game_state) -> action
+        """
+        self.__agent = agent
+
+    def get_agent(self):
+        """
+        :return: decision maker of the AI, None if not set
+        """
+        return self.__agent
+
+    def choose_action(self,
+                      game_state
+                      ) -> int:
+        """
+        :param game_state: GameState with the AI player to act
+        :return: encoded action, see game.model.rules
+        :raise AssertionError if no agent is set
+        """
+        assert self.__agent is not None, f'No agent set for the AI interface'
+        return self.__agent.choose_action(game_state)
@@ -8,6 +8,8 @@ Main execution file for HOTEL AI
 """
 
 import argparse
+
+from game.controller.game_manager import GameManager
 from utils.config import process_config
 
 
@@ -20,6 +22,13 @@ def main():
 
     # set up argument parser to read input arguments
     arg_parser = argparse.ArgumentParser(description="")
+    arg_parser.add_argument('--headless', action='store_true',
+                            help='play without any I/O, every seat by the fast policy unless --agents')
+    arg_parser.add_argument('--agents', action='store_true', help='play the AI seats by their agents when headless')
+    arg_parser.add_argument('--seed', type=int, default=None)
+    arg_parser.add_argument('--watch', action='store_true', help='print the board after every turn')
+    arg_parser.add_argument('--replay', type=str, default=None, metavar='PATH',
+                            help='record the game as a binary replay')
 
     # get the argument from the console
     args = arg_parser.parse_args()
@@ -34,7 +43,10 @@ def main():
         print(f'Different number of players declared. Expected {n_players}, got {len(dict_player_list)}.')
         exit(-1)
 
-    # game_manager = GameManager(config)
+    game_manager = GameManager(config, headless=args.headless, seed=args.seed, watch=args.watch,
+                               use_agents=args.agents or not args.headless, replay=args.replay)
+    game_manager.play()
+
 
 if __name__ == '__main__':
     main()
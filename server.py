@@ -0,0 +1,43 @@
+"""
+Server execution file for HOTEL AI
+
+-Capture the config file once
+-Host many tables in one process over a local TCP or Unix socket
+"""
+
+import argparse
+import asyncio
+
+from game.controller.server import serve
+from utils.config import process_config
+
+
+def main():
+    """
+    Server function
+    Parses argument
+    Serve until interrupted
+    """
+
+    # set up argument parser to read input arguments
+    arg_parser = argparse.ArgumentParser(description="Game server hosting many tables, line-delimited JSON")
+    arg_parser.add_argument('--host', type=str, default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--unix', type=str, default=None, help='path of a Unix socket, instead of TCP')
+    arg_parser.add_argument('--replay', type=str, default=None, metavar='DIR',
+                            help='record every table as a binary replay in this directory')
+
+    # get the argument from the console
+    args = arg_parser.parse_args()
+
+    # parse the config files once, every table starts from it
+    config = process_config(args)
+
+    try:
+        asyncio.run(serve(config, host=args.host, port=args.port, unix_path=args.unix, replay_dir=args.replay))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,8 @@
-CELL_YAML_PATH = 'D:/Hotels_AI/configs/cell.yaml'
-HOTEL_YAML_PATH = 'D:/Hotels_AI/configs/hotel.yaml'
-HOTEL_UPGRADE_TYPE_YAML_PATH = 'D:/Hotels_AI/configs/hotel_upgrade_type.yaml'
-HOTEL_NAMES = ['Waikiki', 'Taj_Mahal', 'Fujiyama', 'Etoile', 'Royal', 'Safari', 'President', 'Boomerang']
\ No newline at end of file
+import os
+
+from utils.config import PROJECT_ROOT
+
+CELL_YAML_PATH = os.path.join(PROJECT_ROOT, 'configs/cell.yaml')
+HOTEL_YAML_PATH = os.path.join(PROJECT_ROOT, 'configs/hotel.yaml')
+HOTEL_UPGRADE_TYPE_YAML_PATH = os.path.join(PROJECT_ROOT, 'configs/hotel_upgrade_type.yaml')
+HOTEL_NAMES = ['Waikiki', 'Taj_Mahal', 'Fujiyama', 'Etoile', 'Royal', 'Safari', 'President', 'Boomerang']
@@ -0,0 +1,136 @@
+"""
+Testing module for RentTables class
+"""
+
+import os
+import pickle
+import tempfile
+import unittest
+import unittest.mock as mock
+
+import game.model.rules as rl
+import utils.config as cfg
+
+from easydict import EasyDict
+
+from game.ai.agents import attach_agents, build_evaluation, get_ai_config, EXPECTIMAX_AGENT, INCOME_EVALUATION
+from game.ai.analytics import RENT_TABLES_VERSION, RentTables, income_evaluation, config_hash
+from game.ai.expectimax import net_worth_evaluation
+from game.model.game import Game
+from game.view.player_interface import AiInterface
+from utils.compiled_config import compile_config
+from utils.config import process_config
+
+
+class RentTablesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+
+    def test_landing(self):
+        tables = RentTables(config=self.config)
+
+        self.assertAlmostEqual(sum(tables.landing), 1.)
+        self.assertEqual(tables.landing[0], 0.)     # start cell is never landed on again
+        # the die is uniform on a ring: every other cell is equally likely in the long run
+        for p in tables.landing[1:]:
+            self.assertAlmostEqual(p, 1. / 31, places=5)
+
+    def test_rent(self):
+        tables = RentTables(config=self.config)
+        game = Game(config=self.config)
+
+        for h_id, name in enumerate(tables.hotel_names):
+            payments = game.get_hotel(name).get_payments()
+            self.assertEqual(tables.mean_rent[h_id][0], 0.)
+            for star, row in enumerate(payments, start=1):
+                self.assertAlmostEqual(tables.mean_rent[h_id][star], sum(row) / len(row))
+                self.assertAlmostEqual(tables.get_entrance_rent(h_id, star, 5),
+                                       tables.landing[6] * sum(row) / len(row))
+                self.assertGreaterEqual(tables.max_rent[h_id][star], tables.get_entrance_rent(h_id, star, 5))
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            tables = RentTables.load(self.config, cache_dir=cache_dir)
+            path = os.path.join(cache_dir, f'rent_tables_{config_hash(self.config)}.pkl')
+            self.assertTrue(os.path.exists(path))
+
+            cached = RentTables.load(self.config, cache_dir=cache_dir)
+            self.assertEqual(cached.entrance_rent, tables.entrance_rent)
+
+            # another config, another entry
+            config = process_config(EasyDict())
+            config.hotel_dict.Boomerang.payments[0][0] += 1
+            config.compiled = compile_config(config)
+            self.assertNotEqual(config_hash(config), config_hash(self.config))
+            RentTables.load(config, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_stale_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, f'rent_tables_{config_hash(self.config)}.pkl')
+            # corrupted, truncated, another version and a bare object of the old format are all rebuilt
+            for content in (b'not a pickle', b'', pickle.dumps({'version': RENT_TABLES_VERSION + 1, 'tables': 0}),
+                            pickle.dumps([1, 2])):
+                with open(path, 'wb') as f:
+                    f.write(content)
+                tables = RentTables.load(self.config, cache_dir=cache_dir)
+                self.assertIsInstance(tables, RentTables)
+                with open(path, 'rb') as f:
+                    self.assertEqual(pickle.load(f)['version'], RENT_TABLES_VERSION)
+
+    def test_read_only_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # the cache directory cannot be created: the tables are computed, nothing is written
+            cache_dir = os.path.join(tmp, 'file')
+            with open(cache_dir, 'w') as f:
+                f.write('')
+            tables = RentTables.load(self.config, cache_dir=cache_dir)
+            self.assertEqual(tables.entrance_rent, RentTables(config=self.config).entrance_rent)
+            self.assertEqual(os.listdir(tmp), ['file'])
+
+    def test_evaluation(self):
+        tables = RentTables(config=self.config)
+        game = Game(config=self.config)
+        game_rules = rl.Rules(config=self.config, layout=game.get_state().get_layout())
+        evaluation = income_evaluation(tables, horizon=10)
+
+        s = game.get_state()
+        base = evaluation(game_rules, s.get_data())
+        fuji = s.get_layout().hotel_id('Fujiyama')
+        s.set_owner(fuji, 0)
+        s.set_upgrade(fuji, 0, 1)
+        s.set_entrance(1, fuji)
+        value = evaluation(game_rules, s.get_data())
+        net_worth = game_rules.net_worth(s.get_data(), 0)
+        self.assertAlmostEqual(value[0], net_worth + 10 * tables.get_entrance_rent(fuji, 1, 1))
+        self.assertEqual(value[1], base[1])
+
+    def test_agent_evaluation(self):
+        # the ai section selects the income evaluation for expectimax
+        ai_config = get_ai_config(self.config)
+        ai_config.agent = EXPECTIMAX_AGENT
+        self.assertIs(build_evaluation(ai_config), net_worth_evaluation)
+        ai_config.evaluation = INCOME_EVALUATION
+        self.assertRaises(ValueError, lambda: build_evaluation(ai_config))
+        ai_config.evaluation = 'other'
+        self.assertRaises(ValueError, lambda: build_evaluation(ai_config))
+
+        config = process_config(EasyDict())
+        config.game_dict.ai = EasyDict(config.game_dict.ai, agent=EXPECTIMAX_AGENT, evaluation=INCOME_EVALUATION)
+        game = Game(config=config)
+        game_rules = rl.Rules(config=config, layout=game.get_state().get_layout())
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.object(cfg, 'CACHE_DIR', cache_dir), \
+                mock.patch.object(RentTables, 'load', wraps=RentTables.load) as load:
+            attach_agents(game, config, game_rules, seed=0)
+            load.assert_called_once_with(config)
+        s = game.get_state()
+        s.set_position(s.get_current_player(), 2)
+        for p in game.get_player_list().values():
+            if isinstance(p.get_ui(), AiInterface):
+                self.assertIn(p.get_ui().get_agent().choose_action(s), game_rules.legal_actions(s.get_data()))
+
+
+if __name__ == '__main__':
+    unittest.main()
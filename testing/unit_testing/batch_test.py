@@ -0,0 +1,85 @@
+"""
+Testing module for BatchSimulator class
+"""
+
+import unittest
+
+import numpy as np
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from game.simulation.batch import BatchSimulator
+from utils.config import process_config
+
+N_GAMES = 500
+
+
+class BatchSimulatorTest(unittest.TestCase):
+
+    def setUp(self):
+        config = process_config(EasyDict())
+        game = Game(config=config)
+        self.rules = rl.Rules(config=config, layout=game.get_state().get_layout())
+
+    def test_step(self):
+        sim = BatchSimulator(self.rules, n_games=N_GAMES, seed=0)
+        sim.step()
+
+        # every game moved the first player by one die roll
+        self.assertTrue(np.all(sim.position[:, 0] >= 0))
+        self.assertTrue(np.all(sim.position[:, 0] <= 5))
+        self.assertTrue(np.all(sim.position[:, 1:] == st.START_CELL))
+        self.assertTrue(np.all(sim.current == 1))
+        self.assertTrue(np.all(sim.turn == 1))
+
+    def test_no_action(self):
+        # nobody ever buys: no rent, no money change, no game over
+        probs = np.zeros((self.rules.n_players, 3))
+        sim = BatchSimulator(self.rules, n_games=N_GAMES, action_probs=probs, seed=0)
+        turns = sim.run(max_turns=50)
+
+        self.assertTrue(np.all(turns == 50))
+        self.assertTrue(np.all(sim.owner == st.NO_OWNER))
+        self.assertTrue(np.all(sim.money == st.START_MONEY))
+        self.assertFalse(sim.done.any())
+
+    def test_run(self):
+        sim = BatchSimulator(self.rules, n_games=N_GAMES, seed=0)
+        sim.run(max_turns=2000)
+
+        self.assertTrue(sim.done.all())
+        on_board = sim.position != st.OFF_BOARD
+        self.assertTrue(np.all(on_board.sum(axis=1) == 1))
+        self.assertTrue(np.all(sim.money[on_board] > 0))
+        # properties of players out of the game were freed
+        for p_id in range(self.rules.n_players):
+            out = ~on_board[:, p_id]
+            self.assertFalse(np.any(sim.owner[out] == p_id))
+
+        winners = sim.winners()
+        self.assertTrue(np.all(on_board[np.arange(N_GAMES), winners]))
+
+    def test_net_worth(self):
+        sim = BatchSimulator(self.rules, n_games=N_GAMES, seed=1)
+        sim.run(max_turns=40)
+        worth = sim.net_worth()
+
+        # same as the scalar rules on the same state
+        layout = self.rules.layout
+        for i in range(0, N_GAMES, 50):
+            data = [0] * layout.size
+            data[layout.money_off:layout.position_off] = sim.money[i].tolist()
+            data[layout.position_off:layout.owner_off] = sim.position[i].tolist()
+            data[layout.owner_off:layout.star_off] = sim.owner[i].tolist()
+            data[layout.star_off:layout.upgrade_off] = sim.star[i].tolist()
+            data[layout.upgrade_off:layout.entrance_off] = sim.last_upgrade[i].tolist()
+            data[layout.entrance_off:layout.occupied_off] = sim.entrance[i].tolist()
+            for p_id in range(self.rules.n_players):
+                self.assertEqual(worth[i, p_id], self.rules.net_worth(data, p_id))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Testing module for the benchmark runner
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import benchmark
+
+
+def results(times: dict[str: float]) -> dict:
+    return {'metadata': {'host': 'a', 'python': '3'},
+            'benchmarks': {name: {'min_us': t} for name, t in times.items()}}
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_run(self):
+        names = ['get_upgrade_costs', 'turn_rules', 'turn_model', 'show_board']
+        run = benchmark.run_benchmarks(names, repeat=2, min_time=0.001)
+        self.assertEqual(list(run['benchmarks'].keys()), names)
+        for r in run['benchmarks'].values():
+            self.assertGreater(r['min_us'], 0.)
+            self.assertLessEqual(r['min_us'], r['median_us'])
+            self.assertEqual(r['repeat'], 2)
+        for key in ('date', 'platform', 'python', 'cpu_count', 'commit'):
+            self.assertIn(key, run['metadata'])
+        json.dumps(run)
+        with self.assertRaises(KeyError):
+            benchmark.run_benchmarks(['nope'])
+
+    def test_every_benchmark(self):
+        config = benchmark.process_config(benchmark.EasyDict())
+        for name, setup in benchmark.BENCHMARKS.items():
+            function = setup(config)
+            for _ in range(3):
+                function()
+
+    def test_compare(self):
+        baseline = results({'a': 10., 'b': 10., 'c': 10., 'd': 10.})
+        current = results({'a': 10.5, 'b': 12., 'c': 8., 'e': 1.})
+        rows = {name: (b, c, status) for name, b, c, _, status in benchmark.compare(baseline, current, 0.1)}
+        self.assertEqual(rows['a'][2], benchmark.SAME)
+        self.assertEqual(rows['b'][2], benchmark.REGRESSION)
+        self.assertEqual(rows['c'][2], benchmark.IMPROVEMENT)
+        self.assertEqual(rows['d'], (10., None, benchmark.MISSING))
+        self.assertEqual(rows['e'], (None, 1., benchmark.NEW))
+        rows = benchmark.compare(baseline, current, 0.25)
+        self.assertNotIn(benchmark.REGRESSION, [status for *_, status in rows])
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = [os.path.join(directory, f'{name}.json') for name in ('baseline', 'fast', 'slow')]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(benchmark.main(['run', '--out', paths[0], '--only', 'change_money',
+                                                 '--repeat', '2', '--min-time', '0.001']), 0)
+            with open(paths[0]) as f:
+                run = json.load(f)
+            for path, factor in zip(paths[1:], (.5, 2.)):
+                run['benchmarks']['change_money']['min_us'] *= factor
+                with open(path, 'w') as f:
+                    json.dump(run, f)
+                run['benchmarks']['change_money']['min_us'] /= factor
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                self.assertEqual(benchmark.main(['compare', paths[0], paths[1]]), 0)
+                self.assertEqual(benchmark.main(['compare', paths[0], paths[2], '--threshold', '0.5']), 1)
+            self.assertIn('Regressions beyond 50%: change_money', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
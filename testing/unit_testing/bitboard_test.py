@@ -0,0 +1,101 @@
+"""
+Testing module for bitboards
+"""
+
+import unittest
+import random
+
+import game.model.bitboard as bb
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from utils.config import process_config
+
+N_GAMES = 20
+
+
+class BitboardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.layout = self.game.get_state().get_layout()
+        self.rules = rl.Rules(config=self.config, layout=self.layout)
+
+    def test_helpers(self):
+        self.assertEqual(bb.cell_bit(-1), 1)
+        self.assertEqual(bb.cell_bit(30), 1 << 31)
+        for mask in (0, 1, 1 << 31, bb.MASK_32, 0x80000001):
+            self.assertEqual(bb.to_uint32(bb.to_int32(mask)), mask)
+            self.assertTrue(-2 ** 31 <= bb.to_int32(mask) < 2 ** 31)
+        self.assertEqual(list(bb.iter_bits(0b10110)), [1, 2, 4])
+        self.assertEqual(list(bb.iter_cells(bb.cell_bit(-1) | bb.cell_bit(30))), [-1, 30])
+
+    def test_state_masks(self):
+        s = self.game.get_state()
+        fuji = self.layout.hotel_id('Fujiyama')
+        boom = self.layout.hotel_id('Boomerang')
+
+        s.set_occupied(30, True)
+        s.set_occupied(-1, True)
+        self.assertEqual(s.get_occupied_mask(), bb.cell_bit(30) | bb.cell_bit(-1))
+        s.set_occupied(-1, False)
+        self.assertEqual(s.get_occupied_mask(), bb.cell_bit(30))
+
+        s.set_entrance(3, fuji)
+        s.set_entrance(30, fuji)
+        self.assertEqual(s.get_entrance_mask(fuji), bb.cell_bit(3) | bb.cell_bit(30))
+        s.set_entrance(3, boom)     # entrance taken over
+        self.assertEqual(s.get_entrance_mask(fuji), bb.cell_bit(30))
+        self.assertEqual(s.get_entrance_mask(boom), bb.cell_bit(3))
+
+        s.set_owner(fuji, 0)
+        s.set_owner(boom, 0)
+        self.assertEqual(s.get_owner_mask(0), (1 << fuji) | (1 << boom))
+        s.set_owner(boom, 1)
+        self.assertEqual(s.get_owner_mask(0), 1 << fuji)
+        self.assertEqual(s.get_owner_mask(1), 1 << boom)
+        s.set_owner(fuji, st.NO_OWNER)
+        self.assertEqual(s.get_owner_mask(0), 0)
+
+        # incremental masks match the ones rebuilt from the vectors, and are not hashed
+        rebuilt = s.copy()
+        rebuilt.rebuild_masks()
+        self.assertEqual(rebuilt, s)
+        data = s.get_mutable_data()
+        data[self.layout.occupied_mask_off] = 0
+        self.assertEqual(self.layout.zobrist.full_hash(data), s.get_key())
+
+    def test_rules_masks(self):
+        r = self.rules
+        rng = random.Random(0)
+        for _ in range(N_GAMES):
+            data = self.layout.new_buffer().tolist()
+            for _ in range(rng.randint(10, 150)):
+                if r.play_turn(data, rng, rl.random_policy) and r.is_over(data):
+                    break
+            # played buffers keep their masks in sync
+            rebuilt = list(data)
+            self.layout.rebuild_masks(rebuilt)
+            self.assertEqual(rebuilt, data)
+
+            for cell_id in range(-1, 31):
+                expected = 0
+                for die in range(1, rl.DIE_FACES + 1):
+                    h_id = data[self.layout.entrance_off + (cell_id + die) % 31 + 1]
+                    if h_id != st.NO_ENTRANCE:
+                        expected |= 1 << h_id
+                self.assertEqual(r.entrances_in_reach(data, cell_id), expected)
+
+            for p_id in range(r.n_players):
+                owned = [h_id for h_id in range(r.n_hotels) if data[self.layout.owner_off + h_id] == p_id]
+                expected = {cell_idx - 1 for cell_idx, near in enumerate(r.hotels_near)
+                            if any(h_id in near for h_id in owned)}
+                self.assertEqual(set(bb.iter_cells(r.cells_near_owned(data, p_id))), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
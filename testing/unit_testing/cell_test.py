@@ -26,8 +26,8 @@ class CellTest(unittest.TestCase):
 
             self.assertEqual(c.get_id(), i)
             self.assertEqual(c.get_type(), c_json.type)
-            self.assertEqual(c.get_hotels_near(), c_json.hotels_near)
-            self.assertIsInstance(c.get_hotels_near(), list)
+            self.assertEqual(list(c.get_hotels_near()), c_json.hotels_near)
+            self.assertIsInstance(c.get_hotels_near(), tuple)
             self.assertIsNone(c.get_entrance())
             self.assertFalse(c.is_occupied())
 
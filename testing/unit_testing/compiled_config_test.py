@@ -0,0 +1,69 @@
+"""
+Testing module for CompiledConfig class
+"""
+
+import dataclasses
+import unittest
+
+import utils.config as cfg
+
+from easydict import EasyDict
+
+from unit_testing import CELL_YAML_PATH, HOTEL_YAML_PATH, HOTEL_UPGRADE_TYPE_YAML_PATH, HOTEL_NAMES
+from utils.compiled_config import compile_config, get_compiled
+
+
+class CompiledConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = cfg.process_config(EasyDict())
+        self.compiled = self.config.compiled
+
+    def test_hotels(self):
+        hotel_dict = cfg.get_config_from_yaml(HOTEL_YAML_PATH)
+        upgrade_types = cfg.get_config_from_yaml(HOTEL_UPGRADE_TYPE_YAML_PATH)
+
+        self.assertEqual([h.name for h in self.compiled.hotels], HOTEL_NAMES)
+        for h_id, name in enumerate(HOTEL_NAMES):
+            spec = self.compiled.hotel(name)
+            h_json = hotel_dict[name]
+            self.assertEqual(spec.id, h_id)
+            self.assertEqual(spec.land_cost, h_json.land_cost)
+            self.assertEqual(spec.payments[-1][-1], h_json.payments[-1][-1])
+            for key, cost in h_json.costs.items():
+                # real None instead of the 'None' string of the yaml
+                expected = None if cost == 'None' else int(cost)
+                self.assertEqual(spec.costs[upgrade_types[key]], expected)
+                self.assertEqual(self.compiled.upgrade_names[upgrade_types[key]], key)
+            # upgrades available from scratch skip the unavailable ones
+            self.assertEqual(spec.upgrades_after[0],
+                             tuple(u for u, cost in enumerate(spec.costs) if cost is not None))
+            self.assertEqual(spec.upgrades_after[-1], ())
+
+    def test_cells(self):
+        cell_dict = cfg.get_config_from_yaml(CELL_YAML_PATH)
+
+        for cell_id in range(-1, 31):
+            spec = self.compiled.cell(cell_id)
+            self.assertEqual(spec.id, cell_id)
+            self.assertEqual(spec.type, cell_dict[str(cell_id)].type)
+            self.assertEqual(list(spec.hotels_near), cell_dict[str(cell_id)].hotels_near)
+            self.assertEqual([HOTEL_NAMES[h_id] for h_id in spec.hotel_ids_near], list(spec.hotels_near))
+
+    def test_frozen(self):
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            self.compiled.hotels[0].land_cost = 0
+
+    def test_get_compiled(self):
+        self.assertIs(get_compiled(self.config), self.compiled)
+
+        # compiled on first use when the config did not go through process_config
+        config = EasyDict({key: self.config[key] for key in
+                           ('cell_dict', 'cell_type_dict', 'hotel_dict', 'hotel_upgrade_type_dict')})
+        compiled = get_compiled(config)
+        self.assertIs(config.compiled, compiled)
+        self.assertEqual(compiled.hotels, compile_config(self.config).hotels)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Testing module for the config cache
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import unittest.mock as mock
+
+import utils.config as cfg
+
+from easydict import EasyDict
+
+
+class ConfigCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        # private copy of the configs, so that the tests can edit them
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        shutil.copytree(os.path.join(cfg.PROJECT_ROOT, 'configs'), os.path.join(self.root, 'configs'))
+        self.cache_path = os.path.join(self.root, cfg.CACHE_DIR, cfg.CONFIG_CACHE_FILE)
+        self.patch = mock.patch.object(cfg, 'PROJECT_ROOT', self.root)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp_dir.cleanup()
+
+    def test_project_root(self):
+        self.patch.stop()
+        self.assertTrue(os.path.exists(os.path.join(cfg.PROJECT_ROOT, cfg.CELL_YAML_PATH)))
+        self.patch.start()
+
+    def test_cache(self):
+        config = cfg.process_config(EasyDict())
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        with mock.patch.object(cfg, 'get_config_from_yaml', wraps=cfg.get_config_from_yaml) as parse:
+            cached = cfg.process_config(EasyDict())
+            parse.assert_not_called()
+        self.assertEqual(cached.hotel_dict, config.hotel_dict)
+        self.assertEqual(cached.compiled.hotels, config.compiled.hotels)
+        self.assertIsInstance(cached.hotel_dict, EasyDict)
+
+        # configs are independent, editing one does not affect the next
+        cached.hotel_dict.Waikiki.land_cost = 0
+        self.assertEqual(cfg.process_config(EasyDict()).hotel_dict.Waikiki.land_cost,
+                         config.hotel_dict.Waikiki.land_cost)
+
+    def test_touched(self):
+        cfg.process_config(EasyDict())
+        path = os.path.join(self.root, cfg.HOTEL_YAML_PATH)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        # same content: still a hit
+        with mock.patch.object(cfg, 'get_config_from_yaml', wraps=cfg.get_config_from_yaml) as parse:
+            cfg.process_config(EasyDict())
+            parse.assert_not_called()
+
+    def test_invalidation(self):
+        config = cfg.process_config(EasyDict())
+        path = os.path.join(self.root, cfg.HOTEL_YAML_PATH)
+        with open(path, 'r') as f:
+            content = f.read()
+        with open(path, 'w') as f:
+            f.write(content.replace('land_cost: 2500', 'land_cost: 2600', 1))
+
+        edited = cfg.process_config(EasyDict())
+        self.assertEqual(edited.hotel_dict.Waikiki.land_cost, 2600)
+        self.assertEqual(edited.compiled.hotel('Waikiki').land_cost, 2600)
+        self.assertEqual(config.compiled.hotel('Waikiki').land_cost, 2500)
+
+    def test_no_cache(self):
+        config = cfg.process_config(EasyDict(), use_cache=False)
+        self.assertFalse(os.path.exists(self.cache_path))
+        self.assertEqual(config.compiled.hotel('Waikiki').land_cost, config.hotel_dict.Waikiki.land_cost)
+
+        # corrupted cache file is ignored and rewritten
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertEqual(cfg.process_config(EasyDict()).hotel_dict, config.hotel_dict)
+
+        # valid pickle of another object is ignored too
+        for content in ([1, 2], {'version': cfg.CONFIG_CACHE_VERSION}):
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump(content, f)
+            self.assertEqual(cfg.process_config(EasyDict()).hotel_dict, config.hotel_dict)
+
+        # cache of the right version and paths with a key missing
+        with open(self.cache_path, 'rb') as f:
+            cache = pickle.load(f)
+        for key in ('stamps', 'hashes', 'dicts', 'compiled'):
+            partial = {k: v for k, v in cache.items() if k != key}
+            with open(self.cache_path, 'wb') as f:
+                pickle.dump(partial, f)
+            self.assertIsNone(cfg.load_config_cache(self.cache_path, cache['paths']))
+            self.assertEqual(cfg.process_config(EasyDict()).hotel_dict, config.hotel_dict)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Testing module for game events and EventLog class
+"""
+
+import unittest
+import random
+
+import game.model.events as ev
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from utils.config import process_config
+
+N_EVENTS = 200
+N_GAMES = 20
+
+
+class EventsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.state = self.game.get_state()
+        self.layout = self.state.get_layout()
+
+    def random_event(self,
+                     rng: random.Random) -> ev.Event:
+        s = self.state
+        n_players, n_hotels = self.layout.get_n_players(), self.layout.get_n_hotels()
+        kind = rng.randrange(7)
+        if kind == 0:
+            return ev.MoneyChanged.of(s, rng.randrange(n_players), rng.randint(-500, 500))
+        if kind == 1:
+            return ev.PlayerMoved.of(s, rng.randrange(n_players), rng.choice([st.OFF_BOARD, *range(-1, 31)]))
+        if kind == 2:
+            return ev.OwnerChanged.of(s, rng.randrange(n_hotels), rng.choice([st.NO_OWNER, *range(n_players)]))
+        if kind == 3:
+            return ev.HotelUpgraded.of(s, rng.randrange(n_hotels), rng.randrange(5), rng.randrange(6))
+        if kind == 4:
+            return ev.EntranceChanged.of(s, rng.randrange(-1, 31), rng.choice([st.NO_ENTRANCE, *range(n_hotels)]))
+        if kind == 5:
+            return ev.CellOccupied.of(s, rng.randrange(-1, 31), rng.random() < .5)
+        return ev.TurnPassed.of(s, rng.randrange(n_players))
+
+    def test_undo_redo(self):
+        rng = random.Random(0)
+        history = [(self.state.get_data().tolist(), self.state.get_key())]
+        for _ in range(N_EVENTS):
+            self.game.apply(self.random_event(rng))
+            history.append((self.state.get_data().tolist(), self.state.get_key()))
+        self.assertEqual(len(self.game.get_log()), N_EVENTS)
+
+        # undo every event: every intermediate state, hash and bitboards included, is found again
+        for data, key in reversed(history[:-1]):
+            self.game.undo()
+            self.assertEqual(self.state.get_data().tolist(), data)
+            self.assertEqual(self.state.get_key(), key)
+        with self.assertRaises(IndexError):
+            self.game.undo()
+
+        for data, key in history[1:]:
+            self.game.redo()
+            self.assertEqual(self.state.get_data().tolist(), data)
+            self.assertEqual(self.state.get_key(), key)
+        with self.assertRaises(IndexError):
+            self.game.redo()
+
+        # a new event clears the redo stack
+        self.game.undo()
+        self.game.apply(ev.MoneyChanged.of(self.state, 0, 1))
+        with self.assertRaises(IndexError):
+            self.game.redo()
+
+        # bitboards still match the vectors
+        data = self.state.get_data().tolist()
+        self.layout.rebuild_masks(data)
+        self.assertEqual(data, self.state.get_data().tolist())
+
+    def test_inverse(self):
+        rng = random.Random(1)
+        for _ in range(N_EVENTS):
+            event = self.random_event(rng)
+            self.assertEqual(event.inverse().inverse(), event)
+
+    def test_undo_to(self):
+        game = self.game
+        p = game.get_player(name=list(game.get_player_list().keys())[0])
+        fuji = self.layout.hotel_id('Fujiyama')
+        before = self.state.get_data().tolist()
+
+        mark = game.mark()
+        game.apply(ev.PlayerMoved.of(self.state, p.get_id(), 2))
+        game.apply(ev.MoneyChanged.of(self.state, p.get_id(), -1000))
+        game.apply(ev.OwnerChanged.of(self.state, fuji, p.get_id()))
+        self.assertEqual(game.get_hotel(name='Fujiyama').get_owner(), p.get_name())
+        self.assertEqual(game.get_board().find_cell_players(2), [p.get_name()])
+
+        game.undo_to(mark)
+        self.assertEqual(len(game.get_log()), mark)
+        self.assertEqual(self.state.get_data().tolist(), before)
+        self.assertIsNone(game.get_hotel(name='Fujiyama').get_owner())
+
+    def test_make_unmake(self):
+        r = rl.Rules(config=self.config, layout=self.layout)
+        rng = random.Random(2)
+        trail = []
+        for _ in range(N_GAMES):
+            data = self.state.get_data().tolist()
+            while not r.is_over(data):
+                before = data[:]
+                mark = len(trail)
+
+                # same transitions as the copy-make of the rules
+                delta = r.roll(rng)
+                expected = data[:]
+                r.move(expected, delta)
+                r.make_move(data, delta, trail)
+                self.assertEqual(data, expected)
+                h_id = r.rent_due(data)
+                broke = False
+                if h_id != st.NO_OWNER:
+                    nights = r.roll(rng)
+                    broke = r.pay_rent(expected, h_id, nights)
+                    if broke:
+                        r.end_turn(expected)
+                    self.assertEqual(r.make_rent(data, h_id, nights, trail), broke)
+                    self.assertEqual(data, expected)
+                if not broke:
+                    actions = r.legal_actions(data)
+                    for a in actions:
+                        action_mark = len(trail)
+                        child = data[:]
+                        r.apply_action(child, a)
+                        r.end_turn(child)
+                        r.make_action(data, a, trail)
+                        self.assertEqual(data, child)
+                        r.unmake(data, trail, action_mark)
+                        self.assertEqual(data, expected)
+
+                # back to the state before the roll, then play the turn for real
+                r.unmake(data, trail, mark)
+                self.assertEqual(data, before)
+                self.assertEqual(len(trail), mark)
+                r.play_turn(data, rng, rl.greedy_policy)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Testing module for Expectimax class
+"""
+
+import unittest
+import unittest.mock as mock
+
+import game.model.rules as rl
+import game.model.state as st
+import game.model.zobrist as zobrist
+
+from easydict import EasyDict
+
+from game.ai.expectimax import Expectimax, ExpectimaxAgent
+from game.ai.transposition import TranspositionTable
+from game.model.game import Game
+from utils.config import process_config
+
+
+class ExpectimaxTest(unittest.TestCase):
+
+    def setUp(self):
+        config = process_config(EasyDict())
+        self.game = Game(config=config)
+        self.config = config
+        self.layout = self.game.get_state().get_layout()
+        self.rules = rl.Rules(config=config, layout=self.layout)
+
+    def test_transition(self):
+        board = self.game.get_board()
+        for cell_id in range(-1, 31):
+            for die in range(1, rl.DIE_FACES + 1):
+                dest, cell_type, near = self.rules.transition[cell_id + 1][die - 1]
+                self.assertEqual(dest, (cell_id + die) % 31)
+                c = board.find_cell(dest)
+                self.assertEqual(cell_type, c.get_type())
+                self.assertEqual([self.layout.get_hotel_names()[h_id] for h_id in near], list(c.get_hotels_near()))
+
+    def test_probabilities(self):
+        # constant evaluation: chance nodes must weigh outcomes to a total of one
+        search = Expectimax(self.rules, depth=2, evaluation=lambda r, data: [1.] * r.n_players)
+        _, values = search.search(self.game.get_state().get_data().tolist())
+        for value in values.values():
+            for v in value:
+                self.assertAlmostEqual(v, 1.)
+
+    def test_exact_rent(self):
+        # player 0 owns Fujiyama with an entrance on cell 1, player 1 is about to roll from the start
+        fuji = self.layout.hotel_id('Fujiyama')
+        s = self.game.get_state()
+        s.set_owner(fuji, 0)
+        s.set_upgrade(fuji, 0, 1)
+        s.set_entrance(1, fuji)
+        s.set_position(0, 7)     # cell 7: nothing to do, PASS only
+        data = s.get_data().tolist()
+
+        search = Expectimax(self.rules, depth=1)
+        _, values = search.search(data)
+        self.assertEqual(list(values.keys()), [rl.PASS])
+
+        # die 2 lands on cell 1 (1/6), then nights are uniform (1/6)
+        expected_rent = sum(self.rules.payments[fuji][0]) / 36
+        self.assertAlmostEqual(values[rl.PASS][1], st.START_MONEY - expected_rent)
+        self.assertAlmostEqual(values[rl.PASS][0],
+                               self.rules.net_worth(data, 0) + expected_rent)
+
+    def test_transposition(self):
+        # money hashed exactly: the table only returns values of the same states
+        with mock.patch.object(zobrist, 'MONEY_BUCKET', 1), mock.patch.object(zobrist, 'MAX_MONEY_BUCKET', 10 ** 9):
+            game = Game(config=self.config)
+            game_rules = rl.Rules(config=self.config, layout=game.get_state().get_layout())
+            s = game.get_state()
+            s.set_position(s.get_current_player(), 2)
+            data = s.get_data().tolist()
+
+            _, expected = Expectimax(game_rules, depth=2).search(data)
+            table = TranspositionTable(capacity=1 << 16)
+            search = Expectimax(game_rules, depth=2, table=table)
+            _, values = search.search(data)
+            self.assertEqual(values, expected)
+            self.assertGreater(len(table), 0)
+
+            # the table is kept from one search to the next: the chance nodes below the root are hits
+            nodes = search.nodes
+            _, values = search.search(data)
+            self.assertEqual(values, expected)
+            self.assertEqual(search.nodes - nodes, len(values))
+            self.assertEqual(table.hits, len(values))
+
+    def test_agent(self):
+        self.game.get_state().set_position(0, 2)
+        agent = ExpectimaxAgent(Expectimax(self.rules, depth=1))
+        action = agent.choose_action(self.game.get_state())
+        self.assertIn(action, self.rules.legal_actions(self.game.get_state().get_data()))
+
+
+if __name__ == '__main__':
+    unittest.main()
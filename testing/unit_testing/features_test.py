@@ -0,0 +1,108 @@
+"""
+Testing module for ObservationEncoder class
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+import game.model.rules as rl
+import game.model.state as st
+
+from array import array
+from easydict import EasyDict
+
+from game.ai.features import ObservationEncoder, MAX_STARS
+from game.model.game import Game
+from utils.config import process_config
+
+N_STATES = 500
+
+
+class FeaturesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.layout = self.game.get_state().get_layout()
+        self.rules = rl.Rules(config=self.config, layout=self.layout)
+        self.encoder = ObservationEncoder(self.layout)
+
+    def states(self) -> list[list[int]]:
+        rng = random.Random(0)
+        states = []
+        data = self.layout.new_buffer().tolist()
+        while len(states) < N_STATES:
+            if self.rules.is_over(data):
+                data = self.layout.new_buffer().tolist()
+            self.rules.play_turn(data, rng, rl.greedy_policy)
+            states.append(data[:])
+        return states
+
+    def reference(self,
+                  data: list[int]) -> dict[str: np.ndarray]:
+        """
+        Features read one by one through a GameState
+        """
+        s = st.GameState(self.layout, array('i', data))
+        n_players, n_hotels, n_cells = self.layout.get_n_players(), self.layout.get_n_hotels(), 32
+        position = np.zeros((n_players, n_cells))
+        for p_id in range(n_players):
+            if s.get_position(p_id) != st.OFF_BOARD:
+                position[p_id, s.get_position(p_id) + 1] = 1
+        owner = np.zeros((n_hotels, n_players))
+        for h_id in range(n_hotels):
+            if s.get_owner(h_id) != st.NO_OWNER:
+                owner[h_id, s.get_owner(h_id)] = 1
+        entrance = np.zeros((n_hotels, n_cells))
+        for cell_id in range(-1, 31):
+            if s.get_entrance(cell_id) != st.NO_ENTRANCE:
+                entrance[s.get_entrance(cell_id), cell_id + 1] = 1
+        return {
+            'position': position.ravel(),
+            'current': np.eye(n_players)[s.get_current_player()],
+            'owner': owner.ravel(),
+            'star': np.array([s.get_star_level(h_id) / MAX_STARS for h_id in range(n_hotels)]),
+            'entrance': entrance.ravel(),
+            'money': np.array([s.get_money(p_id) / st.START_MONEY for p_id in range(n_players)]),
+        }
+
+    def test_slices(self):
+        slices = self.encoder.get_slices()
+        self.assertEqual(sum(sl.stop - sl.start for sl in slices.values()), self.encoder.get_size())
+        obs = self.encoder.encode(self.game)
+        self.assertEqual(obs.dtype, np.float32)
+        self.assertEqual(obs.shape, (self.encoder.get_size(), ))
+        # new game: everybody on the start cell, nothing owned
+        self.assertEqual(obs[slices['position']].sum(), self.layout.get_n_players())
+        self.assertEqual(obs[slices['owner']].sum(), 0)
+        self.assertTrue((obs[slices['money']] == 1.).all())
+
+    def test_batch(self):
+        states = self.states()
+        out = self.encoder.new_batch(N_STATES + 10)
+        batch = self.encoder.encode_batch(np.array(states, dtype=np.int32), out)
+        self.assertEqual(batch.shape, (N_STATES, self.encoder.get_size()))
+        self.assertTrue(np.shares_memory(batch, out))
+        # a sequence of buffers gives the same observations
+        self.assertTrue((self.encoder.encode_batch(states, self.encoder.new_batch(N_STATES)) == batch).all())
+
+        slices = self.encoder.get_slices()
+        for i, data in enumerate(states):
+            expected = self.reference(data)
+            for name, sl in slices.items():
+                np.testing.assert_allclose(batch[i, sl], expected[name], rtol=1e-6, err_msg=name)
+            # single state encoding matches its row
+            s = st.GameState(self.layout, array('i', data))
+            self.assertTrue((self.encoder.encode(s) == batch[i]).all())
+
+    def test_shape_check(self):
+        with self.assertRaises(AssertionError):
+            self.encoder.encode_batch(np.zeros((2, 3), dtype=np.int32), self.encoder.new_batch(2))
+        with self.assertRaises(AssertionError):
+            self.encoder.encode_batch(np.zeros((4, self.layout.size), dtype=np.int32), self.encoder.new_batch(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
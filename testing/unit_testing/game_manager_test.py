@@ -0,0 +1,150 @@
+"""
+Testing module for GameManager class
+"""
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import unittest
+
+from unittest import mock
+
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.ai.agents import EXPECTIMAX_AGENT, MCTS_AGENT
+from game.ai.expectimax import ExpectimaxAgent
+from game.controller.game_manager import GameManager
+from game.model.game import Game
+from game.model.player import Player
+from game.simulation.replay import ReplayReader
+from game.view.player_interface import AiInterface
+from utils.config import process_config
+
+N_GAMES = 10
+MAX_TURNS = 400
+
+
+class GameManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+
+    def test_same_games_as_rules(self):
+        for seed in range(N_GAMES):
+            manager = GameManager(self.config, headless=True, seed=seed, policy=rl.random_policy, use_agents=False)
+            manager.play(max_turns=MAX_TURNS)
+
+            game_rules = manager.get_rules()
+            rng = random.Random(seed)
+            data = game_rules.layout.new_buffer().tolist()
+            while data[st.TURN] < MAX_TURNS and not game_rules.is_over(data):
+                game_rules.play_turn(data, rng, rl.random_policy)
+            self.assertEqual(manager.get_game().get_state().get_data().tolist(), data)
+
+            # broke players left the game, with their properties
+            game = manager.get_game()
+            self.assertEqual(len(game.get_player_list()), game_rules.n_active(data))
+            for p in game.get_player_list().values():
+                self.assertFalse(p.is_broke())
+                self.assertEqual(set(p.get_property_list().keys()),
+                                 {h.get_name() for h in game.get_player_hotels(name=p.get_name())})
+
+    def test_headless(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), \
+                mock.patch.object(Game, '__repr__', side_effect=AssertionError('__repr__ called')), \
+                mock.patch.object(Player, '__repr__', side_effect=AssertionError('__repr__ called')), \
+                mock.patch('builtins.input', side_effect=AssertionError('input called')):
+            manager = GameManager(self.config, headless=True, seed=0, use_agents=False)
+            winners = manager.play(max_turns=MAX_TURNS)
+        self.assertEqual(out.getvalue(), '')
+        self.assertTrue(set(winners) <= set(manager.get_game().get_player_list().keys()))
+
+    def test_agents(self):
+        self.config.game_dict.ai = EasyDict({'agent': EXPECTIMAX_AGENT, 'depth': 1})
+        manager = GameManager(self.config, headless=True, seed=0, use_agents=True)
+        ai = [p for p in manager.get_game().get_player_list().values()
+              if isinstance(p.get_ui(), AiInterface) and p.get_ui().get_agent() is not None]
+        self.assertEqual(len(ai), sum(1 for p in self.config.game_dict.player_list if p.is_ai))
+        manager.play(max_turns=30)
+        self.assertEqual(manager.get_game().get_state().get_turn(), 30)
+
+    def test_close(self):
+        # play closes the agents, with the worker processes of the leaf-parallel MCTS
+        self.config.game_dict.ai = EasyDict({'agent': MCTS_AGENT, 'workers': 2, 'time_ms': 5})
+        manager = GameManager(self.config, headless=True, seed=0, use_agents=True)
+        agents = [manager.get_agent(p) for p in manager.get_game().get_player_list().values()
+                  if manager.get_agent(p) is not None]
+        self.assertTrue(agents)
+        self.assertTrue(all(a._MCTSAgent__search._MCTS__pool is not None for a in agents))
+        manager.play(max_turns=3)
+        self.assertTrue(all(a._MCTSAgent__search._MCTS__pool is None for a in agents))
+
+        # callers driving the turns close the manager, also when a turn fails
+        self.config.game_dict.ai = EasyDict({'agent': EXPECTIMAX_AGENT})
+        n_ai = sum(1 for p in self.config.game_dict.player_list if p.is_ai)
+        with mock.patch.object(ExpectimaxAgent, 'close') as close:
+            with GameManager(self.config, headless=True, seed=0, use_agents=True) as manager:
+                manager.play_turn()
+            self.assertEqual(close.call_count, n_ai)
+            with self.assertRaises(ValueError), GameManager(self.config, headless=True, seed=0, use_agents=True):
+                raise ValueError
+            self.assertEqual(close.call_count, 2 * n_ai)
+
+    def test_replay(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'game.bin')
+            manager = GameManager(self.config, headless=True, seed=0, use_agents=False, replay=path)
+            manager.play(max_turns=MAX_TURNS)
+            game_state = manager.get_game().get_state()
+            layout = game_state.get_layout()
+            reader = ReplayReader(path)
+            turns = reader.get_records()
+            self.assertEqual(len(reader), game_state.get_turn())
+            self.assertEqual(turns['turn'].tolist(), list(range(game_state.get_turn())))
+            money = st.START_MONEY + turns['money_delta'].sum(axis=0)
+            self.assertEqual(money.tolist(), game_state.get_data()[layout.money_off: layout.position_off].tolist())
+
+        with self.assertRaises(AssertionError):
+            GameManager(self.config, headless=True, use_agents=False, recorder=print, replay=os.devnull)
+
+    def test_interactive(self):
+        # humans pick the first action at the prompt, the turns are reported
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), mock.patch('builtins.input', return_value='0'):
+            manager = GameManager(self.config, seed=0, use_agents=False)
+            manager.play(max_turns=10)
+        self.assertIn('Turn 0:', out.getvalue())
+        self.assertIn('Winner:', out.getvalue())
+
+    def test_watch(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), mock.patch('builtins.input', return_value='0'):
+            manager = GameManager(self.config, seed=0, use_agents=False, watch=True)
+            manager.play(max_turns=10)
+        self.assertEqual(out.getvalue().count('Players: '), 10)
+
+    def test_headless_policy(self):
+        # headless games are played by the policy, unless the agents are asked for
+        self.config.game_dict.ai = EasyDict({'agent': EXPECTIMAX_AGENT})
+        manager = GameManager(self.config, headless=True, seed=0)
+        self.assertTrue(all(manager.get_agent(p) is None for p in manager.get_game().get_player_list().values()))
+        manager = GameManager(self.config, seed=0)
+        self.assertTrue(any(manager.get_agent(p) is not None for p in manager.get_game().get_player_list().values()))
+
+    def test_simulate(self):
+        manager = GameManager(self.config, headless=True, use_agents=False)
+        before = manager.get_game().get_state().get_data().tolist()
+        results = manager.simulate(N_GAMES, max_turns=MAX_TURNS, seed=0)
+        self.assertEqual(len(results), N_GAMES)
+        self.assertEqual(results, manager.simulate(N_GAMES, max_turns=MAX_TURNS, seed=0))
+        self.assertEqual(manager.get_game().get_state().get_data().tolist(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
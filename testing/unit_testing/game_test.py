@@ -79,6 +79,106 @@ class MyTestCase(unittest.TestCase):
 
         self.assertEqual(hotel.get_name(), hotel_name)
 
+    def test_clone(self):
+        config = process_config(EasyDict())
+        game = Game(config=config)
+
+        pl_name = random.choice(list(game.get_player_list().keys()))
+        hotel_name = random.choice(list(game.get_hotel_list().keys()))
+        pl = game.get_player(name=pl_name)
+        htl = game.get_hotel(name=hotel_name)
+        pl.add_property(h=htl)
+        htl.set_owner(player_name=pl_name)
+        game.get_board().move_player(p=pl, delta=3)
+
+        clone = game.clone()
+        clone_pl = clone.get_player(name=pl_name)
+        clone_htl = clone.get_hotel(name=hotel_name)
+
+        # same content
+        self.assertEqual(clone.get_state(), game.get_state())
+        self.assertEqual(clone_htl.get_owner(), pl_name)
+        self.assertIs(clone_pl.get_property_list()[hotel_name], clone_htl)
+        self.assertEqual(clone.get_board().find_player_pos(p=clone_pl).get_id(), 2)
+
+        # independent changes
+        clone_pl.change_money(amount=-500)
+        clone_htl.upgrade(0)
+        clone.get_board().move_player(p=clone_pl, delta=1)
+        self.assertEqual(pl.get_money(), clone_pl.get_money() + 500)
+        self.assertEqual(htl.get_star_level(), 0)
+        self.assertEqual(game.get_board().find_player_pos(p=pl).get_id(), 2)
+
+        pl.change_money(amount=-100)
+        self.assertEqual(pl.get_money(), clone_pl.get_money() + 400)
+
+        # removed players stay removed in the clones
+        other = next(name for name in game.get_player_list().keys() if name != pl_name)
+        game.remove_player(name=other)
+        self.assertNotIn(other, game.clone().get_player_list())
+
+    def test_snapshot(self):
+        config = process_config(EasyDict())
+        game = Game(config=config)
+
+        pl = random.choice(list(game.get_player_list().values()))
+        htl = random.choice(list(game.get_hotel_list().values()))
+        snap = game.snapshot()
+
+        pl.change_money(amount=-1000)
+        htl.set_owner(player_name=pl.get_name())
+        self.assertEqual(snap.get_money(pl.get_id()), pl.get_money() + 1000)
+
+        game.restore(snap)
+        self.assertEqual(pl.get_money(), 12000)
+        self.assertIsNone(htl.get_owner())
+
+    def test_indexes(self):
+        config = process_config(EasyDict())
+        game = Game(config=config)
+        board = game.get_board()
+
+        pl1, pl2 = random.sample(list(game.get_player_list().values()), k=2)
+        fuji = game.get_hotel(name='Fujiyama')
+        boom = game.get_hotel(name='Boomerang')
+        snap = game.snapshot()
+
+        # player -> hotels, in sync with set_owner
+        fuji.set_owner(player_name=pl1.get_name())
+        boom.set_owner(player_name=pl1.get_name())
+        self.assertEqual(game.get_player_hotels(name=pl1.get_name()), [fuji, boom])
+        boom.set_owner(player_name=pl2.get_name())
+        self.assertEqual(game.get_player_hotels(name=pl1.get_name()), [fuji])
+        self.assertEqual(game.get_player_hotels(name=pl2.get_name()), [boom])
+
+        # cell -> players, in sync with move_player and remove_player
+        self.assertEqual(len(board.find_cell_players(-1)), len(game.get_player_list()))
+        board.move_player(p=pl1, delta=2)
+        board.move_player(p=pl2, delta=2)
+        self.assertEqual(sorted(board.find_cell_players(1)), sorted([pl1.get_name(), pl2.get_name()]))
+        self.assertNotIn(pl1.get_name(), board.find_cell_players(-1))
+        board.remove_player(p=pl2)
+        self.assertEqual(board.find_cell_players(1), [pl1.get_name()])
+        self.assertRaises(IndexError, lambda: board.find_cell_players(31))
+
+        # hotel -> entrance cells, and O(1) rent resolution
+        board.find_cell(1).add_entrance(fuji)
+        board.find_cell(3).add_entrance(fuji)
+        self.assertEqual([c.get_id() for c in board.find_entrances(fuji)], [1, 3])
+        self.assertEqual(board.find_entrances(boom), [])
+        self.assertIsNone(board.rent_due(p=pl1))      # own hotel
+        pl3 = next(p for p in game.get_player_list().values() if p not in (pl1, pl2))
+        board.move_player(p=pl3, delta=2)
+        self.assertIsNone(board.rent_due(p=pl3))      # no stars yet
+        fuji.upgrade(0)
+        self.assertEqual(board.rent_due(p=pl3), fuji)
+
+        # indexes are part of the state
+        game.restore(snap)
+        self.assertEqual(game.get_player_hotels(name=pl1.get_name()), [])
+        self.assertEqual(board.find_entrances(fuji), [])
+        self.assertEqual(len(board.find_cell_players(-1)), len(game.get_player_list()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,130 @@
+"""
+Testing module for InferenceBatcher class and the NumPy evaluators
+"""
+
+import os
+import queue
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock as mock
+
+import numpy as np
+
+import game.model.rules as rl
+
+from easydict import EasyDict
+
+from game.ai.agents import attach_agents, NETWORK_AGENT
+from game.ai.inference import InferenceBatcher, LinearEvaluator, MLPEvaluator, NetworkAgent
+from game.model.game import Game
+from utils.config import process_config
+
+N_FEATURES = 16
+N_THREADS = 8
+N_REQUESTS = 50
+
+
+class InferenceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.mlp = MLPEvaluator.random([N_FEATURES, 32, 3], seed=0)
+
+    def test_evaluators(self):
+        x = self.rng.normal(size=(5, N_FEATURES)).astype(np.float32)
+        w, b = self.rng.normal(size=(N_FEATURES, 2)), self.rng.normal(size=2)
+        np.testing.assert_allclose(LinearEvaluator(w, b)(x), x @ w + b, rtol=1e-5)
+
+        (w0, b0), (w1, b1) = self.mlp.layers
+        np.testing.assert_allclose(self.mlp(x), np.maximum(x @ w0 + b0, 0) @ w1 + b1, rtol=1e-5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'weights.npz')
+            self.mlp.save(path)
+            np.testing.assert_array_equal(MLPEvaluator.load(path)(x), self.mlp(x))
+
+    def test_concurrent_callers(self):
+        x = self.rng.normal(size=(N_THREADS, N_REQUESTS, N_FEATURES)).astype(np.float32)
+        results = np.zeros((N_THREADS, N_REQUESTS, 3), dtype=np.float32)
+        with InferenceBatcher(self.mlp, N_FEATURES, max_batch=32, max_delay_ms=5.) as batcher:
+            def caller(t):
+                futures = [batcher.submit(x[t, i]) for i in range(N_REQUESTS)]
+                for i, f in enumerate(futures):
+                    results[t, i] = f.result(timeout=10)
+
+            threads = [threading.Thread(target=caller, args=(t, )) for t in range(N_THREADS)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            # fewer evaluations than observations
+            self.assertEqual(batcher.n_observations, N_THREADS * N_REQUESTS)
+            self.assertLess(batcher.n_batches, N_THREADS * N_REQUESTS)
+
+        expected = self.mlp(x.reshape(-1, N_FEATURES)).reshape(results.shape)
+        np.testing.assert_allclose(results, expected, rtol=1e-5, atol=1e-6)
+
+    def test_blocks(self):
+        x = self.rng.normal(size=(20, N_FEATURES)).astype(np.float32)
+        with InferenceBatcher(self.mlp, N_FEATURES, max_batch=24) as batcher:
+            futures = [batcher.submit(x[:12]), batcher.submit(x[12:]), batcher.submit(x[:12])]
+            values = [f.result(timeout=10) for f in futures]
+            self.assertEqual(values[0].shape, (12, 3))
+            np.testing.assert_allclose(np.concatenate(values[:2]), self.mlp(x), rtol=1e-5, atol=1e-6)
+            with self.assertRaises(AssertionError):
+                batcher.submit(np.zeros((25, N_FEATURES)))
+        with self.assertRaises(RuntimeError):
+            batcher.submit(x[0])
+
+    def test_close_while_submitting(self):
+        # a close during a submit waits for its request, none is queued behind the stop request
+        class SlowQueue(queue.SimpleQueue):
+            def put(self, item, block=True, timeout=None):
+                if item is not None:
+                    time.sleep(0.05)
+                super().put(item, block, timeout)
+
+        with mock.patch.object(queue, 'SimpleQueue', SlowQueue):
+            batcher = InferenceBatcher(self.mlp, N_FEATURES)
+        futures = []
+        submitter = threading.Thread(target=lambda: futures.append(batcher.submit(np.zeros(N_FEATURES))))
+        submitter.start()
+        time.sleep(0.01)
+        batcher.close()
+        submitter.join()
+        self.assertEqual(futures[0].result(timeout=1).shape, (3, ))
+        with self.assertRaises(RuntimeError):
+            batcher.submit(np.zeros(N_FEATURES))
+
+    def test_errors(self):
+        def failing(observations):
+            raise ValueError('broken model')
+
+        with InferenceBatcher(failing, N_FEATURES) as batcher:
+            with self.assertRaises(ValueError):
+                batcher.submit(np.zeros(N_FEATURES)).result(timeout=10)
+
+    def test_agents(self):
+        config = process_config(EasyDict())
+        config.game_dict.ai = EasyDict({'agent': NETWORK_AGENT, 'batch_delay_ms': 1})
+        for p in config.game_dict.player_list:
+            p.is_ai = True
+        game = Game(config=config)
+        game_rules = rl.Rules(config=config, layout=game.get_state().get_layout())
+        attach_agents(game, config, game_rules, seed=0)
+        agents = [p.get_ui().get_agent() for p in game.get_player_list().values()]
+        for agent in agents:
+            self.assertIsInstance(agent, NetworkAgent)
+
+        # current player on a buying land cell
+        game.get_state().set_position(0, 2)
+        data = game.get_state().get_data().tolist()
+        action = agents[0].choose_action(game.get_state())
+        self.assertIn(action, game_rules.legal_actions(data))
+        # the same state, on the batcher shared with the other players, gives the same choice
+        self.assertEqual(agents[1].choose_action(game.get_state()), action)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Testing module for MCTS class
+"""
+
+import time
+import unittest
+
+from array import array
+
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.ai.agents import attach_agents, build_agent, get_ai_config, MCTS_AGENT, EXPECTIMAX_AGENT
+from game.ai.expectimax import ExpectimaxAgent
+from game.ai.mcts import MCTS, MCTSAgent, DecisionNode, ChanceNode, PUCT
+from game.ai.rollout import RolloutEngine
+from game.ai.transposition import TranspositionTable
+from game.model.game import Game
+from game.view.player_interface import AiInterface
+from utils.config import process_config
+
+
+class MCTSTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.layout = self.game.get_state().get_layout()
+        self.rules = rl.Rules(config=self.config, layout=self.layout)
+        self.engine = RolloutEngine(self.rules, max_turns=20, seed=0)
+
+        # current player on a buying land cell
+        self.game.get_state().set_position(0, 2)
+
+    def test_tree(self):
+        search = MCTS(self.engine, self.rules, seed=0)
+        root = search.new_root(self.game.get_state().get_data().tolist())
+        self.assertEqual(search.run(root, n_iterations=300), 300)
+
+        # every visit of the root went through one of its actions
+        self.assertEqual(root.n, 300)
+        self.assertEqual(sum(c.n for c in root.children), root.n)
+        self.assertAlmostEqual(sum(root.w), root.n)     # win shares sum to one per visit
+        self.assertIn(search.best_action(root), root.actions)
+
+        # chance nodes: children sum of visits, players alternate
+        chance = max(root.children, key=lambda c: c.n)
+        self.assertEqual(sum(c.n for c in chance.children.values()), chance.n - 1)
+        for child in chance.children.values():
+            if isinstance(child, DecisionNode):
+                self.assertEqual(child.p_id, 1)
+            else:
+                self.assertIsInstance(child, ChanceNode)
+
+        # state of the game untouched
+        self.assertEqual(self.game.get_state().get_turn(), 0)
+
+    def test_puct(self):
+        search = MCTS(self.engine, self.rules, mode=PUCT, seed=0)
+        root = search.new_root(self.game.get_state().get_data().tolist())
+        search.run(root, n_iterations=100)
+        self.assertEqual(root.n, 100)
+        self.assertEqual(root.prior, [1. / len(root.actions)] * len(root.actions))
+        self.assertRaises(ValueError, lambda: MCTS(self.engine, self.rules, mode='other'))
+
+    def test_time_budget(self):
+        search = MCTS(self.engine, self.rules, seed=0)
+        root = search.new_root(self.game.get_state().get_data().tolist())
+        start = time.perf_counter()
+        done = search.run(root, time_ms=100)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreater(done, 0)
+        self.assertRaises(AssertionError, lambda: search.run(root))
+
+    def test_subtree_reuse(self):
+        agent = MCTSAgent(MCTS(self.engine, self.rules, seed=0), time_ms=None, n_iterations=3000)
+        action = agent.choose_action(self.game.get_state())
+        self.assertIn(action, self.rules.legal_actions(self.game.get_state().get_data()))
+        self.assertEqual(agent.reused, 0)
+
+        # replay a path that the tree explored: action, then the most visited outcomes up to the agent's turn
+        node = agent._MCTSAgent__subtree
+        while not (isinstance(node, DecisionNode) and node.p_id == 0):
+            if isinstance(node, ChanceNode):
+                node = max(node.children.values(), key=lambda c: c.n)
+            else:
+                node = max((c for c in node.children if c is not None), key=lambda c: c.n)
+        expected = node.n
+        agent.choose_action(st.GameState(self.layout, array('i', node.data)))
+        self.assertEqual(agent.reused, expected)
+
+    def test_transposition(self):
+        table = TranspositionTable(capacity=1 << 16)
+        search = MCTS(self.engine, self.rules, seed=0, table=table)
+        data = self.game.get_state().get_data().tolist()
+        root = search.new_root(data)
+        search.run(root, n_iterations=200)
+        self.assertEqual(root.n, 200)
+        self.assertAlmostEqual(sum(root.w), root.n)
+
+        # every node carries the hash of its state, the leaves are stored
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            self.assertEqual(node.key, self.rules.state_key(node.data))
+            children = node.children.values() if isinstance(node, ChanceNode) else node.children
+            nodes.extend(c for c in children if c is not None)
+        self.assertGreater(len(table), 0)
+
+        # a new tree of the same state meets the leaves of the first one
+        hits = table.hits
+        search.run(search.new_root(data), n_iterations=20)
+        self.assertGreater(table.hits, hits)
+
+    def test_leaf_parallel(self):
+        with MCTS(self.engine, self.rules, n_workers=2, seed=0) as search:
+            root = search.new_root(self.game.get_state().get_data().tolist())
+            search.run(root, n_iterations=10)
+            self.assertEqual(root.n, 10)
+            self.assertAlmostEqual(sum(root.w), 10)
+
+    def test_config(self):
+        ai_config = get_ai_config(self.config)
+        self.assertEqual(ai_config.agent, MCTS_AGENT)
+        agent = build_agent(ai_config, self.rules)
+        self.assertIsInstance(agent, MCTSAgent)
+        self.assertIsInstance(agent._MCTSAgent__search._MCTS__table, TranspositionTable)
+        ai_config.table_size = 0
+        self.assertIsNone(build_agent(ai_config, self.rules)._MCTSAgent__search._MCTS__table)
+
+        # a player entry can override the agent
+        self.config.game_dict.player_list[0].agent = EXPECTIMAX_AGENT
+        name = self.config.game_dict.player_list[0].name
+        self.assertEqual(get_ai_config(self.config, name).agent, EXPECTIMAX_AGENT)
+        attach_agents(self.game, self.config, self.rules, seed=0)
+        ai = self.game.get_player(name).get_ui()
+        self.assertIsInstance(ai, AiInterface)
+        self.assertIsInstance(ai.get_agent(), ExpectimaxAgent)
+
+        ai_config.agent = 'other'
+        self.assertRaises(ValueError, lambda: build_agent(ai_config, self.rules))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Testing module for ReplayWriter and ReplayReader classes
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+import tournament
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.simulation.replay import ReplayWriter, ReplayReader, record_dtype, record_struct
+from utils.config import process_config
+
+N_GAMES = 10
+MAX_TURNS = 300
+
+
+class ReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        config = process_config(EasyDict())
+        self.layout = st.StateLayout(player_names=[p.name for p in config.game_dict.player_list],
+                                     hotel_names=config.hotel_dict.keys())
+        self.rules = rl.Rules(config=config, layout=self.layout)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'replay.bin')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def play(self,
+             writer: ReplayWriter) -> list[list[int]]:
+        """
+        :return: final state buffer of every game
+        """
+        r = self.rules
+        finals = []
+        rng = random.Random(0)
+        for _ in range(N_GAMES):
+            data = self.layout.new_buffer().tolist()
+            writer.begin_game(data)
+            while data[st.TURN] < MAX_TURNS and not r.is_over(data):
+                r.play_turn(data, rng, rl.greedy_policy, writer.record_turn)
+            finals.append(data)
+        return finals
+
+    def test_dtype(self):
+        n_players, n_hotels = self.rules.n_players, self.rules.n_hotels
+        self.assertEqual(record_dtype(n_players, n_hotels).itemsize, record_struct(n_players, n_hotels).size)
+
+    def test_round_trip(self):
+        # small staging buffer: records cross several flushes
+        with ReplayWriter(self.path, self.rules, buffer_turns=64) as writer:
+            finals = self.play(writer)
+            n_records = writer.get_n_records()
+
+        reader = ReplayReader(self.path)
+        records = reader.get_records()
+        self.assertIsInstance(records, np.memmap)
+        self.assertEqual(len(reader), n_records)
+        self.assertEqual(reader.get_n_players(), self.rules.n_players)
+
+        games = list(reader.iter_games())
+        self.assertEqual(len(games), N_GAMES)
+        layout = self.layout
+        for g, (turns, data) in enumerate(zip(games, finals)):
+            self.assertTrue((turns['game'] == g).all())
+            self.assertEqual(turns['turn'].tolist(), list(range(len(turns))))
+            self.assertTrue(((turns['move'] >= 1) & (turns['move'] <= rl.DIE_FACES)).all())
+            self.assertTrue(((turns['nights'] >= 0) & (turns['nights'] <= rl.DIE_FACES)).all())
+            # money deltas add up to the final money
+            money = st.START_MONEY + turns['money_delta'].sum(axis=0)
+            self.assertEqual(money.tolist(), data[layout.money_off: layout.position_off])
+            self.assertEqual(turns['owner'][-1].tolist(), data[layout.owner_off: layout.star_off])
+            self.assertEqual(turns['star'][-1].tolist(), data[layout.star_off: layout.upgrade_off])
+            # changed flags the hotels that differ from the previous turn
+            owner, star = turns['owner'].astype(int), turns['star'].astype(int)
+            diff = (owner[1:] != owner[:-1]) | (star[1:] != star[:-1])
+            flags = (turns['changed'][1:, None] >> np.arange(self.rules.n_hotels)) & 1
+            self.assertTrue((diff == flags.astype(bool)).all())
+            # nothing is paid without nights
+            paid = turns['money_delta'][turns['nights'] == 0]
+            mover = turns['player'][turns['nights'] == 0]
+            others = np.ones(paid.shape, dtype=bool)
+            others[np.arange(len(mover)), mover] = False
+            self.assertTrue((paid[others] == 0).all())
+
+        chunks = list(reader.iter_chunks(chunk_size=100))
+        self.assertEqual(sum(len(c) for c in chunks), n_records)
+
+    def test_recording_does_not_change_games(self):
+        with ReplayWriter(self.path, self.rules) as writer:
+            seats = ('greedy', 'random', 'greedy')
+            recorded = tournament.play_game(self.rules, seats, seed=3, max_turns=MAX_TURNS, writer=writer)
+        self.assertEqual(recorded, tournament.play_game(self.rules, seats, seed=3, max_turns=MAX_TURNS))
+        self.assertEqual(len(list(ReplayReader(self.path).iter_games())), 1)
+
+    def test_empty_and_invalid(self):
+        ReplayWriter(self.path, self.rules).close()
+        reader = ReplayReader(self.path)
+        self.assertEqual(len(reader), 0)
+        self.assertEqual(list(reader.iter_games()), [])
+
+        with open(self.path, 'wb') as f:
+            f.write(b'not a replay file at all')
+        with self.assertRaises(ValueError):
+            ReplayReader(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
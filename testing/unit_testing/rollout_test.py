@@ -0,0 +1,73 @@
+"""
+Testing module for RolloutEngine class
+"""
+
+import unittest
+
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.ai.rollout import RolloutEngine, RolloutAgent
+from game.model.game import Game
+from game.view.player_interface import AiInterface
+from utils.config import process_config
+
+
+class RolloutTest(unittest.TestCase):
+
+    def setUp(self):
+        config = process_config(EasyDict())
+        self.game = Game(config=config)
+        self.rules = rl.Rules(config=config, layout=self.game.get_state().get_layout())
+
+        # current player on a buying land cell
+        self.game.get_state().set_position(0, 2)
+
+    def test_rollout(self):
+        engine = RolloutEngine(self.rules, max_turns=20, seed=0)
+        data = self.game.get_state().get_data().tolist()
+        engine.rollout(data)
+        self.assertTrue(data[st.TURN] == 20 or self.rules.is_over(data))
+
+        # state of the game untouched
+        self.assertEqual(self.game.get_state().get_turn(), 0)
+
+    def test_seed(self):
+        stats = [RolloutEngine(self.rules, seed=1).evaluate(self.game.get_state(), n_rollouts=50)
+                 for _ in range(2)]
+        self.assertEqual({a: (s.n, s.wins, s.net_worth) for a, s in stats[0].items()},
+                         {a: (s.n, s.wins, s.net_worth) for a, s in stats[1].items()})
+
+    def test_evaluate(self):
+        engine = RolloutEngine(self.rules, seed=0)
+        actions = self.rules.legal_actions(self.game.get_state().get_data())
+        self.assertGreater(len(actions), 1)
+
+        stats = engine.evaluate(self.game.get_state(), n_rollouts=10 * len(actions))
+        self.assertEqual(set(stats.keys()), set(actions))
+        for s in stats.values():
+            self.assertEqual(s.n, 10)
+            self.assertGreaterEqual(s.get_win_rate(), 0.)
+            self.assertLessEqual(s.get_win_rate(), 1.)
+            self.assertGreater(s.get_expected_net_worth(), 0.)
+
+        stats = engine.evaluate(self.game.get_state(), time_ms=20)
+        self.assertGreater(sum(s.n for s in stats.values()), 0)
+
+        self.assertRaises(AssertionError,
+                          lambda: engine.evaluate(self.game.get_state()))
+
+    def test_agent(self):
+        ui = AiInterface()
+        self.assertRaises(AssertionError,
+                          lambda: ui.choose_action(self.game.get_state()))
+
+        ui.set_agent(RolloutAgent(RolloutEngine(self.rules, seed=0), n_rollouts=20, time_ms=None))
+        action = ui.choose_action(self.game.get_state())
+        self.assertIn(action, self.rules.legal_actions(self.game.get_state().get_data()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Testing module for RootParallelSearch class
+"""
+
+import os
+import unittest
+
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.ai.agents import build_agent, get_ai_config, MCTS_AGENT
+from game.ai.rollout import RolloutEngine
+from game.ai.root_parallel import RootParallelSearch, RootParallelAgent, ROOT_MCTS, ROOT_ROLLOUT
+from game.model.game import Game
+from utils.config import process_config
+
+N_WORKERS = 2
+N_ITERATIONS = 60
+SHM_DIR = '/dev/shm'
+
+
+def shm_entries() -> set[str]:
+    return set(os.listdir(SHM_DIR)) if os.path.isdir(SHM_DIR) else set()
+
+
+class RootParallelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.layout = self.game.get_state().get_layout()
+        self.rules = rl.Rules(config=self.config, layout=self.layout)
+        self.engine = RolloutEngine(self.rules, max_turns=20, seed=0)
+
+        # current player on a buying land cell
+        self.game.get_state().set_position(0, 2)
+        self.data = self.game.get_state().get_data().tolist()
+
+    def test_mcts(self):
+        before = shm_entries()
+        with RootParallelSearch(self.engine, self.rules, n_workers=N_WORKERS, kind=ROOT_MCTS, seed=0) as search:
+            actions, merged = search.search(self.data, n_iterations=N_ITERATIONS)
+            self.assertEqual(actions, self.rules.legal_actions(self.data))
+            self.assertEqual(merged.shape, (len(actions), 1 + self.rules.n_players))
+            # every iteration of every worker goes through one root action
+            self.assertEqual(merged[:, 0].sum(), N_WORKERS * N_ITERATIONS)
+            self.assertTrue((merged[:, 0] > 0).all())
+            # win shares sum to 1 per visit
+            self.assertAlmostEqual(merged[:, 1:].sum(), merged[:, 0].sum(), places=6)
+            self.assertIn(search.best_action(actions, merged), actions)
+        self.assertEqual(shm_entries() - before, set())
+
+    def test_rollout(self):
+        with RootParallelSearch(self.engine, self.rules, n_workers=N_WORKERS, kind=ROOT_ROLLOUT, seed=0) as search:
+            actions, merged = search.search(self.data, n_iterations=N_ITERATIONS)
+            p_id = self.data[st.CURRENT_PLAYER]
+            self.assertEqual(merged.shape[0], len(actions))
+            self.assertTrue((merged[:, 0] > 0).all())
+            self.assertTrue((merged[:, 1 + p_id] <= merged[:, 0]).all())
+
+    def test_single_action(self):
+        self.game.get_state().set_position(0, -1)
+        data = self.game.get_state().get_data().tolist()
+        with RootParallelSearch(self.engine, self.rules, n_workers=N_WORKERS, seed=0) as search:
+            actions, merged = search.search(data, n_iterations=N_ITERATIONS)
+            self.assertEqual(actions, [rl.PASS])
+            self.assertEqual(search.best_action(actions, merged), rl.PASS)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            RootParallelSearch(self.engine, self.rules, n_workers=N_WORKERS, kind='minimax')
+
+    def test_agent(self):
+        self.config.game_dict.ai = EasyDict({'agent': MCTS_AGENT, 'root_workers': N_WORKERS, 'time_ms': 50})
+        agent = build_agent(get_ai_config(self.config), self.rules, seed=0)
+        self.assertIsInstance(agent, RootParallelAgent)
+        self.assertIn(agent.choose_action(self.game.get_state()), self.rules.legal_actions(self.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
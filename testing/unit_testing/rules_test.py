@@ -0,0 +1,241 @@
+"""
+Testing module for Rules class
+"""
+
+import unittest
+import random
+
+from unittest import mock
+
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from utils.compiled_config import compile_config
+from utils.config import process_config
+
+N_GAMES = 20
+
+
+class RulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.layout = self.game.get_state().get_layout()
+        self.rules = rl.Rules(config=self.config, layout=self.layout)
+
+    def test_tables(self):
+        r = self.rules
+        for h in self.game.get_hotel_list().values():
+            h_id = h.get_id()
+            self.assertEqual(r.land_cost[h_id], h.get_land_cost())
+            self.assertEqual(r.entrance_cost[h_id], h.get_entrance_cost())
+            # next upgrade from scratch is the cheapest idx shown by get_upgrade_costs
+            costs = h.get_upgrade_costs()
+            first = min(self.config.hotel_upgrade_type_dict[k] for k in costs.keys())
+            self.assertEqual(r.next_upgrade[h_id][0], first)
+
+        for cell_id in range(-1, 31):
+            c = self.game.get_board().find_cell(cell_id)
+            self.assertEqual(r.cell_type[cell_id + 1], c.get_type())
+            self.assertEqual([self.layout.get_hotel_names()[h_id] for h_id in r.hotels_near[cell_id + 1]],
+                             list(c.get_hotels_near()))
+
+    def test_action_encoding(self):
+        r = self.rules
+        self.assertEqual(r.decode(r.action(rl.PASS)), (rl.PASS, 0))
+        for kind in (rl.BUY_LAND, rl.BUILD, rl.BUY_ENTRANCE):
+            for h_id in range(r.n_hotels):
+                a = r.action(kind, h_id)
+                self.assertLess(a, r.n_actions)
+                self.assertEqual(r.decode(a), (kind, h_id))
+
+    def test_buy_and_build(self):
+        r = self.rules
+        data = self.game.get_state().get_data().tolist()
+        p_id = data[st.CURRENT_PLAYER]
+
+        # cell 2 lets buy land of Fujiyama and Boomerang
+        r.move(data, 3)
+        actions = r.legal_actions(data)
+        fuji = self.layout.hotel_id('Fujiyama')
+        self.assertIn(r.action(rl.BUY_LAND, fuji), actions)
+        self.assertNotIn(r.action(rl.BUILD, fuji), actions)
+
+        r.apply_action(data, r.action(rl.BUY_LAND, fuji))
+        self.assertEqual(data[self.layout.owner_off + fuji], p_id)
+        self.assertEqual(data[self.layout.money_off + p_id], st.START_MONEY - r.land_cost[fuji])
+
+        # cell 1 is a building permission next to Fujiyama
+        data[self.layout.position_off + p_id] = 1
+        actions = r.legal_actions(data)
+        self.assertIn(r.action(rl.BUILD, fuji), actions)
+        r.apply_action(data, r.action(rl.BUILD, fuji))
+        self.assertEqual(data[self.layout.upgrade_off + fuji], 0)
+        self.assertEqual(data[self.layout.star_off + fuji], r.star_upgrade[fuji][0])
+
+        # entrance on the cell, now that the hotel has stars
+        actions = r.legal_actions(data)
+        self.assertIn(r.action(rl.BUY_ENTRANCE, fuji), actions)
+        r.apply_action(data, r.action(rl.BUY_ENTRANCE, fuji))
+        self.assertEqual(data[self.layout.entrance_off + 2], fuji)
+        self.assertNotIn(r.action(rl.BUY_ENTRANCE, fuji), r.legal_actions(data))
+
+    def test_rent_and_elimination(self):
+        r = self.rules
+        data = self.game.get_state().get_data().tolist()
+        owner, payer = 0, 1
+        fuji = self.layout.hotel_id('Fujiyama')
+        data[self.layout.owner_off + fuji] = owner
+        data[self.layout.upgrade_off + fuji] = 0
+        data[self.layout.star_off + fuji] = 1
+        data[self.layout.entrance_off + 1 + 1] = fuji
+
+        data[st.CURRENT_PLAYER] = payer
+        r.move(data, 2)     # start cell -> cell 1
+        self.assertEqual(r.rent_due(data), fuji)
+        self.assertFalse(r.pay_rent(data, fuji, nights=3))
+        amount = r.payments[fuji][0][2]
+        self.assertEqual(data[self.layout.money_off + payer], st.START_MONEY - amount)
+        self.assertEqual(data[self.layout.money_off + owner], st.START_MONEY + amount)
+
+        # owner does not pay
+        data[st.CURRENT_PLAYER] = owner
+        data[self.layout.position_off + owner] = 1
+        self.assertEqual(r.rent_due(data), st.NO_OWNER)
+
+        # broke payer is out and the turn skips them
+        data[st.CURRENT_PLAYER] = payer
+        data[self.layout.money_off + payer] = 1
+        data[self.layout.owner_off + self.layout.hotel_id('Boomerang')] = payer
+        self.assertTrue(r.pay_rent(data, fuji, nights=1))
+        self.assertEqual(data[self.layout.position_off + payer], st.OFF_BOARD)
+        self.assertNotIn(payer, [data[self.layout.owner_off + h_id] for h_id in range(r.n_hotels)])
+        self.assertEqual(r.net_worth(data, payer), 0)
+        r.end_turn(data)
+        self.assertNotEqual(data[st.CURRENT_PLAYER], payer)
+
+    def test_play(self):
+        r = self.rules
+        rng = random.Random(0)
+        for _ in range(N_GAMES):
+            data = self.game.get_state().get_data().tolist()
+            while not r.is_over(data):
+                r.play_turn(data, rng, rl.random_policy)
+                for p_id in range(r.n_players):
+                    if data[self.layout.position_off + p_id] != st.OFF_BOARD:
+                        self.assertGreater(data[self.layout.money_off + p_id], 0)
+            self.assertEqual(r.n_active(data), 1)
+
+    def test_play_turn_actions(self):
+        # play_turn generates into its own buffer, the policy is only called with a choice to make
+        r = self.rules
+        rng = random.Random(1)
+        data = self.game.get_state().get_data().tolist()
+        buffer = r.new_action_buffer()
+        seen = []
+
+        def policy(rules, state_data, actions, policy_rng):
+            n = r.generate_actions(state_data, buffer)
+            self.assertEqual(list(actions), list(buffer[:n]))
+            seen.append(len(actions))
+            return rl.random_policy(rules, state_data, actions, policy_rng)
+
+        with mock.patch.object(rl.Rules, 'legal_actions', side_effect=AssertionError('legal_actions called')):
+            for _ in range(300):
+                if r.play_turn(data, rng, policy) and r.is_over(data):
+                    break
+        self.assertTrue(seen)
+        self.assertTrue(all(n > 1 for n in seen))
+
+    def test_key_delta(self):
+        # the hash follows make / unmake without rehashing
+        r = self.rules
+        rng = random.Random(2)
+        data = self.game.get_state().get_data().tolist()
+        key = r.state_key(data)
+        self.assertEqual(key, self.game.get_state().get_key())
+        trail = []
+        marks = []
+        for _ in range(40):
+            if r.is_over(data):
+                break
+            mark = len(trail)
+            r.make_move(data, rng.randint(1, rl.DIE_FACES), trail)
+            h_id = r.rent_due(data)
+            if h_id == st.NO_OWNER or not r.make_rent(data, h_id, rng.randint(1, rl.DIE_FACES), trail):
+                r.make_action(data, rl.greedy_policy(r, data, r.legal_actions(data), rng), trail)
+            delta = r.key_delta(data, trail, mark)
+            key ^= delta
+            marks.append((mark, delta))
+            self.assertEqual(key, r.state_key(data))
+        for mark, delta in reversed(marks):
+            r.unmake(data, trail, mark)
+            key ^= delta
+            self.assertEqual(key, r.state_key(data))
+        self.assertEqual(data, self.game.get_state().get_data().tolist())
+
+    def test_ring_size(self):
+        # a smaller board wraps at its own size
+        config = EasyDict({k: v for k, v in self.config.items() if k != 'compiled'})
+        config.cell_dict = EasyDict({k: v for k, v in self.config.cell_dict.items() if int(k) < 20})
+        config.compiled = compile_config(config)
+        layout = st.StateLayout(player_names=[p.name for p in config.game_dict.player_list],
+                                hotel_names=config.hotel_dict.keys(), n_cells=len(config.cell_dict))
+        r = rl.Rules(config=config, layout=layout)
+        self.assertEqual(r.ring_size, len(config.cell_dict) - 1)
+        self.assertTrue(all(dest < r.ring_size for moves in r.transition for dest, _, _ in moves))
+
+        data = layout.new_buffer().tolist()
+        p_id = data[st.CURRENT_PLAYER]
+        data[layout.position_off + p_id] = r.ring_size - 2
+        data[layout.cell_players_off] = 0
+        data[layout.cell_players_off + r.ring_size - 1] = 1 << p_id
+        self.assertEqual(r.move(data, 3), 1)
+        trail = []
+        self.assertEqual(r.make_move(data, 6, trail), 7)
+
+        rng = random.Random(0)
+        for _ in range(200):
+            r.play_turn(data, rng, rl.random_policy)
+            self.assertTrue(all(data[layout.position_off + i] < r.ring_size for i in range(r.n_players)))
+
+    def test_generate_actions(self):
+        r = self.rules
+        rng = random.Random(1)
+        states = []
+        for _ in range(N_GAMES):
+            data = self.game.get_state().get_data().tolist()
+            for _ in range(rng.randint(0, 60)):
+                if r.play_turn(data, rng, rl.greedy_policy) and r.is_over(data):
+                    break
+            # every cell type, with the money checks
+            for cell_id in range(-1, 31):
+                landed = data[:]
+                landed[self.layout.position_off + landed[st.CURRENT_PLAYER]] = cell_id
+                states.append(landed)
+
+        out = r.new_action_buffer()
+        batch_out = r.new_action_buffer(len(states))
+        counts = [0] * len(states)
+        r.generate_actions_batch(states, batch_out, counts)
+        for i, data in enumerate(states):
+            n = r.generate_actions(data, out)
+            actions = list(out[:n])
+            self.assertLessEqual(n, r.max_actions)
+            self.assertEqual(actions[0], rl.PASS)
+            self.assertEqual(actions, r.legal_actions(data))
+            self.assertEqual(list(batch_out[i * r.max_actions: i * r.max_actions + counts[i]]), actions)
+            # every action is affordable: the player is not broke after it
+            p_id = data[st.CURRENT_PLAYER]
+            for a in actions:
+                child = data[:]
+                r.apply_action(child, a)
+                self.assertGreater(child[self.layout.money_off + p_id], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
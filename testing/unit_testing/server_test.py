@@ -0,0 +1,307 @@
+"""
+Testing module for GameServer and Table classes
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from easydict import EasyDict
+
+from game.ai.agents import EXPECTIMAX_AGENT
+from game.ai.expectimax import ExpectimaxAgent
+from game.controller.server import GameServer
+from game.model.sync import StateReplica
+from game.simulation.replay import ReplayReader
+from game.view.player_interface import AiInterface, HumanInterface
+from utils.config import process_config
+
+MAX_TURNS = 30
+TIMEOUT = 30
+
+
+class Client:
+    """
+    Line-delimited JSON client of the tests
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.n_requests = 0
+        # events received while waiting for an answer
+        self.events = []
+
+    async def request(self, **request):
+        """
+        :return: answer of the request, events received meanwhile are kept for receive
+        """
+        self.n_requests += 1
+        request['id'] = self.n_requests
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+        while True:
+            message = json.loads(await asyncio.wait_for(self.reader.readline(), TIMEOUT))
+            if message.get('id') == request['id']:
+                return message
+            self.events.append(message)
+
+    async def receive(self):
+        if self.events:
+            return self.events.pop(0)
+        return json.loads(await asyncio.wait_for(self.reader.readline(), TIMEOUT))
+
+    async def until(self, event):
+        """
+        :return: next event of this kind, and the turn events received before it
+        """
+        turns = []
+        while True:
+            message = await self.receive()
+            if message.get('event') == event:
+                return message, turns
+            if message.get('event') == 'turn':
+                turns.append(message)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class GameServerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.config = process_config(EasyDict())
+        # fast agents
+        self.config.game_dict.ai = EasyDict(self.config.game_dict.ai, agent=EXPECTIMAX_AGENT, depth=1)
+        self.server = GameServer(self.config)
+        self.port = await self.server.start_tcp()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def connect(self):
+        return Client(*await asyncio.open_connection('127.0.0.1', self.port))
+
+    async def test_ai_table(self):
+        client = await self.connect()
+        answer = await client.request(op='create', seed=0, max_turns=MAX_TURNS)
+        self.assertTrue(answer['ok'])
+        self.assertEqual(answer['players'], [p.name for p in self.config.game_dict.player_list])
+        self.assertTrue((await client.request(op='watch', table=answer['table']))['ok'])
+
+        over, turns = await client.until('over')
+        self.assertEqual(over['table'], answer['table'])
+        self.assertTrue(over['winners'])
+        self.assertTrue(turns)
+        self.assertTrue(all(t['turn'] < MAX_TURNS for t in turns))
+
+        state = await client.request(op='state', table=answer['table'])
+        self.assertEqual(state['status'], 'over')
+        self.assertEqual(set(state['state']['players'].keys()), set(answer['players']))
+        self.assertEqual(self.server.get_table(answer['table']).get_winners(), over['winners'])
+        await client.close()
+
+    async def test_close_agents(self):
+        # every seat of a table without humans is played by an agent
+        with mock.patch.object(ExpectimaxAgent, 'close') as close:
+            table = self.server.create_table(seed=0, max_turns=MAX_TURNS)
+            while table.get_status() != 'over':
+                await asyncio.sleep(0.01)
+        self.assertEqual(close.call_count, len(self.config.game_dict.player_list))
+
+    async def test_replay(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            server = GameServer(self.config, replay_dir=os.path.join(tmp, 'replays'))
+            tables = [server.create_table(seed=seed, max_turns=MAX_TURNS) for seed in range(2)]
+            while any(t.get_status() != 'over' for t in tables):
+                await asyncio.sleep(0.01)
+            for table in tables:
+                reader = ReplayReader(os.path.join(tmp, 'replays', f'table_{table.get_id():05d}.bin'))
+                self.assertEqual(len(reader), table.get_manager().get_game().get_state().get_turn())
+            await server.close()
+
+    async def test_human_table(self):
+        client = await self.connect()
+        is_ai = [p.is_ai for p in self.config.game_dict.player_list]
+        answer = await client.request(op='create', humans=['Trump'], seed=1, max_turns=MAX_TURNS)
+        table = answer['table']
+        # the seats of a table do not leak into the template config
+        self.assertEqual([p.is_ai for p in self.config.game_dict.player_list], is_ai)
+
+        # the game waits for the human seat to be taken
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.server.get_table(table).get_status(), 'playing')
+        self.assertFalse((await client.request(op='act', table=table, choice=0))['ok'])
+        self.assertTrue((await client.request(op='join', table=table, player='Trump'))['ok'])
+        self.assertFalse((await client.request(op='join', table=table, player='Trump'))['ok'])
+
+        n_prompts = 0
+        while True:
+            message = await client.receive()
+            if message.get('event') == 'prompt':
+                self.assertEqual(message['player'], 'Trump')
+                self.assertGreater(len(message['actions']), 1)
+                n_prompts += 1
+                answer = await client.request(op='act', table=table, choice=len(message['actions']))
+                self.assertFalse(answer['ok'])
+                answer = await client.request(op='act', table=table, choice=0)
+                self.assertTrue(answer['ok'])
+            elif message.get('event') == 'over':
+                break
+        self.assertGreater(n_prompts, 0)
+        await client.close()
+
+    async def test_leave_while_prompted(self):
+        client = await self.connect()
+        table = (await client.request(op='create', humans=['Trump'], seed=1, max_turns=MAX_TURNS))['table']
+        await client.request(op='join', table=table, player='Trump')
+        await client.until('prompt')
+        await client.close()
+
+        # the seat is free again, a new client takes it and gets the prompt again
+        client = await self.connect()
+        self.assertTrue((await client.request(op='join', table=table, player='Trump'))['ok'])
+        prompt, _ = await client.until('prompt')
+        self.assertEqual(prompt['player'], 'Trump')
+        await client.close()
+
+    async def test_sync(self):
+        client = await self.connect()
+        # human seat: the game waits for the client, no delta is missed
+        table = (await client.request(op='create', humans=['Trump'], seed=2, max_turns=MAX_TURNS))['table']
+        layout = self.server.get_table(table).get_manager().get_game().get_state().get_layout()
+        replica = StateReplica(layout)
+        answer = await client.request(op='sync', table=table, version=0)
+        replica.apply(base64.b64decode(answer['delta']))
+        await client.request(op='join', table=table, player='Trump')
+        while True:
+            message = await client.receive()
+            if message.get('event') == 'prompt':
+                await client.request(op='act', table=table, choice=0)
+            elif message.get('event') == 'delta':
+                payload = base64.b64decode(message['delta'])
+                self.assertLess(len(payload), 64)
+                replica.apply(payload)
+                self.assertTrue((await client.request(op='ack', table=table, version=replica.get_version()))['ok'])
+            elif message.get('event') == 'over':
+                break
+        state = self.server.get_table(table).get_manager().get_game().get_state()
+        self.assertEqual(replica.get_state(), state)
+        await client.close()
+
+    async def test_concurrent_tables(self):
+        client = await self.connect()
+        tables = []
+        for seed in range(8):
+            answer = await client.request(op='create', seed=seed, max_turns=MAX_TURNS)
+            tables.append(answer['table'])
+        self.assertEqual(len(set(tables)), len(tables))
+        listed = await client.request(op='list')
+        self.assertEqual({t['table'] for t in listed['tables']}, set(tables))
+
+        async def finished():
+            while any(self.server.get_table(t).get_status() != 'over' for t in tables):
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(finished(), TIMEOUT)
+        listed = await client.request(op='list')
+        self.assertTrue(all(t['status'] == 'over' for t in listed['tables']))
+        await client.close()
+
+    async def test_namespace_config(self):
+        # as server.py: the config is the namespace of the command line arguments
+        config = process_config(argparse.Namespace(host='127.0.0.1', port=0, unix=None))
+        config.game_dict.ai = EasyDict(config.game_dict.ai, agent=EXPECTIMAX_AGENT, depth=1)
+        server = GameServer(config)
+        table = server.create_table(humans=['Trump'], seed=0, max_turns=MAX_TURNS)
+        for name, p in table.get_manager().get_game().get_player_list().items():
+            self.assertIsInstance(p.get_ui(), HumanInterface if name == 'Trump' else AiInterface)
+        table.stop()
+        await server.close()
+
+    async def test_capacity(self):
+        server = GameServer(self.config, max_tables=2, max_finished=3)
+        # tables waiting for their human seats fill the server
+        waiting = [server.create_table(humans=['Trump'], seed=seed, max_turns=MAX_TURNS) for seed in range(2)]
+        with self.assertRaises(RuntimeError):
+            server.create_table(seed=0, max_turns=MAX_TURNS)
+        for table in waiting:
+            table.stop()
+        await server.close()
+
+        # finished tables free their place, only the last ones are kept
+        server = GameServer(self.config, max_tables=2, max_finished=3)
+        ids = []
+        for seed in range(7):
+            table = server.create_table(seed=seed, max_turns=MAX_TURNS)
+            ids.append(table.get_id())
+            while table.get_status() != 'over':
+                await asyncio.sleep(0.01)
+        self.assertEqual([t.get_id() for t in server.get_tables()], ids[-3:])
+        with self.assertRaises(KeyError):
+            server.get_table(ids[0])
+        await server.close()
+
+    async def test_table_error(self):
+        server = GameServer(self.config, max_tables=1)
+        n_players = len(self.config.game_dict.player_list)
+        with mock.patch.object(ExpectimaxAgent, 'choose_action', side_effect=RuntimeError('search failed')), \
+                mock.patch.object(ExpectimaxAgent, 'close') as close:
+            table = server.create_table(seed=0, max_turns=MAX_TURNS)
+            connection = mock.AsyncMock()
+            table.watch(connection)
+            while table.get_status() == 'playing':
+                await asyncio.sleep(0.01)
+            self.assertEqual(table.get_status(), 'error')
+            connection.send.assert_awaited_with({'event': 'error', 'table': table.get_id(),
+                                                 'error': 'search failed'})
+            self.assertEqual(close.call_count, n_players)
+
+            # the failed table freed its place, stopped tables close their agents as well, started or not
+            table = server.create_table(humans=['Trump'], seed=0, max_turns=MAX_TURNS)
+            await asyncio.sleep(0.01)
+            self.assertEqual(table.get_status(), 'playing')
+            await server.close()
+            self.assertEqual(table.get_status(), 'error')
+            self.assertEqual(close.call_count, 2 * n_players - 1)
+
+            server = GameServer(self.config)
+            server.create_table(humans=['Trump'], seed=0, max_turns=MAX_TURNS)
+            await server.close()
+            self.assertEqual(close.call_count, 3 * n_players - 2)
+
+    async def test_errors(self):
+        client = await self.connect()
+        self.assertIn('error', await client.request(op='nope', table=0))
+        self.assertIn('error', await client.request(op='state', table=123))
+        self.assertIn('error', await client.request(op='create', humans=['Nobody']))
+        client.writer.write(b'not json\n[1, 2]\n')
+        self.assertFalse((await client.receive())['ok'])
+        self.assertFalse((await client.receive())['ok'])
+        # the connection is still served
+        self.assertTrue((await client.request(op='list'))['ok'])
+        await client.close()
+
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'hotel.sock')
+            server = GameServer(self.config)
+            await server.start_unix(path)
+            client = Client(*await asyncio.open_unix_connection(path))
+            table = (await client.request(op='create', seed=0, max_turns=MAX_TURNS))['table']
+            await client.request(op='watch', table=table)
+            over, _ = await client.until('over')
+            self.assertTrue(over['winners'])
+            await client.close()
+            await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
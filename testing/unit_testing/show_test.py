@@ -0,0 +1,93 @@
+"""
+Testing module for BoardRenderer class and show_board
+"""
+
+import random
+import unittest
+
+import game.model.rules as rl
+import game.view.cli.show as show
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from game.view.cli.show import BoardRenderer, show_board
+from utils.cli_colors import colorize
+from utils.config import process_config
+
+N_TURNS = 200
+
+
+class ShowTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.board = self.game.get_board()
+        self.players = sorted(self.game.get_player_list().values(), key=lambda p: p.get_id())
+
+    def test_new_board(self):
+        text = show_board(self.board)
+        for cell_id in range(-1, 31):
+            self.assertIn(f'|{cell_id:02}|', text)
+        for name in self.game.get_hotel_list().keys():
+            self.assertIn(name, text)
+        # every player on the start cell, shown in the color of the first one in the config
+        self.assertIn(colorize(input_string='|-1|', fg='y'), text)
+        self.assertIs(show_board(self.board), text)
+
+    def test_patches(self):
+        p, other = self.players[0], self.players[1]
+        self.board.move_player(p, delta=4)
+        h = next(iter(self.game.get_hotel_list().values()))
+        h.set_owner(other.get_name())
+        h.upgrade(0)
+        text = show_board(self.board)
+        cell_id = self.board.find_player_pos(p).get_id()
+        self.assertIn(colorize(input_string=f'|{cell_id:02}|', fg='y'), text)
+        self.assertIn(colorize(input_string=other.get_name(), fg='r') + ' ' + '*' * h.get_star_level() + '\n', text)
+
+    def test_colors(self):
+        self.assertEqual([p.color for p in self.config.game_dict.player_list], ['Yellow', 'Red', 'Cyan'])
+        self.config.game_dict.player_list[0].color = 'Green'
+        del self.config.game_dict.player_list[2]['color']
+        text = show_board(Game(config=self.config).get_board())
+        self.assertIn(colorize(input_string='|-1|', fg='g'), text)
+        # players without a color get the default of their id
+        name = self.config.game_dict.player_list[2].name
+        self.assertIn(colorize(input_string=name, fg=show.DEFAULT_COLORS[2]), text)
+
+        self.config.game_dict.player_list[0].color = 'Purple'
+        with self.assertRaises(ValueError):
+            show_board(Game(config=self.config).get_board())
+
+    def test_board_sides(self):
+        self.assertEqual(show.board_sides(31), (range(-1, 10), range(10, 15), range(25, 14, -1), range(30, 25, -1)))
+        for ring_size in (4, 7, 16, 31, 32, 63):
+            top, right, bottom, left = show.board_sides(ring_size)
+            self.assertEqual(sorted([*top, *right, *bottom, *left]), list(range(-1, ring_size)))
+            self.assertEqual(len(right), len(left))
+            self.assertGreaterEqual(len(top), len(right))
+
+    def test_shared_skeleton(self):
+        # every game builds its own layout, the skeleton is built once for all of them
+        show_board(self.board)
+        n_skeletons = len(show._skeletons)
+        for _ in range(20):
+            show_board(Game(config=self.config).get_board())
+        self.assertEqual(len(show._skeletons), n_skeletons)
+
+    def test_incremental(self):
+        # a render patched turn after turn matches a render from scratch
+        game_rules = rl.Rules(config=self.config, layout=self.game.get_state().get_layout())
+        data = self.game.get_state().get_mutable_data()
+        rng = random.Random(0)
+        renderer = BoardRenderer(self.board)
+        for _ in range(N_TURNS):
+            if game_rules.play_turn(data, rng, rl.random_policy) and game_rules.is_over(data):
+                break
+            self.assertEqual(renderer.render(), BoardRenderer(self.board).render())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Testing module for GameState class
+"""
+
+import unittest
+import random
+
+import game.model.state as st
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from utils.config import process_config
+from unit_testing import HOTEL_NAMES
+
+PLAYER_NAMES = ['0', '1', '2']
+
+
+class GameStateTest(unittest.TestCase):
+
+    def test_init(self):
+        layout = st.StateLayout(player_names=PLAYER_NAMES, hotel_names=HOTEL_NAMES)
+        s = st.GameState(layout)
+
+        self.assertEqual(len(s.get_data()), layout.size)
+        self.assertEqual(s.get_turn(), 0)
+        for p_id in range(len(PLAYER_NAMES)):
+            self.assertEqual(s.get_money(p_id), st.START_MONEY)
+            self.assertEqual(s.get_position(p_id), st.START_CELL)
+        for h_id in range(len(HOTEL_NAMES)):
+            self.assertEqual(s.get_owner(h_id), st.NO_OWNER)
+            self.assertEqual(s.get_star_level(h_id), 0)
+            self.assertEqual(s.get_last_upgrade(h_id), st.NO_UPGRADE)
+        for cell_id in range(-1, 31):
+            self.assertEqual(s.get_entrance(cell_id), st.NO_ENTRANCE)
+            self.assertFalse(s.is_occupied(cell_id))
+
+    def test_fields_independent(self):
+        layout = st.StateLayout(player_names=PLAYER_NAMES, hotel_names=HOTEL_NAMES)
+        s = st.GameState(layout)
+
+        p_id = random.randrange(len(PLAYER_NAMES))
+        h_id = random.randrange(len(HOTEL_NAMES))
+        cell_id = random.randint(-1, 30)
+
+        s.change_money(p_id, -500)
+        s.set_position(p_id, 7)
+        s.set_owner(h_id, p_id)
+        s.set_upgrade(h_id, 2, 3)
+        s.set_entrance(cell_id, h_id)
+        s.set_occupied(cell_id, True)
+
+        expected = st.GameState(layout)
+        self.assertNotEqual(s, expected)
+        self.assertEqual(s.get_money(p_id), st.START_MONEY - 500)
+        self.assertEqual(s.get_position(p_id), 7)
+        self.assertEqual(s.get_owner(h_id), p_id)
+        self.assertEqual(s.get_star_level(h_id), 3)
+        self.assertEqual(s.get_last_upgrade(h_id), 2)
+        self.assertEqual(s.get_entrance(cell_id), h_id)
+        self.assertTrue(s.is_occupied(cell_id))
+
+        # every other slot untouched, besides the occupied, entrance, owner and cell players bitboards
+        changed = {i for i, (a, b) in enumerate(zip(s.get_data(), expected.get_data())) if a != b}
+        self.assertEqual(len([i for i in changed if i < layout.occupied_mask_off]), 7)
+        self.assertEqual(len([i for i in changed if i >= layout.occupied_mask_off]), 5)
+
+    def test_copy_on_write(self):
+        layout = st.StateLayout(player_names=PLAYER_NAMES, hotel_names=HOTEL_NAMES)
+        s = st.GameState(layout)
+
+        snap = s.snapshot()
+        self.assertIs(snap.get_data(), s.get_data())   # buffer shared until written
+
+        s.change_money(0, 100)
+        self.assertIsNot(snap.get_data(), s.get_data())
+        self.assertEqual(snap.get_money(0), st.START_MONEY)
+        self.assertEqual(s.get_money(0), st.START_MONEY + 100)
+
+        # writing the snapshot leaves the state untouched
+        snap.set_owner(0, 1)
+        self.assertEqual(s.get_owner(0), st.NO_OWNER)
+
+        # restore
+        s.restore(snap)
+        self.assertEqual(s, snap)
+        s.set_turn(5)
+        self.assertEqual(snap.get_turn(), 0)
+
+        # eager copy
+        c = s.copy()
+        self.assertEqual(c, s)
+        self.assertIsNot(c.get_data(), s.get_data())
+
+    def test_layout_ids(self):
+        layout = st.StateLayout(player_names=PLAYER_NAMES, hotel_names=HOTEL_NAMES)
+
+        for i, name in enumerate(PLAYER_NAMES):
+            self.assertEqual(layout.player_id(name), i)
+            self.assertTrue(layout.has_player(name))
+        for i, name in enumerate(HOTEL_NAMES):
+            self.assertEqual(layout.hotel_id(name), i)
+
+        # unknown names are not part of the game, the layout shared by its clones is left as is
+        with self.assertRaises(KeyError):
+            layout.player_id('unknown')
+        with self.assertRaises(KeyError):
+            layout.hotel_id('unknown')
+        self.assertEqual(layout.get_player_names(), PLAYER_NAMES)
+        self.assertEqual(layout.get_hotel_names(), HOTEL_NAMES)
+
+        # the layout of a standalone view registers them without a slot
+        layout = st.StateLayout(player_names=PLAYER_NAMES, hotel_names=HOTEL_NAMES, standalone=True)
+        self.assertEqual(layout.player_id('unknown'), len(PLAYER_NAMES))
+        self.assertFalse(layout.has_player('unknown'))
+        self.assertEqual(layout.get_n_players(), len(PLAYER_NAMES))
+
+        with self.assertRaises(AssertionError):
+            st.StateLayout(player_names=PLAYER_NAMES, hotel_names=[f'h{i}' for i in range(31)])
+
+    def test_game_views(self):
+        config = process_config(EasyDict())
+        game = Game(config=config)
+        s = game.get_state()
+
+        pl = random.choice(list(game.get_player_list().values()))
+        htl = random.choice(list(game.get_hotel_list().values()))
+
+        # writes through the views land in the state
+        pl.change_money(amount=-1000)
+        self.assertEqual(s.get_money(pl.get_id()), pl.get_money())
+
+        htl.set_owner(player_name=pl.get_name())
+        self.assertEqual(s.get_owner(htl.get_id()), pl.get_id())
+
+        htl.upgrade(0)
+        self.assertEqual(s.get_star_level(htl.get_id()), htl.get_star_level())
+
+        board = game.get_board()
+        board.move_player(p=pl, delta=4)
+        self.assertEqual(s.get_position(pl.get_id()), 3)
+
+        c = board.find_cell(cell_id=3)
+        c.add_entrance(htl)
+        self.assertEqual(s.get_entrance(3), htl.get_id())
+        self.assertIs(c.get_entrance(), htl)
+
+        # and writes to the state are seen by the views
+        s.set_owner(htl.get_id(), st.NO_OWNER)
+        self.assertIsNone(htl.get_owner())
+
+
+if __name__ == '__main__':
+    unittest.main()
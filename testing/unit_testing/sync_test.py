@@ -0,0 +1,140 @@
+"""
+Testing module for StateSync and StateReplica classes
+"""
+
+import random
+import unittest
+
+import game.model.rules as rl
+import game.model.state as st
+
+from array import array
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from game.model.sync import StateReplica, StateSync, decode_delta, encode_delta
+from utils.config import process_config
+
+N_TURNS = 300
+
+
+class SyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = process_config(EasyDict())
+        self.game = Game(config=self.config)
+        self.state = self.game.get_state()
+        self.layout = self.state.get_layout()
+        self.rules = rl.Rules(config=self.config, layout=self.layout)
+
+    def play(self, data, rng, n_turns):
+        for _ in range(n_turns):
+            if self.rules.play_turn(data, rng, rl.random_policy) and self.rules.is_over(data):
+                break
+
+    def test_encoding(self):
+        changes = [(0, 5), (1, -1), (7, 0), (8, -2), (90, 123456), (91, -2 ** 31), (92, 2 ** 31 - 1)]
+        payload = encode_delta(3, 700, changes)
+        self.assertEqual(decode_delta(payload), (3, 700, changes))
+        self.assertEqual(decode_delta(encode_delta(0, 0, [])), (0, 0, []))
+        with self.assertRaises(ValueError):
+            decode_delta(payload[:-1])
+        with self.assertRaises(ValueError):
+            decode_delta(payload + b'\x00')
+
+    def test_turn_by_turn(self):
+        sync = StateSync(self.layout)
+        replica = StateReplica(self.layout)
+        data = self.layout.new_buffer().tolist()
+        rng = random.Random(0)
+        sizes = []
+        for _ in range(N_TURNS):
+            self.play(data, rng, 1)
+            sync.commit(data)
+            payload = sync.delta(replica.get_version())
+            sizes.append(len(payload))
+            replica.apply(payload)
+            self.assertEqual(replica.get_state().get_data().tolist(), data)
+            self.assertEqual(replica.get_version(), sync.get_version())
+            if self.rules.is_over(data):
+                break
+        # tens of bytes per turn, the full buffer is hundreds
+        self.assertLess(sum(sizes) / len(sizes), 40)
+        self.assertLess(max(sizes), 4 * len(data))
+
+        # bitboards and hash rebuilt, as a state played locally
+        self.assertEqual(replica.get_state().get_key(), st.GameState(self.layout, array('i', data)).get_key())
+
+    def test_late_client(self):
+        sync = StateSync(self.layout, history=8)
+        data = self.layout.new_buffer().tolist()
+        rng = random.Random(1)
+        replica = StateReplica(self.layout)
+        self.play(data, rng, 3)
+        sync.commit(data)
+        replica.apply(sync.delta(0))
+
+        # acknowledgement lost: the delta from the last acknowledged version still applies
+        acked = replica.get_version()
+        self.play(data, rng, 2)
+        sync.commit(data)
+        replica.apply(sync.delta(acked))
+        self.play(data, rng, 2)
+        sync.commit(data)
+        replica.apply(sync.delta(acked))
+        self.assertEqual(replica.get_state().get_data().tolist(), data)
+
+        # version out of the history: delta from a new game
+        acked = replica.get_version()
+        for _ in range(20):
+            self.play(data, rng, 1)
+            sync.commit(data)
+        payload = sync.delta(acked)
+        self.assertEqual(decode_delta(payload)[0], 0)
+        replica.apply(payload)
+        self.assertEqual(replica.get_state().get_data().tolist(), data)
+
+        # new client
+        fresh = StateReplica(self.layout)
+        fresh.apply(sync.delta(0))
+        self.assertEqual(fresh.get_state().get_data().tolist(), data)
+
+        # up to date: empty delta
+        self.assertEqual(decode_delta(sync.delta(sync.get_version()))[2], [])
+
+    def test_mismatch(self):
+        sync = StateSync(self.layout)
+        data = self.layout.new_buffer().tolist()
+        rng = random.Random(2)
+        for _ in range(3):
+            self.play(data, rng, 1)
+            sync.commit(data)
+        replica = StateReplica(self.layout)
+        replica.apply(sync.delta(0))
+        with self.assertRaises(ValueError):
+            # replica behind the base of the delta
+            StateReplica(self.layout).apply(sync.delta(2))
+        with self.assertRaises(ValueError):
+            replica.apply(encode_delta(0, 1, [(self.layout.occupied_mask_off, 1)]))
+
+    def test_model_changes(self):
+        # changes made through the model classes are synced as well
+        sync = StateSync(self.layout)
+        replica = StateReplica(self.layout)
+        p = next(iter(self.game.get_player_list().values()))
+        h = next(iter(self.game.get_hotel_list().values()))
+        p.change_money(-1500)
+        h.set_owner(p.get_name())
+        self.game.get_board().move_player(p, delta=5)
+        sync.commit(self.state.get_data())
+        payload = sync.delta(0)
+        self.assertLess(len(payload), 20)
+        replica.apply(payload)
+        self.assertEqual(replica.get_state(), self.state)
+        self.assertEqual(replica.get_state().get_key(), self.state.get_key())
+        self.assertLess(len(payload), len(repr(self.game)) // 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Testing module for BoardTopology class
+"""
+
+import unittest
+
+import game.model.topology as topology
+import utils.config as cfg
+
+from easydict import EasyDict
+
+from game.model.game import Game
+from unit_testing import CELL_YAML_PATH
+
+
+class BoardTopologyTest(unittest.TestCase):
+
+    def test_init(self):
+        cell_dict = cfg.get_config_from_yaml(CELL_YAML_PATH)
+        t = topology.get_topology(cfg.process_config(EasyDict()))
+
+        self.assertEqual(t.n_cells, 32)
+        self.assertEqual(t.ring_size, 31)
+        self.assertEqual(t.cell_ids, tuple(range(-1, 31)))
+        for cell_id in range(-1, 31):
+            self.assertEqual(t.cell_type[cell_id + 1], cell_dict[str(cell_id)].type)
+            self.assertEqual(list(t.hotels_near[cell_id + 1]), cell_dict[str(cell_id)].hotels_near)
+        self.assertTrue(t.has_cell(-1))
+        self.assertFalse(t.has_cell(31))
+
+    def test_next_cell(self):
+        t = topology.get_topology(cfg.process_config(EasyDict()))
+
+        self.assertEqual(t.next_cell(-1, 1), 0)
+        self.assertEqual(t.next_cell(28, 5), 2)
+        self.assertEqual(t.next_cell(2, -3), 30)
+
+    def test_shared(self):
+        # configs parsed separately share the same topology
+        game1 = Game(config=cfg.process_config(EasyDict()))
+        game2 = Game(config=cfg.process_config(EasyDict()))
+        self.assertIs(game1.get_board().get_topology(), game2.get_board().get_topology())
+
+        # but not the mutable layer
+        game1.get_board().find_cell(3).occupy()
+        self.assertTrue(game1.get_board().find_cell(3).is_occupied())
+        self.assertFalse(game2.get_board().find_cell(3).is_occupied())
+        self.assertIs(game1.get_board().find_cell(3).get_hotels_near(),
+                      game2.get_board().find_cell(3).get_hotels_near())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Testing module for the tournament runner
+"""
+
+import unittest
+
+import tournament
+import game.model.rules as rl
+import game.model.state as st
+
+from easydict import EasyDict
+
+from utils.config import process_config
+
+N_GAMES = 40
+
+
+class TournamentTest(unittest.TestCase):
+
+    def setUp(self):
+        config = process_config(EasyDict())
+        layout = st.StateLayout(player_names=[p.name for p in config.game_dict.player_list],
+                                hotel_names=config.hotel_dict.keys())
+        self.rules = rl.Rules(config=config, layout=layout)
+
+    def test_schedule(self):
+        entrants = ['random', 'greedy']
+        games = tournament.schedule(entrants, n_players=3, n_games=N_GAMES, seed=0)
+
+        self.assertEqual(len(games), N_GAMES)
+        self.assertEqual(games, tournament.schedule(entrants, n_players=3, n_games=N_GAMES, seed=0))
+        self.assertNotEqual(games, tournament.schedule(entrants, n_players=3, n_games=N_GAMES, seed=1))
+        # all seatings are played
+        self.assertEqual(len({seats for seats, _ in games}), 2 ** 3)
+
+    def test_elo(self):
+        ratings = {'a': 1500., 'b': 1500.}
+        tournament.update_elo(ratings, ('a', 'b', 'b'), [100, 50, 20])
+
+        self.assertGreater(ratings['a'], 1500.)
+        self.assertAlmostEqual(ratings['a'] + ratings['b'], 3000.)
+
+        # same policy seats do not rate each other
+        ratings = {'a': 1500.}
+        tournament.update_elo(ratings, ('a', 'a', 'a'), [100, 50, 20])
+        self.assertEqual(ratings['a'], 1500.)
+
+    def test_reproducible(self):
+        entrants = ['random', 'greedy']
+        single = tournament.run_tournament(self.rules, entrants, N_GAMES, n_workers=1, seed=3, chunk_size=7)
+        multi = tournament.run_tournament(self.rules, entrants, N_GAMES, n_workers=2, seed=3, chunk_size=3)
+        self.assertEqual(single, multi)
+
+        games, results = single
+        self.assertEqual(len(results), N_GAMES)
+        # same game played in process gives the same result
+        seats, seed = games[0]
+        self.assertEqual(tournament.play_game(self.rules, seats, seed, max_turns=500), results[0])
+
+        table = tournament.league_table(entrants, games, results)
+        self.assertEqual(len(table.rows), len(entrants))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testing module for Zobrist hashing and TranspositionTable class
+"""
+
+import unittest
+import random
+
+import game.model.zobrist as zb
+
+from easydict import EasyDict
+
+from game.ai.transposition import TranspositionTable, LRU, DEPTH
+from game.model.game import Game
+from utils.config import process_config
+
+REPETITION = 100
+
+
+class ZobristTest(unittest.TestCase):
+
+    def setUp(self):
+        self.game = Game(config=process_config(EasyDict()))
+        self.state = self.game.get_state()
+        self.keys = self.state.get_layout().zobrist
+
+    def test_incremental(self):
+        pl_list = list(self.game.get_player_list().values())
+        htl_list = list(self.game.get_hotel_list().values())
+        board = self.game.get_board()
+
+        for _ in range(REPETITION):
+            pl = random.choice(pl_list)
+            htl = random.choice(htl_list)
+            op = random.randrange(5)
+            if op == 0:
+                board.move_player(p=pl, delta=random.randint(1, 6))
+            elif op == 1:
+                htl.set_owner(player_name=pl.get_name())
+            elif op == 2:
+                htl.upgrade(random.randint(0, 5))
+            elif op == 3:
+                htl.free_property()
+            else:
+                pl.change_money(amount=random.randint(-2000, 2000))
+            self.assertEqual(self.state.get_key(), self.keys.full_hash(self.state.get_data()))
+            self.assertEqual(hash(self.state), hash(self.state.copy()))
+
+    def test_transposition(self):
+        pl1, pl2 = random.sample(list(self.game.get_player_list().values()), k=2)
+        board = self.game.get_board()
+        start = self.game.snapshot()
+
+        # same position along two paths
+        board.move_player(p=pl1, delta=2)
+        board.move_player(p=pl1, delta=3)
+        key_a = self.state.get_key()
+        self.assertNotEqual(key_a, start.get_key())
+        self.game.restore(start)
+        board.move_player(p=pl1, delta=4)
+        board.move_player(p=pl1, delta=1)
+        self.assertEqual(self.state.get_key(), key_a)
+
+        # the turn counter is not part of the key
+        self.state.set_turn(self.state.get_turn() + 1)
+        self.assertEqual(self.state.get_key(), key_a)
+
+        # money inside the same bucket is a transposition, another bucket is not
+        pl2.change_money(amount=1)
+        self.assertEqual(self.state.get_key(), key_a)
+        pl2.change_money(amount=zb.MONEY_BUCKET)
+        self.assertNotEqual(self.state.get_key(), key_a)
+
+    def test_snapshot(self):
+        pl = random.choice(list(self.game.get_player_list().values()))
+        snap = self.game.snapshot()
+        pl.change_money(amount=-3000)
+        self.assertNotEqual(snap.get_key(), self.state.get_key())
+
+        self.game.restore(snap)
+        self.assertEqual(snap.get_key(), self.state.get_key())
+        self.assertEqual(self.game.clone().get_state().get_key(), self.state.get_key())
+
+
+class TranspositionTableTest(unittest.TestCase):
+
+    def test_lru(self):
+        tt = TranspositionTable(capacity=3, replacement=LRU)
+        for key in range(3):
+            tt.store(key, depth=1, value=float(key))
+        self.assertEqual(tt.probe(0).value, 0.)    # 0 becomes most recent
+        tt.store(3, depth=1, value=3.)
+
+        self.assertEqual(len(tt), 3)
+        self.assertIsNone(tt.probe(1))             # least recently used evicted
+        self.assertIsNotNone(tt.probe(0))
+        self.assertIsNone(tt.probe(0, depth=2))    # too shallow
+        self.assertEqual(tt.hits, 1 + 1)
+        self.assertEqual(tt.misses, 2)
+
+        # deeper result replaces
+        tt.store(0, depth=3, value=10., action=4)
+        tt.store(0, depth=2, value=20.)
+        self.assertEqual(tt.probe(0).value, 10.)
+        self.assertEqual(tt.probe(0).action, 4)
+
+    def test_depth(self):
+        tt = TranspositionTable(capacity=4, replacement=DEPTH)
+        tt.store(1, depth=3, value=1.)
+        tt.store(5, depth=2, value=5.)     # same slot, shallower: kept out
+        self.assertEqual(tt.probe(1).value, 1.)
+        self.assertIsNone(tt.probe(5))
+
+        tt.store(5, depth=4, value=5.)     # deeper: replaces
+        self.assertIsNone(tt.probe(1))
+        self.assertEqual(tt.probe(5).value, 5.)
+
+        tt.clear()
+        self.assertEqual(len(tt), 0)
+        self.assertRaises(ValueError,
+                          lambda: TranspositionTable(capacity=4, replacement='fifo'))
+
+
+if __name__ == '__main__':
+    unittest.main()
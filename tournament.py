@@ -0,0 +1,236 @@
+"""
+Tournament execution file for HOTEL AI
+
+-Capture the config file once
+-Spread self-play games among worker processes
+-Collect the results into a league table with Elo ratings
+"""
+
+import argparse
+import itertools
+import os
+import random
+
+import game.model.rules as rules
+import game.model.state as state
+
+from concurrent.futures import ProcessPoolExecutor
+from game.simulation.replay import ReplayWriter
+from prettytable import PrettyTable
+from utils.config import process_config
+
+POLICIES = {
+    'random': rules.random_policy,
+    'greedy': rules.greedy_policy,
+}
+
+ELO_START = 1500.
+ELO_K = 16.
+
+# rules of the worker process, received once from the parent by init_worker
+_worker_rules: rules.Rules or None = None
+
+
+def init_worker(game_rules: rules.Rules) -> None:
+    """
+    Worker initializer: the compiled rules are pickled once per worker, not once per game
+    :param game_rules: compiled rules of the game
+    """
+    global _worker_rules
+    _worker_rules = game_rules
+
+
+def play_game(game_rules: rules.Rules,
+              seats: tuple[str],
+              seed: int,
+              max_turns: int,
+              writer: ReplayWriter = None
+              ) -> list[int]:
+    """
+    Play a whole game between policies
+    :param game_rules: compiled rules of the game
+    :param seats: name of the policy of each player id
+    :param seed: seed of the game random stream
+    :param max_turns: turn horizon, the game is scored by net worth when reached
+    :param writer: replay file the turns are recorded to, None to not record
+    :return: net worth of each seat at the end of the game
+    """
+    rng = random.Random(seed)
+    policies = [POLICIES[name] for name in seats]
+
+    def seat_policy(r, data, actions, _rng):
+        return policies[data[state.CURRENT_PLAYER]](r, data, actions, _rng)
+
+    data = game_rules.layout.new_buffer().tolist()
+    recorder = None
+    if writer is not None:
+        writer.begin_game(data)
+        recorder = writer.record_turn
+    while data[state.TURN] < max_turns:
+        if game_rules.play_turn(data, rng, seat_policy, recorder) and game_rules.is_over(data):
+            break
+    return [game_rules.net_worth(data, p_id) for p_id in range(game_rules.n_players)]
+
+
+def play_games(tasks: list[tuple[tuple[str], int]],
+               max_turns: int,
+               replay_path: str = None
+               ) -> list[list[int]]:
+    """
+    Worker entry point, plays a chunk of games with the rules received by init_worker
+    :param tasks: list of (seats, seed)
+    :param max_turns: turn horizon
+    :param replay_path: replay file of the chunk, None to not record
+    :return: net worths of each game
+    """
+    if replay_path is None:
+        return [play_game(_worker_rules, seats, seed, max_turns) for seats, seed in tasks]
+    with ReplayWriter(replay_path, _worker_rules) as writer:
+        return [play_game(_worker_rules, seats, seed, max_turns, writer) for seats, seed in tasks]
+
+
+def schedule(entrants: list[str],
+             n_players: int,
+             n_games: int,
+             seed: int
+             ) -> list[tuple[tuple[str], int]]:
+    """
+    Seat assignment and seed of every game, rotating over every ordered seating of the entrants
+    Every game has its own random stream derived from the tournament seed, so that results do not depend
+    on which worker plays which game
+    :param entrants: names of the policies taking part
+    :param n_players: players per game
+    :param n_games: number of games
+    :param seed: tournament seed
+    :return: list of (seats, game seed)
+    """
+    seatings = list(itertools.product(entrants, repeat=n_players))
+    seeder = random.Random(seed)
+    return [(seatings[i % len(seatings)], seeder.getrandbits(64)) for i in range(n_games)]
+
+
+def update_elo(ratings: dict[str: float],
+               seats: tuple[str],
+               net_worths: list[int]
+               ) -> None:
+    """
+    Multiplayer Elo: every pair of seats is a match won by the higher net worth
+    Seats with the same policy do not rate each other
+    :param ratings: Elo rating by policy, updated in place
+    :param seats: policy of each player id
+    :param net_worths: final net worth of each player id
+    """
+    k = ELO_K / max(len(seats) - 1, 1)
+    delta = {name: 0. for name in seats}
+    for i, j in itertools.combinations(range(len(seats)), 2):
+        a, b = seats[i], seats[j]
+        if a == b:
+            continue
+        expected = 1. / (1. + 10 ** ((ratings[b] - ratings[a]) / 400.))
+        score = 1. if net_worths[i] > net_worths[j] else 0. if net_worths[i] < net_worths[j] else .5
+        delta[a] += k * (score - expected)
+        delta[b] -= k * (score - expected)
+    for name, d in delta.items():
+        ratings[name] += d
+
+
+def league_table(entrants: list[str],
+                 games: list[tuple[tuple[str], int]],
+                 results: list[list[int]]
+                 ) -> PrettyTable:
+    """
+    :param entrants: names of the policies taking part
+    :param games: seats and seed of every game, in schedule order
+    :param results: net worths of every game, in schedule order
+    :return: league table sorted by Elo
+    """
+    ratings = {name: ELO_START for name in entrants}
+    played = {name: 0 for name in entrants}
+    wins = {name: 0. for name in entrants}
+    worth = {name: 0 for name in entrants}
+    for (seats, _), net_worths in zip(games, results):
+        update_elo(ratings, seats, net_worths)
+        best = max(net_worths)
+        winners = [seats[p_id] for p_id, w in enumerate(net_worths) if w == best]
+        for p_id, name in enumerate(seats):
+            played[name] += 1
+            worth[name] += net_worths[p_id]
+        for name in winners:
+            wins[name] += 1. / len(winners)
+
+    table = PrettyTable()
+    table.field_names = ['Policy', 'Elo', 'Seats played', 'Wins', 'Mean net worth']
+    for name in sorted(entrants, key=lambda n: -ratings[n]):
+        table.add_row([name, f'{ratings[name]:.1f}', played[name], f'{wins[name]:.1f}',
+                       f'{worth[name] / max(played[name], 1):.0f}'])
+    return table
+
+
+def run_tournament(game_rules: rules.Rules,
+                   entrants: list[str],
+                   n_games: int,
+                   n_workers: int = None,
+                   seed: int = 0,
+                   max_turns: int = 500,
+                   chunk_size: int = 50,
+                   replay_dir: str = None
+                   ) -> tuple[list[tuple[tuple[str], int]], list[list[int]]]:
+    """
+    Play the games of a tournament on a process pool
+    :param game_rules: compiled rules of the game
+    :param entrants: names of the policies taking part
+    :param n_games: number of games
+    :param n_workers: number of worker processes, number of CPUs if not specified
+    :param seed: tournament seed
+    :param max_turns: turn horizon of each game
+    :param chunk_size: games sent to a worker at once
+    :param replay_dir: directory of the replay files, one per chunk in schedule order, None to not record
+    :return: (games schedule, net worths of every game), both in schedule order
+    """
+    games = schedule(entrants, game_rules.n_players, n_games, seed)
+    chunks = [games[i:i + chunk_size] for i in range(0, n_games, chunk_size)]
+    replay_paths = [None] * len(chunks)
+    if replay_dir is not None:
+        os.makedirs(replay_dir, exist_ok=True)
+        replay_paths = [os.path.join(replay_dir, f'replay_{i:05d}.bin') for i in range(len(chunks))]
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=init_worker,
+                             initargs=(game_rules,)) as pool:
+        results = list(itertools.chain.from_iterable(
+            pool.map(play_games, chunks, itertools.repeat(max_turns), replay_paths)))
+    return games, results
+
+
+def main():
+    """
+    Tournament function
+    Parses argument
+    Play the tournament and print the league table
+    """
+
+    # set up argument parser to read input arguments
+    arg_parser = argparse.ArgumentParser(description="Self-play tournament between AI policies")
+    arg_parser.add_argument('--entrants', nargs='+', default=list(POLICIES.keys()), choices=list(POLICIES.keys()))
+    arg_parser.add_argument('--games', type=int, default=1000)
+    arg_parser.add_argument('--workers', type=int, default=None)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--max-turns', type=int, default=500)
+    arg_parser.add_argument('--replay-dir', type=str, default=None, help='record the games as binary replays')
+
+    # get the argument from the console
+    args = arg_parser.parse_args()
+
+    # parse the config files once, workers receive the compiled rules
+    config = process_config(args)
+    layout = state.StateLayout(player_names=[p.name for p in config.game_dict.player_list],
+                               hotel_names=config.hotel_dict.keys())
+    game_rules = rules.Rules(config=config, layout=layout)
+
+    games, results = run_tournament(game_rules, args.entrants, args.games,
+                                    n_workers=args.workers, seed=args.seed, max_turns=args.max_turns,
+                                    replay_dir=args.replay_dir)
+    print(league_table(args.entrants, games, results))
+
+
+if __name__ == '__main__':
+    main()
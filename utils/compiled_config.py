@@ -0,0 +1,141 @@
+"""
+Contains CompiledConfig class and compile_config
+Frozen, integer-indexed form of the yaml configs, read by the model classes on their hot paths
+    - hotels are indexed by their order in hotel.yaml, upgrade types by their idx in hotel_upgrade_type.yaml
+    - cells are indexed by cell_id + 1
+    - unavailable upgrades are None instead of the string 'None'
+"""
+
+from dataclasses import dataclass
+from easydict import EasyDict
+
+NO_COST = 'None'    # unavailable upgrade in hotel.yaml
+
+
+@dataclass(frozen=True, slots=True)
+class HotelSpec:
+    """
+    Static data of a hotel
+    """
+    name: str
+    id: int
+    land_cost: int
+    expropriation_price: int
+    entrance_cost: int
+    costs: tuple[int or None]               # by upgrade idx, None if unavailable
+    payments: tuple[tuple[int]]             # row = number of stars - 1, column = number of nights - 1
+    star_upgrade: tuple[int]                # star level reached by upgrade idx
+    upgrades_after: tuple[tuple[int]]       # available upgrade idx after each last upgrade idx + 1
+
+
+@dataclass(frozen=True, slots=True)
+class CellSpec:
+    """
+    Static data of a cell
+    """
+    id: int
+    type: int
+    type_name: str
+    hotels_near: tuple[str]
+    hotel_ids_near: tuple[int]
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledConfig:
+    """
+    CompiledConfig class
+    """
+    hotels: tuple[HotelSpec]
+    hotel_ids: dict[str: int]
+    upgrade_names: tuple[str]               # by upgrade idx
+    upgrade_ids: dict[str: int]
+    cells: tuple[CellSpec]                  # by cell_id + 1
+
+    def hotel(self,
+              name: str
+              ) -> HotelSpec:
+        """
+        :param name: name of the hotel
+        :return: static data of the hotel
+        :raise KeyError if the hotel is not in the config
+        """
+        return self.hotels[self.hotel_ids[name]]
+
+    def cell(self,
+             cell_id: int
+             ) -> CellSpec:
+        """
+        :param cell_id: id of the cell
+        :return: static data of the cell
+        """
+        return self.cells[cell_id + 1]
+
+
+def compile_config(config: EasyDict) -> CompiledConfig:
+    """
+    Compile the yaml configs, once per process_config
+    Partial configs, e.g. with the cells only, compile the dicts they have
+    :param config: global config dictionary, with cell, cell type, hotel and hotel upgrade type dicts
+    :return: compiled config
+    """
+    hotel_dict = getattr(config, 'hotel_dict', None) or dict()
+    cell_dict = getattr(config, 'cell_dict', None) or dict()
+    cell_type_dict = getattr(config, 'cell_type_dict', None) or dict()
+    upgrade_type_dict = getattr(config, 'hotel_upgrade_type_dict', None) or dict()
+
+    # upgrade types, without the 'none' marker of hotels never upgraded
+    upgrade_types = {key: int(value) for key, value in upgrade_type_dict.items() if int(value) >= 0}
+    upgrade_names = tuple(sorted(upgrade_types.keys(), key=lambda k: upgrade_types[k]))
+    assert [upgrade_types[k] for k in upgrade_names] == list(range(len(upgrade_names))), \
+        f'Upgrade types must be numbered from 0 without gaps'
+
+    hotel_ids = {name: h_id for h_id, name in enumerate(hotel_dict.keys())}
+    hotels = []
+    for name, h_id in hotel_ids.items():
+        h = hotel_dict[name]
+        costs = tuple(None if h.costs[key] == NO_COST or h.costs[key] is None else int(h.costs[key])
+                      for key in upgrade_names)
+        hotels.append(HotelSpec(
+            name=name,
+            id=h_id,
+            land_cost=h.land_cost,
+            expropriation_price=h.expropriation_price,
+            entrance_cost=h.entrance_cost,
+            costs=costs,
+            payments=tuple(tuple(row) for row in h.payments),
+            star_upgrade=tuple(h.star_upgrade),
+            upgrades_after=tuple(
+                tuple(u for u in range(last + 1, len(costs)) if costs[u] is not None)
+                for last in range(-1, len(costs))
+            ),
+        ))
+
+    cells = []
+    for cell_id in sorted(int(key) for key in cell_dict.keys()):
+        c = cell_dict[str(cell_id)]
+        cells.append(CellSpec(
+            id=cell_id,
+            type=c.type,
+            type_name=cell_type_dict.get(str(c.type), str(c.type)),
+            hotels_near=tuple(c.hotels_near),
+            hotel_ids_near=tuple(hotel_ids[name] for name in c.hotels_near if name in hotel_ids),
+        ))
+
+    return CompiledConfig(hotels=tuple(hotels),
+                          hotel_ids=hotel_ids,
+                          upgrade_names=upgrade_names,
+                          upgrade_ids={name: idx for idx, name in enumerate(upgrade_names)},
+                          cells=tuple(cells))
+
+
+def get_compiled(config: EasyDict) -> CompiledConfig:
+    """
+    Compiled form of a config, compiled on first use if process_config did not already
+    The raw dicts must not be edited afterwards, or config.compiled must be recompiled
+    :param config: global config dictionary
+    :return: compiled config
+    """
+    compiled = getattr(config, 'compiled', None)     # config may be an argparse namespace
+    if compiled is None:
+        compiled = config.compiled = compile_config(config)
+    return compiled
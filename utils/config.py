@@ -1,9 +1,13 @@
+import hashlib
+import pickle
 import yaml
 import os
 
 from easydict import EasyDict
+from utils.compiled_config import compile_config
 
-PROJECT_ROOT = 'D:/Hotels_AI'
+# root of the repository, wherever it is checked out
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 APPEND_PROJECT_ROOT = True
 
 CELL_YAML_PATH = 'configs/cell.yaml'
@@ -12,6 +16,10 @@ HOTEL_YAML_PATH = 'configs/hotel.yaml'
 HOTEL_UPGRADE_TYPE_YAML_PATH = 'configs/hotel_upgrade_type.yaml'
 GAME_YAML_PATH = 'configs/game.yaml'
 
+CACHE_DIR = 'cache'     # precomputed tables, keyed by config hash
+CONFIG_CACHE_FILE = 'config.pkl'
+CONFIG_CACHE_VERSION = 1    # bump when the cached objects change shape
+
 
 def get_config_from_yaml(yaml_file: str
                          ) -> EasyDict:
@@ -29,32 +37,125 @@ def get_config_from_yaml(yaml_file: str
             exit(-1)
 
 
-def process_config(args) -> EasyDict:
+def get_config_path(path: str) -> str:
+    """
+    :param path: path of a config file, relative to the project root
+    :return: path to open
+    """
+    return os.path.join(PROJECT_ROOT, path) if APPEND_PROJECT_ROOT else path
+
+
+def file_stamp(path: str) -> tuple[int, int]:
+    """
+    :param path: path of a file
+    :return: (modification time in ns, size), cheap to check on every start
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path: str) -> str:
+    """
+    :param path: path of a file
+    :return: hex digest of the content, checked when the stamp changed but the content may not have
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_config_cache(cache_path: str,
+                      paths: dict[str: str]
+                      ) -> dict or None:
+    """
+    Load the parsed and compiled configs from the binary cache, if still valid
+    The cache is valid if every yaml file has the same stamp, or else the same content, as when it was written
+    :param cache_path: path of the cache file
+    :param paths: path of each yaml file by config key
+    :return: cache content, None if missing or stale
+    """
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CONFIG_CACHE_VERSION or cache.get('paths') != paths:
+        return None
+    # partial cache, e.g. written by an older build with the same version
+    if not all(isinstance(cache.get(key), dict) and cache[key].keys() == paths.keys() for key in ('stamps', 'hashes')) \
+            or 'dicts' not in cache or 'compiled' not in cache:
+        return None
+    if all(file_stamp(path) == cache['stamps'][key] for key, path in paths.items()):
+        return cache
+    # files touched: keep the cache if the content did not change, refreshing the stamps
+    if all(file_hash(path) == cache['hashes'][key] for key, path in paths.items()):
+        cache['stamps'] = {key: file_stamp(path) for key, path in paths.items()}
+        save_config_cache(cache_path, cache)
+        return cache
+    return None
+
+
+def save_config_cache(cache_path: str,
+                      cache: dict
+                      ) -> None:
+    """
+    Write the cache atomically, concurrent workers never read a partial file
+    The cache is an optimization only: write errors are ignored
+    :param cache_path: path of the cache file
+    :param cache: cache content
+    """
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as cache_file:
+            pickle.dump(cache, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def process_config(args,
+                   use_cache: bool = True,
+                   cache_dir: str = None) -> EasyDict:
     """
     Merge argument parser with various yaml config files
+    Parsed and compiled configs are cached in a binary file, invalidated when any yaml file changes
     :param args: argument parser output
+    :param use_cache: False to always parse the yaml files
+    :param cache_dir: directory of the cache, CACHE_DIR of the project if not specified
     :return: config object
     """
     config = args
     # dict for all configs file added to config
-    config_path = os.path.join(PROJECT_ROOT, CELL_YAML_PATH) \
-        if APPEND_PROJECT_ROOT else CELL_YAML_PATH
-    config.cell_dict = get_config_from_yaml(config_path)
-
-    config_path = os.path.join(PROJECT_ROOT, CELL_TYPE_JSON_PATH) \
-        if APPEND_PROJECT_ROOT else CELL_TYPE_JSON_PATH
-    config.cell_type_dict = get_config_from_yaml(config_path)
-
-    config_path = os.path.join(PROJECT_ROOT, HOTEL_YAML_PATH) \
-        if APPEND_PROJECT_ROOT else HOTEL_YAML_PATH
-    config.hotel_dict = get_config_from_yaml(config_path)
+    paths = {
+        'cell_dict': get_config_path(CELL_YAML_PATH),
+        'cell_type_dict': get_config_path(CELL_TYPE_JSON_PATH),
+        'hotel_dict': get_config_path(HOTEL_YAML_PATH),
+        'hotel_upgrade_type_dict': get_config_path(HOTEL_UPGRADE_TYPE_YAML_PATH),
+        'game_dict': get_config_path(GAME_YAML_PATH),
+    }
+    cache_path = os.path.join(cache_dir if cache_dir is not None else get_config_path(CACHE_DIR),
+                              CONFIG_CACHE_FILE)
 
-    config_path = os.path.join(PROJECT_ROOT, HOTEL_UPGRADE_TYPE_YAML_PATH) \
-        if APPEND_PROJECT_ROOT else HOTEL_UPGRADE_TYPE_YAML_PATH
-    config.hotel_upgrade_type_dict = get_config_from_yaml(config_path)
+    cache = load_config_cache(cache_path, paths) if use_cache else None
+    if cache is None:
+        # stamps are taken before parsing, a file edited meanwhile is parsed again on next start
+        stamps = {key: file_stamp(path) for key, path in paths.items()}
+        dicts = {key: get_config_from_yaml(path) for key, path in paths.items()}
+        cache = {
+            'version': CONFIG_CACHE_VERSION,
+            'paths': paths,
+            'stamps': stamps,
+            'hashes': {key: file_hash(path) for key, path in paths.items()},
+            'dicts': dicts,
+            # frozen, integer-indexed form of the configs for the model hot paths
+            'compiled': compile_config(EasyDict(dicts)),
+        }
+        if use_cache:
+            save_config_cache(cache_path, cache)
 
-    config_path = os.path.join(PROJECT_ROOT, GAME_YAML_PATH) \
-        if APPEND_PROJECT_ROOT else GAME_YAML_PATH
-    config.game_dict = get_config_from_yaml(config_path)
+    for key, value in cache['dicts'].items():
+        setattr(config, key, value)
+    config.compiled = cache['compiled']
 
     return config